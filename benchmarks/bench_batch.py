@@ -0,0 +1,83 @@
+# benchmarks/bench_batch.py
+"""Throughput of the bulk ledger APIs against one call per operation.
+
+Compares apply_batch with one deposit() per credit, and bulk_transfer with
+one transfer() per settlement row.
+
+Run from the project root:
+    python -m benchmarks.bench_batch [--accounts 1000] [--sizes 10000 100000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+
+def make_database(tmp: str, accounts: int) -> DatabaseManager:
+    db = DatabaseManager(os.path.join(tmp, "bench.db"))
+    db.initialize_database()
+    # Skip bcrypt: the benchmark only needs account rows
+    with db.pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO accounts (name, password) VALUES (?, 'x')",
+            [(f"Payee {i}",) for i in range(accounts)]
+        )
+    return db
+
+def payroll(size: int, accounts: int):
+    return [
+        {'type': 'Deposit', 'account_number': 1 + i % accounts, 'amount': 1000 + i % 7, 'description': 'Salary'}
+        for i in range(size)
+    ]
+
+def settlement(size: int, accounts: int):
+    return [(1 + i % accounts, 1 + (i * 7 + 3) % accounts, 10, 'Settlement') for i in range(size)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--single-calls", type=int, default=2000,
+                        help="operations posted one call at a time for the baselines")
+    args = parser.parse_args()
+    logging.getLogger("database.db_manager").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_database(tmp, args.accounts)
+        ops = payroll(args.single_calls, args.accounts)
+        start = time.perf_counter()
+        for op in ops:
+            db.deposit(op['account_number'], op['amount'], op['description'])
+        baseline = len(ops) / (time.perf_counter() - start)
+        print(f"deposit() per credit: {baseline:10,.0f} credits/s")
+
+        for size in args.sizes:
+            ops = payroll(size, args.accounts)
+            start = time.perf_counter()
+            results = db.apply_batch(ops)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for r in results if not r['success'])
+            print(f"apply_batch({size:,}):  {size / elapsed:10,.0f} credits/s "
+                  f"({elapsed:.2f}s, {failed} failed, x{size / elapsed / baseline:.0f})")
+
+        rows = settlement(args.single_calls, args.accounts)
+        start = time.perf_counter()
+        for row in rows:
+            db.transfer(*row)
+        baseline = len(rows) / (time.perf_counter() - start)
+        print(f"transfer() per row:   {baseline:10,.0f} transfers/s")
+
+        for size in args.sizes:
+            rows = settlement(size, args.accounts)
+            start = time.perf_counter()
+            results = db.bulk_transfer(rows)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for r in results if not r['success'])
+            print(f"bulk_transfer({size:,}): {size / elapsed:10,.0f} transfers/s "
+                  f"({elapsed:.2f}s, {failed} failed, x{size / elapsed / baseline:.0f})")
+        db.close()
+
+if __name__ == "__main__":
+    main()
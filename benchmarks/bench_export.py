@@ -0,0 +1,87 @@
+# benchmarks/bench_export.py
+"""Throughput and peak memory of the streaming CSV export.
+
+Fills the ledger with synthetic transactions, then exports them with
+export_transactions_csv and with the old approach (load everything through
+get_all_transactions, then write). Peak memory is measured with tracemalloc,
+which slows both runs down by a similar factor. The streaming peak should
+stay flat as --rows grows; the old one grows with it.
+
+Run from the project root:
+    python -m benchmarks.bench_export [--rows 2000000] [--baseline-rows 200000]
+"""
+import argparse
+import csv
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from database.db_manager import DatabaseManager
+from database.exporter import export_transactions_csv
+
+ACCOUNTS = 1000
+
+def fill_ledger(db: DatabaseManager, rows: int, accounts: int = ACCOUNTS) -> None:
+    # Skip bcrypt and the balance updates: the export only reads transactions
+    with db.pool.connection() as conn:
+        if not conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]:
+            conn.executemany(
+                "INSERT INTO accounts (name, password) VALUES (?, 'x')",
+                [(f"Holder {i}",) for i in range(accounts)]
+            )
+        for start in range(0, rows, 100000):
+            conn.executemany(
+                "INSERT INTO transactions (account_number, type, amount, description, timestamp) "
+                "VALUES (?, 'Deposit', ?, 'Salary', datetime('2024-01-01', ? || ' seconds'))",
+                [(1 + i % accounts, 1000 + i % 997, i) for i in range(start, min(start + 100000, rows))]
+            )
+        conn.commit()
+
+def old_export(db: DatabaseManager, path: str) -> int:
+    transactions = db.get_all_transactions(limit=None)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Account", "Type", "Amount", "Description", "Date"])
+        for t in transactions:
+            writer.writerow([t['transaction_id'], t['account_number'], t['type'], t['amount'],
+                             t.get('description', ''), t['timestamp']])
+    return len(transactions)
+
+def measure(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:28} {rows:>11,} rows {rows / elapsed:10,.0f} rows/s  peak {peak / 2**20:8.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--baseline-rows", type=int, default=200000,
+                        help="rows exported with the old load-everything approach")
+    args = parser.parse_args()
+    logging.getLogger("database.db_manager").setLevel(logging.WARNING)
+    logging.getLogger("database.exporter").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db.initialize_database()
+        fill_ledger(db, args.baseline_rows)
+        path = os.path.join(tmp, "export.csv")
+        measure("old: load all, then write", lambda: old_export(db, path))
+        measure("streaming export", lambda: export_transactions_csv(db, path))
+
+        if args.rows > args.baseline_rows:
+            with db.pool.connection() as conn:
+                conn.execute("DELETE FROM transactions")
+                conn.commit()
+            fill_ledger(db, args.rows)
+            measure("streaming export", lambda: export_transactions_csv(db, path, progress=lambda *_: None))
+        db.close()
+
+if __name__ == "__main__":
+    main()
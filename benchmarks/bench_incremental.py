@@ -0,0 +1,61 @@
+# benchmarks/bench_incremental.py
+"""Incremental backup cost against churn, compared with a full backup.
+
+Builds a ledger, takes a base backup, then applies batches of deposits of
+growing size and times write_increment after each one. Increment time and
+size should track the number of changes, while a full backup tracks the
+size of the database.
+
+Run from the project root:
+    python -m benchmarks.bench_incremental [--accounts 10000] [--history 1000000] [--churn 100 1000 10000 100000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+from database.incremental_backup import take_base_backup, write_increment, restore
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--history", type=int, default=1000000, help="transactions in the ledger before backups")
+    parser.add_argument("--churn", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    args = parser.parse_args()
+    for name in ("database.db_manager", "database.backup", "database.incremental_backup"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db.initialize_database()
+        # Skip bcrypt: the benchmark only needs account rows
+        with db.pool.connection() as conn:
+            conn.executemany("INSERT INTO accounts (name, password) VALUES (?, 'x')",
+                             [(f"Holder {i}",) for i in range(args.accounts)])
+        for start in range(0, args.history, 100000):
+            db.apply_batch([{'type': 'Deposit', 'account_number': 1 + i % args.accounts, 'amount': 10}
+                            for i in range(start, min(start + 100000, args.history))])
+        backup_dir = os.path.join(tmp, "backups")
+
+        start = time.perf_counter()
+        base = take_base_backup(db, backup_dir)
+        print(f"full backup:         {time.perf_counter() - start:7.2f}s {base['bytes'] / 2**20:9.1f} MiB")
+
+        for churn in args.churn:
+            db.apply_batch([{'type': 'Deposit', 'account_number': 1 + i % args.accounts, 'amount': 1}
+                            for i in range(churn)])
+            start = time.perf_counter()
+            entry = write_increment(db, backup_dir)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(os.path.join(backup_dir, entry["file"]))
+            print(f"increment {churn:>9,} deposits: {elapsed:7.2f}s {size / 2**20:9.2f} MiB ({entry['rows']:,} changes)")
+
+        start = time.perf_counter()
+        result = restore(backup_dir, os.path.join(tmp, "restored.db"))
+        print(f"restore (replayed {result['applied']:,} changes): {time.perf_counter() - start:.2f}s")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_loan_scoring.py
+"""Bulk loan scoring throughput.
+
+Fills a scratch database with pending loan applications and clears the
+backlog with services.loan_scoring, once per chunk size.
+
+Run from the project root:
+    python -m benchmarks.bench_loan_scoring [--applications 1000000] [--chunk-sizes 5000 20000 100000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import warnings
+
+import numpy as np
+
+from database.db_manager import DatabaseManager
+from services.loan_scoring import score_pending_loans
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=1000000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[5000, 20000, 100000])
+    args = parser.parse_args()
+    logging.getLogger("services.loan_scoring").setLevel(logging.WARNING)
+    warnings.simplefilter("ignore")
+
+    rng = np.random.default_rng(0)
+    n = args.applications
+    rows = np.column_stack([rng.integers(5000, 200000, n), rng.integers(300, 851, n),
+                            rng.integers(1000, 500000, n), rng.integers(6, 361, n)]).tolist()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db.initialize_database()
+        # Skip bcrypt: one account row is all the applications need
+        with db.pool.connection() as conn:
+            conn.execute("INSERT INTO accounts (name, password) VALUES ('Applicant', 'x')")
+        for chunk_size in args.chunk_sizes:
+            with db.pool.connection() as conn:
+                conn.execute("DELETE FROM loan_applications")
+                conn.execute("BEGIN")
+                conn.executemany("INSERT INTO loan_applications (account_number, income, credit_score, "
+                                 "loan_amount, loan_term) VALUES (1, ?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            result = score_pending_loans(db, chunk_size=chunk_size)
+            print(f"chunk {chunk_size:>7,}: {result['applications']:,} applications in {result['seconds']:6.1f}s "
+                  f"({result['per_second']:9,.0f}/s, {result['approved']:,} approved)")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_model_swap.py
+"""Prediction latency while the served loan model is swapped.
+
+Builds a scratch registry with the shipped model (v0001) and a larger
+forest (v0002), then keeps a thread making single predictions on
+distinct applications (every call misses the cache) while another
+process activates the two versions in turn. Latency is reported for
+calls within SWAP_WINDOW of a swap, which covers the background load
+and verification, and for the rest, with the longest gap between two
+completed predictions: a pause for the swap would show there. For
+comparison, the time a prediction would wait if the model were dropped
+and reloaded on demand, as before the registry, is the load time of
+each version.
+
+Run from the project root:
+    python -m benchmarks.bench_model_swap [--swaps 6] [--trees 300] [--check-interval 1.0]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from utils import predictor
+from utils.model_registry import ModelRegistry
+from utils.predictor import FEATURES, predict_loan_eligibility
+
+# Seconds either side of a swap counted as "around" it
+SWAP_WINDOW = 0.05
+
+def applications(n, seed):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(5000, 200000, n), rng.integers(300, 851, n),
+                            rng.integers(1000, 500000, n), rng.integers(6, 361, n)])
+
+def build_registry(root, trees):
+    from sklearn.ensemble import RandomForestClassifier
+    registry = ModelRegistry(root)
+    registry.register(predictor.MODEL_PATH, FEATURES, activate=True)
+    X = applications(20000, seed=1)
+    y = (X[:, 1] > 600) & (X[:, 2] < X[:, 0] * 3)
+    model = RandomForestClassifier(n_estimators=trees, max_depth=12, random_state=0, n_jobs=-1).fit(X, y)
+    path = os.path.join(root, "larger.pkl")
+    joblib.dump(model, path)
+    registry.register(path, FEATURES)
+    os.remove(path)
+    return registry
+
+def percentiles(latencies):
+    if not latencies:
+        return "no calls"
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    return f"{len(latencies):7,} calls  p50 {p50:7.1f} us  p99 {p99:7.1f} us  max {max(latencies) * 1e3:7.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--swaps", type=int, default=6)
+    parser.add_argument("--trees", type=int, default=300, help="trees in the larger version")
+    parser.add_argument("--check-interval", type=float, default=predictor.MODEL_CHECK_INTERVAL)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    root = tempfile.mkdtemp()
+    try:
+        registry = build_registry(root, args.trees)
+        predictor.REGISTRY_DIR = root
+        predictor.MODEL_CHECK_INTERVAL = args.check_interval
+        predictor.get_forest()
+
+        calls = []  # (finished, latency)
+        stop = threading.Event()
+        def predict_continuously():
+            for row in applications(10**7, seed=2).tolist():
+                if stop.is_set():
+                    return
+                start = time.perf_counter()
+                predict_loan_eligibility(*row)
+                end = time.perf_counter()
+                calls.append((end, end - start))
+        worker = threading.Thread(target=predict_continuously)
+        worker.start()
+
+        swaps = []  # (pointer replaced, model swapped in)
+        time.sleep(1)
+        for i in range(args.swaps):
+            version = registry.versions()[(i + 1) % 2]
+            subprocess.run([sys.executable, "-m", "utils.model_registry", "--registry", root, "activate", version],
+                           check=True)
+            activated = time.perf_counter()
+            while predictor.current_model_version() != version:
+                time.sleep(0.001)
+            swaps.append((activated, time.perf_counter()))
+            time.sleep(1)
+        stop.set()
+        worker.join()
+
+        around, steady = [], []
+        for finished, latency in calls:
+            near = any(abs(finished - swapped) <= SWAP_WINDOW for _, swapped in swaps)
+            (around if near else steady).append(latency)
+        finished = np.array([c[0] for c in calls])
+        load_times = {}
+        for version in registry.versions():
+            start = time.perf_counter()
+            registry.load_forest(version)
+            load_times[version] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(root)
+
+    for version, seconds in load_times.items():
+        forest_size = "shipped model" if version == "v0001" else f"{args.trees} trees, depth 12"
+        print(f"load + verify {version} ({forest_size}): {seconds * 1e3:8.2f} ms")
+    delays = [b - a for a, b in swaps]
+    print(f"{len(swaps)} swaps, activation to swap: mean {np.mean(delays) * 1e3:.0f} ms, "
+          f"max {max(delays) * 1e3:.0f} ms (check interval {args.check_interval:g}s)")
+    print(f"steady:            {percentiles(steady)}")
+    print(f"within {SWAP_WINDOW * 1e3:.0f} ms of a swap: {percentiles(around)}")
+    print(f"longest gap between predictions: {np.diff(finished).max() * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    main()
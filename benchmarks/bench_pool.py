@@ -0,0 +1,59 @@
+# benchmarks/bench_pool.py
+"""Compare DatabaseManager throughput with and without connection pooling.
+
+Run from the project root:
+    python -m benchmarks.bench_pool [--ops 5000] [--threads 4]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from database.db_manager import DatabaseManager
+
+def run_workload(db: DatabaseManager, account_number: int, ops: int) -> None:
+    """Teller-style mix: balance checks, deposits and short history reads."""
+    for i in range(ops):
+        step = i % 4
+        if step == 0:
+            db.deposit(account_number, 10)
+        elif step == 3:
+            db.get_transactions(account_number, limit=10)
+        else:
+            db.get_balance(account_number)
+
+def measure(pool_size: int, ops: int, threads: int) -> float:
+    """Return operations per second for the given pool size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), pool_size=pool_size)
+        db.initialize_database()
+        accounts = [db.create_account(f"Bench {i}", "password123") for i in range(threads)]
+
+        workers = [
+            threading.Thread(target=run_workload, args=(db, acc, ops // threads))
+            for acc in accounts
+        ]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        db.close()
+        return (ops // threads) * threads / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    for threads in sorted({1, args.threads}):
+        before = measure(0, args.ops, threads)
+        after = measure(threads, args.ops, threads)
+        print(f"threads={threads}: open/close per call {before:,.0f} ops/s | "
+              f"pooled {after:,.0f} ops/s | speedup x{after / before:.2f}")
+
+if __name__ == "__main__":
+    main()
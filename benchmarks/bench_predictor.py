@@ -0,0 +1,63 @@
+# benchmarks/bench_predictor.py
+"""Loan eligibility scoring latency: per row against batched.
+
+Compares the old per-call path (one-row DataFrame into ``model.predict``),
+the fast single-row path (distinct rows, so every call misses the
+prediction cache), a repeated check answered from the cache and one
+batched call over many rows.
+
+Run from the project root:
+    python -m benchmarks.bench_predictor [--rows 100000] [--single 2000]
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils import predictor
+from utils.predictor import FEATURES, predict_loan_eligibility, predict_loan_eligibility_batch, prediction_cache
+
+def per_call(X, predict):
+    start = time.perf_counter()
+    for row in X.tolist():
+        predict(*row)
+    return (time.perf_counter() - start) / len(X)
+
+def dataframe_predict(income, credit, loan_amount, loan_term):
+    """The previous implementation of predict_loan_eligibility."""
+    df = pd.DataFrame({"Income": [income], "CreditScore": [credit],
+                       "LoanAmount": [loan_amount], "LoanTerm": [loan_term]})
+    return predictor.get_model().predict(df)[0] == 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="rows in the batched call")
+    parser.add_argument("--single", type=int, default=2000, help="rows scored one call at a time")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(5000, 200000, args.rows), rng.integers(300, 851, args.rows),
+                         rng.integers(1000, 500000, args.rows), rng.integers(6, 361, args.rows)])
+
+    old = per_call(X[:args.single], dataframe_predict)
+    fast = per_call(X[:args.single], predict_loan_eligibility)
+    cached = per_call(np.repeat(X[:1], args.single, axis=0), predict_loan_eligibility)
+    start = time.perf_counter()
+    predict_loan_eligibility_batch(X)
+    batched = (time.perf_counter() - start) / len(X)
+    start = time.perf_counter()
+    predictor.get_model().predict(pd.DataFrame(X, columns=list(FEATURES)))
+    sklearn_batched = (time.perf_counter() - start) / len(X)
+
+    print(f"DataFrame + model.predict per row: {old * 1e6:10.1f} us/row")
+    print(f"fast single-row path:              {fast * 1e6:10.1f} us/row (x{old / fast:.0f})")
+    print(f"repeated check (cached):           {cached * 1e6:10.1f} us/row (x{old / cached:.0f})")
+    print(f"model.predict on {len(X):,} rows:    {sklearn_batched * 1e6:10.2f} us/row")
+    print(f"batched, {len(X):,} rows:            {batched * 1e6:10.2f} us/row (x{old / batched:.0f})")
+    print(f"prediction cache: {prediction_cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_search.py
+"""Latency of DatabaseManager.search_accounts on a large bank.
+
+Fills a database with synthetic account holders (the FTS triggers index them
+as they are inserted), then times first-page searches by name, short name
+fragment and account number prefix, a deep page, and the old approach of
+loading every account and filtering in Python.
+
+Run from the project root:
+    python -m benchmarks.bench_search [--accounts 1000000] [--repeat 20]
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+
+FIRST_NAMES = ["Aarav", "Asha", "Rahul", "Priya", "Vikram", "Neha", "Arjun", "Kavya", "Rohan", "Ishita",
+               "Sanjay", "Meera", "Karan", "Divya", "Aditya", "Pooja", "Nikhil", "Ananya", "Varun", "Sneha"]
+LAST_NAMES = ["Sharma", "Verma", "Kumar", "Singh", "Patel", "Gupta", "Reddy", "Iyer", "Nair", "Joshi",
+              "Mehta", "Chopra", "Banerjee", "Das", "Kapoor", "Malhotra", "Rao", "Bose", "Menon", "Pillai"]
+
+def make_database(tmp: str, accounts: int) -> DatabaseManager:
+    db = DatabaseManager(os.path.join(tmp, "bench.db"))
+    db.initialize_database()
+    rng = random.Random(42)
+    # Skip bcrypt: the benchmark only needs account rows
+    with db.pool.connection() as conn:
+        for start in range(0, accounts, 100000):
+            conn.executemany(
+                "INSERT INTO accounts (name, password) VALUES (?, 'x')",
+                [(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randrange(10000)}",)
+                 for _ in range(min(100000, accounts - start))]
+            )
+            conn.commit()
+    return db
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples), max(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger("database.db_manager").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        db = make_database(tmp, args.accounts)
+        print(f"Inserted and indexed {args.accounts:,} accounts in {time.perf_counter() - start:.1f}s")
+
+        _, deep_cursor = db.search_accounts("sharma", page_size=args.accounts // 40)
+        cases = [
+            ("name 'sharma'", lambda: db.search_accounts("sharma")),
+            ("name 'kavya iyer'", lambda: db.search_accounts("kavya iyer")),
+            ("rare name 'pillai 9999'", lambda: db.search_accounts("pillai 9999")),
+            ("short 'ra' (LIKE)", lambda: db.search_accounts("ra")),
+            ("number prefix '4242'", lambda: db.search_accounts("4242")),
+            ("deep page of 'sharma'", lambda: db.search_accounts("sharma", after=deep_cursor)),
+            ("no match 'zzzz'", lambda: db.search_accounts("zzzz")),
+            ("with last activity", lambda: db.search_accounts("sharma", include_last_activity=True)),
+        ]
+        for label, fn in cases:
+            (rows, _), median, worst = timed(fn, args.repeat)
+            print(f"{label:26} {median:8.2f} ms median {worst:8.2f} ms max ({len(rows)} rows)")
+
+        def python_filter():
+            return [a for a in db.get_all_accounts() if "sharma" in a['name'].lower()][:100]
+        rows, median, worst = timed(python_filter, max(1, args.repeat // 10))
+        print(f"{'old: load all + filter':26} {median:8.2f} ms median {worst:8.2f} ms max ({len(rows)} rows)")
+        db.close()
+
+if __name__ == "__main__":
+    main()
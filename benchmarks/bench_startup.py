@@ -0,0 +1,98 @@
+# benchmarks/bench_startup.py
+"""Application startup time: imports, dashboard first paint and model load.
+
+Each run starts a fresh interpreter in a scratch directory (so it gets its
+own bank.db) and times, in order:
+
+  import main             what ``python main.py`` imports before the login window
+  import bank_dashboard   what logging in imports before the dashboard is built
+  first paint             building BankDashboard until Tk has drawn it
+  first prediction        the first loan eligibility check (loads the model)
+  next prediction         a second check, model already loaded
+
+First paint needs a display; without one it is reported as skipped.
+Medians over the runs are printed, and appended as one JSON line to
+``--output`` when given, to track startup time across changes.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [--runs 5] [--output startup_times.jsonl]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ("import_main", "import_dashboard", "first_paint", "first_prediction", "next_prediction")
+
+CHILD = """
+import json, time
+timings = {}
+start = time.perf_counter()
+import main
+timings["import_main"] = time.perf_counter() - start
+
+start = time.perf_counter()
+import ui.bank_dashboard
+timings["import_dashboard"] = time.perf_counter() - start
+
+from database.db_manager import create_tables, create_account
+create_tables()
+account = create_account("Startup Bench", "password123")
+
+timings["first_paint"] = None
+try:
+    start = time.perf_counter()
+    dashboard = ui.bank_dashboard.BankDashboard(account)
+    dashboard.root.update()
+    timings["first_paint"] = time.perf_counter() - start
+    dashboard.root.destroy()
+except Exception as e:
+    if type(e).__name__ != "TclError":
+        raise
+
+from utils.predictor import predict_loan_eligibility
+for stage in ("first_prediction", "next_prediction"):
+    start = time.perf_counter()
+    predict_loan_eligibility(45000, 700, 100000, 60)
+    timings[stage] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+def run_once():
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               PYTHONWARNINGS="ignore")
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", CHILD], cwd=tmp, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        timings = json.loads(out.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - start
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="append the medians as a JSON line to this file")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {}
+    for stage in STAGES + ("process",):
+        values = [r[stage] for r in runs if r[stage] is not None]
+        medians[stage] = statistics.median(values) if values else None
+        shown = f"{medians[stage] * 1000:9.1f} ms" if values else "  skipped (no display)"
+        print(f"{stage:<18}{shown}")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({"recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": args.runs,
+                                "seconds": medians}) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_statement_render.py
+"""Statement rendering speed in pages per second, without the database.
+
+Renders the same synthetic statements with StatementTemplate and with the
+previous layout, which wrote every value with its own ``cell()`` call and
+set fonts and headers up again on each page. Single process; multiply by
+the worker count for a statement run. The template repeats the column
+headings on every page, so long statements can run a page longer; the
+speed-up is reported per statement.
+
+Run from the project root:
+    python -m benchmarks.bench_statement_render [--statements 500] [--rows 5 30 120]
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from utils.report_generator import build_statement_pdf, _pdf_amount, _pdf_text
+
+class CellStatementPDF(FPDF):
+    def header(self):
+        self.set_font('Helvetica', 'B', 12)
+        self.cell(0, 10, 'Bank Account Statement', border=0, align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(5)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Helvetica', 'I', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', border=0, align='C')
+
+def render_with_cells(statement):
+    """The per-cell layout StatementTemplate replaced."""
+    pdf = CellStatementPDF()
+    pdf.add_page()
+    pdf.set_font('Helvetica', '', 10)
+    for line in (f"Account Number: {statement['account_number']}",
+                 f"Opening Balance: {_pdf_amount(statement['opening_balance'])}"):
+        pdf.cell(0, 8, line, border=0, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(6)
+    pdf.set_fill_color(200, 220, 255)
+    for name, width in (('Date', 30), ('Type', 40), ('Amount', 40)):
+        pdf.cell(width, 10, name, border=1, align='C', fill=True)
+    pdf.cell(80, 10, 'Description', border=1, align='C', fill=True, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    for t in statement['transactions']:
+        pdf.cell(30, 10, t['timestamp'][:10], border=1)
+        pdf.cell(40, 10, t['type'], border=1)
+        pdf.cell(40, 10, _pdf_amount(t['amount']), border=1, align='R')
+        pdf.cell(80, 10, _pdf_text(t['description']), border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(0, 8, f"Closing Balance: {_pdf_amount(statement['closing_balance'])}", border=0)
+    return pdf
+
+def synthetic_statement(rows):
+    return {
+        'account_number': 123456, 'from_date': '2024-01-01', 'to_date': '2024-01-31',
+        'opening_balance': Decimal('10000.00'), 'total_credits': Decimal('0.00'),
+        'total_debits': Decimal('0.00'), 'closing_balance': Decimal('10000.00'),
+        'transactions': [
+            {'transaction_id': i, 'account_number': 123456, 'timestamp': f'2024-01-{1 + i % 31:02d} 09:30:00',
+             'type': ('Deposit', 'Withdrawal', 'Transfer Out')[i % 3], 'amount': Decimal(i * 37) / 4,
+             'description': f'Payment reference {i:08d}'}
+            for i in range(rows)
+        ],
+    }
+
+def measure(render, statement, count):
+    pages = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        pdf = render(statement)
+        bytes(pdf.output())
+        pages += pdf.page_no()
+    elapsed = time.perf_counter() - start
+    return count / elapsed, pages / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--statements", type=int, default=500)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5, 30, 120], help="line items per statement")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        statement = synthetic_statement(rows)
+        cell_rate, cell_pages = measure(render_with_cells, statement, args.statements)
+        template_rate, template_pages = measure(build_statement_pdf, statement, args.statements)
+        print(f"{rows:>4} rows: per-cell {cell_rate:7,.0f} statements/s {cell_pages:7,.0f} pages/s | "
+              f"template {template_rate:7,.0f} statements/s {template_pages:7,.0f} pages/s "
+              f"(x{template_rate / cell_rate:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_statements.py
+"""Statement run throughput against the number of worker processes.
+
+Builds a bank of accounts with a month of history each, then renders every
+statement with utils.statement_run once per worker count. Throughput
+should grow roughly linearly with workers up to the number of cores.
+
+Run from the project root:
+    python -m benchmarks.bench_statements [--accounts 20000] [--per-account 30] [--workers 1 2 4 8]
+"""
+import argparse
+import logging
+import os
+import tempfile
+from datetime import date
+
+from database.db_manager import DatabaseManager
+from utils.statement_run import run_statements
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=20000)
+    parser.add_argument("--per-account", type=int, default=30, help="transactions per statement")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--shard-size", type=int, default=500)
+    args = parser.parse_args()
+    for name in ("database.db_manager", "utils.statement_run"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    print(f"{os.cpu_count()} CPUs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        db.initialize_database()
+        # Skip bcrypt: the benchmark only needs account rows
+        with db.pool.connection() as conn:
+            conn.executemany("INSERT INTO accounts (name, password) VALUES (?, 'x')",
+                             [(f"Holder {i}",) for i in range(args.accounts)])
+        total = args.accounts * args.per_account
+        for start in range(0, total, 100000):
+            db.apply_batch([{'type': 'Deposit', 'account_number': 1 + i % args.accounts, 'amount': 10}
+                            for i in range(start, min(start + 100000, total))])
+        today = date.today().isoformat()
+
+        baseline = None
+        for workers in args.workers:
+            result = run_statements(db, os.path.join(tmp, f"run-{workers}"), today, today,
+                                    workers=workers, shard_size=args.shard_size)
+            baseline = baseline or result['statements_per_second']
+            print(f"{workers:>2} workers: {result['seconds']:7.2f}s "
+                  f"{result['statements_per_second']:8,.0f} statements/s {result['pages_per_second']:8,.0f} pages/s "
+                  f"(x{result['statements_per_second'] / baseline:.2f})")
+        db.close()
+
+if __name__ == "__main__":
+    main()
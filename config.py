@@ -0,0 +1,131 @@
+# config.py
+"""Application configuration settings."""
+
+# Database settings
+DATABASE_PATH = "bank.db"
+
+# Connection pool: number of long-lived connections kept open per
+# DatabaseManager (0 disables pooling), and how long a caller waits for a
+# free connection before giving up.
+DB_POOL_SIZE = 5
+DB_POOL_TIMEOUT = 30.0
+
+# SQLite storage profiles. journal_mode is persistent and is set once by
+# DatabaseManager.initialize_database(); the other PRAGMAs are per connection
+# and applied to every pooled connection. In WAL mode readers never block
+# writers. synchronous=NORMAL can lose the last few commits on power loss
+# (never corrupts); FULL syncs every commit. cache_size is in KiB when
+# negative, mmap_size and busy_timeout in bytes and milliseconds.
+DB_STORAGE_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -64000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Pre-WAL behaviour, kept for comparison benchmarks
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
+DB_STORAGE_PROFILE = "durable"
+
+# Rows fetched per page of transaction history
+TRANSACTION_PAGE_SIZE = 50
+
+# Accounts fetched per page of account search results
+ACCOUNT_PAGE_SIZE = 100
+
+# Streaming exports: rows read per fetchmany() and bytes buffered per write
+EXPORT_FETCH_SIZE = 5000
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+# Rows per file (one row group each) in the columnar analytics export
+COLUMNAR_CHUNK_SIZE = 100000
+
+# Online backups copy this many pages per step, pausing between steps so the
+# copy does not hog disk I/O (4096-byte pages: 1024 pages = 4 MiB)
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_SLEEP = 0.01
+
+# Transactions older than ARCHIVE_AFTER_DAYS are moved out of bank.db into
+# one archive database per year under ARCHIVE_DIR (relative to the database
+# file), ARCHIVE_BATCH_SIZE rows per write transaction. SQLite attaches at
+# most 10 databases per connection, so only the ARCHIVE_YEARLY_FILES newest
+# years keep a file of their own; earlier years are folded into one
+# transactions_older.db.
+ARCHIVE_DIR = "archive"
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 10000
+ARCHIVE_YEARLY_FILES = 8
+
+# Bank-wide statement runs (utils/statement_run.py): accounts per shard, the
+# unit of work handed to a worker process and of checkpointing, and the
+# number of worker processes (None: one per CPU)
+STATEMENT_SHARD_SIZE = 1000
+STATEMENT_WORKERS = None
+
+# Pending loan applications read, scored and written back per transaction by
+# services/loan_scoring.py
+LOAN_SCORING_CHUNK_SIZE = 20000
+
+# Operations written per transaction by DatabaseManager.apply_batch
+BATCH_CHUNK_SIZE = 5000
+
+# Transaction types that take money out of an account
+DEBIT_TYPES = ("Withdrawal", "Transfer Out")
+
+# Money is stored as integer minor units (paise); amounts cross the
+# DatabaseManager boundary in rupees as Decimal
+CURRENCY_DECIMALS = 2
+
+# Milliseconds after the customer dashboard appears before the loan model is
+# loaded on a background thread (None: load on the first eligibility check)
+PREDICTOR_WARMUP_DELAY_MS = 1500
+
+# Single loan eligibility checks are memoised: at most PREDICTION_CACHE_SIZE
+# entries, each kept for PREDICTION_CACHE_TTL seconds. In bucketed mode
+# (LOAN_FORM_BUCKETED for the customer form) Income, CreditScore, LoanAmount
+# and LoanTerm are rounded to the nearest multiple of these steps and the
+# rounded application is scored, so near-identical checks share a decision.
+PREDICTION_CACHE_SIZE = 4096
+PREDICTION_CACHE_TTL = 600.0
+PREDICTION_BUCKETS = (1000, 5, 1000, 1)
+LOAN_FORM_BUCKETED = False
+
+# Model training (train_model.py): rows streamed per chunk, cross-validation
+# folds, hyperparameter candidates tried, and the seed behind every random
+# choice. A test set of TRAINING_HOLDOUT_FRACTION is held out only when there
+# are at least TRAINING_MIN_HOLDOUT_ROWS rows.
+TRAINING_CHUNK_SIZE = 100000
+TRAINING_CV_FOLDS = 5
+TRAINING_SEARCH_ITERATIONS = 10
+TRAINING_SEED = 42
+TRAINING_HOLDOUT_FRACTION = 0.2
+TRAINING_MIN_HOLDOUT_ROWS = 50
+
+# Seconds the admin dashboard may reuse DatabaseManager.get_system_stats()
+STATS_CACHE_TTL = 5.0
@@ -0,0 +1,256 @@
+# database/archive.py
+"""Hot/cold partitioning of the transaction ledger.
+
+Transactions older than the archive horizon are moved out of bank.db into
+one database per calendar year under ``ARCHIVE_DIR``::
+
+    archive/transactions_older.db
+    archive/transactions_2023.db
+    archive/transactions_2024.db
+
+Each archive holds a ``transactions`` table with the same columns and
+indexes as the live one. DatabaseManager attaches the archives a query's
+date range reaches as ``archive_<year>`` and reads them after the hot
+table, so history, counts and exports keep covering every tier while
+day-to-day lookups only touch the small hot table and its indexes.
+
+SQLite attaches at most ten databases to a connection, so only the
+ARCHIVE_YEARLY_FILES newest years keep their own file. Earlier years go
+to ``transactions_older.db``, and when a new year pushes a yearly file
+out of that window, its rows are copied into the older archive and the
+file is deleted. The copy also records the year in the older archive's
+``folded_years`` table, in the same transaction. Readers ignore a yearly
+file listed there, and the next run deletes it if a crash left it behind.
+
+Rows are moved in batches, oldest first. Each batch is first committed to
+the archive and only then deleted from bank.db: in WAL mode a transaction
+spanning attached databases is not atomic across them, so this order makes
+a crash leave a row in both tiers rather than in neither. Every run first
+deletes such rows from bank.db, finishing the interrupted batch, and until
+then ``count_transactions`` discounts them and the other readers skip them.
+
+While an incremental backup set is claimed, the deletes are recorded in
+``change_log`` like any other, so incremental backups of bank.db stay
+consistent; archive files only ever grow and are backed up by copying them.
+
+Command line (for cron jobs):
+    python -m database.archive [--older-than-days 365]
+"""
+import os
+import sqlite3
+import argparse
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_YEARLY_FILES
+from database.db_manager import ARCHIVE_OLDER, ARCHIVE_SCHEMA_PREFIX
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        transaction_id INTEGER PRIMARY KEY,
+        account_number INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        description TEXT,
+        timestamp DATETIME NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_transactions_account_timestamp ON transactions (account_number, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp)",
+]
+
+TRANSACTION_COLUMNS = "transaction_id, account_number, type, amount, description, timestamp"
+
+OLDER_FILE = "transactions_older.db"
+
+def _create_archive(path: str) -> None:
+    """Create the archive database at ``path`` if it does not exist yet."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        for statement in ARCHIVE_SCHEMA:
+            conn.execute(statement)
+        if path.endswith(OLDER_FILE):
+            conn.execute("CREATE TABLE IF NOT EXISTS folded_years (year TEXT PRIMARY KEY)")
+        conn.commit()
+    finally:
+        conn.close()
+
+def _archive_path(db, schema: str) -> str:
+    return os.path.join(db.archive_dir, f"transactions_{schema[len(ARCHIVE_SCHEMA_PREFIX):]}.db")
+
+def _fold_year(db, year: int) -> None:
+    """Copy a yearly archive into the older one and mark the year folded."""
+    older_path = os.path.join(db.archive_dir, OLDER_FILE)
+    _create_archive(older_path)
+    conn = sqlite3.connect(older_path, isolation_level=None)
+    try:
+        conn.execute("ATTACH DATABASE ? AS folding", (_archive_path(db, f"{ARCHIVE_SCHEMA_PREFIX}{year}"),))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"INSERT OR IGNORE INTO main.transactions ({TRANSACTION_COLUMNS}) "
+                         f"SELECT {TRANSACTION_COLUMNS} FROM folding.transactions")
+            conn.execute("INSERT OR IGNORE INTO folded_years (year) VALUES (?)", (str(year),))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+
+def _remove_folded(db, conn: sqlite3.Connection) -> None:
+    """Delete yearly archives whose rows the older archive already holds."""
+    older_path = os.path.join(db.archive_dir, OLDER_FILE)
+    if not os.path.exists(older_path):
+        return
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    for year in db.folded_years(older_path):
+        schema = ARCHIVE_SCHEMA_PREFIX + year
+        if schema in attached:
+            conn.execute(f"DETACH DATABASE {schema}")
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(_archive_path(db, schema) + suffix)
+            except FileNotFoundError:
+                pass
+    db.refresh_archives()
+
+def _pending_years(cursor: sqlite3.Cursor, cutoff: str) -> set:
+    """Years with transactions older than ``cutoff``: one index seek per year."""
+    years = set()
+    start = ""
+    while True:
+        row = cursor.execute("SELECT MIN(timestamp) FROM main.transactions WHERE timestamp >= ? AND timestamp < ?",
+                             (start, cutoff)).fetchone()
+        if row[0] is None:
+            return years
+        years.add(int(row[0][:4]))
+        start = f"{int(row[0][:4]) + 1:04d}-01-01"
+
+def archive_transactions(db, older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Move transactions older than ``older_than_days`` into the archives.
+
+    Returns the number of rows moved, the rows of an interrupted batch
+    recovered, the cutoff, the years touched and the years folded into the
+    older archive. ``progress(done, total)`` is called after every batch;
+    setting ``cancel_event`` stops between batches and returns None,
+    keeping the batches already moved. Running it again is always safe.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+    os.makedirs(db.archive_dir, exist_ok=True)
+    moved = recovered = 0
+    years = set()
+
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        db.refresh_archives()
+        _remove_folded(db, conn)
+
+        # The yearly files to keep: the newest among those there and those
+        # this run may create. Older ones are folded before anything is
+        # attached, so the attach limit is never exceeded.
+        pending = _pending_years(cursor, cutoff)
+        yearly = {int(s[len(ARCHIVE_SCHEMA_PREFIX):]) for s in db.archives if s != ARCHIVE_OLDER}
+        keep = set(sorted(yearly | pending)[-ARCHIVE_YEARLY_FILES:])
+        folded = sorted(yearly - keep)
+        for year in folded:
+            _fold_year(db, year)
+        if folded:
+            _remove_folded(db, conn)
+
+        # Finish a batch a crash left in both tiers
+        for schema in db.transaction_sources(conn)[1:]:
+            db.begin_write(cursor)
+            try:
+                cursor.execute(
+                    f"""
+                    DELETE FROM main.transactions
+                    WHERE timestamp <= (SELECT MAX(timestamp) FROM {schema}.transactions)
+                      AND EXISTS (SELECT 1 FROM {schema}.transactions a
+                                  WHERE a.transaction_id = transactions.transaction_id)
+                    """
+                )
+                recovered += cursor.rowcount
+                cursor.execute("COMMIT")
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+        if recovered:
+            logger.warning(f"Removed {recovered} transactions an interrupted run had already archived")
+
+        total = cursor.execute("SELECT COUNT(*) FROM main.transactions WHERE timestamp < ?",
+                               (cutoff,)).fetchone()[0]
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (transaction_id INTEGER PRIMARY KEY)")
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"Archiving cancelled after {moved} transactions")
+                return None
+            row = cursor.execute("SELECT MIN(timestamp) FROM main.transactions WHERE timestamp < ?",
+                                 (cutoff,)).fetchone()
+            if row[0] is None:
+                break
+
+            # A batch never spans years, so it lands in a single archive
+            year = row[0][:4]
+            schema = ARCHIVE_SCHEMA_PREFIX + year if int(year) in keep else ARCHIVE_OLDER
+            if schema not in db.archives:
+                _create_archive(_archive_path(db, schema))
+                db.refresh_archives()
+            # Attach outside a transaction
+            if schema not in db.transaction_sources(conn, f"{year}-01-01", f"{year}-12-31"):
+                raise RuntimeError(f"Archive {schema} does not cover {year}")
+            bound = min(cutoff, f"{int(year) + 1:04d}-01-01")
+
+            cursor.execute("DELETE FROM temp.archive_batch")
+            cursor.execute(
+                "INSERT INTO temp.archive_batch SELECT transaction_id FROM main.transactions "
+                "WHERE timestamp < ? ORDER BY timestamp LIMIT ?",
+                (bound, batch_size)
+            )
+            # Archive first and commit, then delete: see the module docstring
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute(
+                    f"INSERT OR IGNORE INTO {schema}.transactions ({TRANSACTION_COLUMNS}) "
+                    f"SELECT {TRANSACTION_COLUMNS} FROM main.transactions "
+                    "WHERE transaction_id IN (SELECT transaction_id FROM temp.archive_batch)"
+                )
+                cursor.execute("COMMIT")
+                db.begin_write(cursor)
+                cursor.execute(
+                    "DELETE FROM main.transactions "
+                    "WHERE transaction_id IN (SELECT transaction_id FROM temp.archive_batch)"
+                )
+                count = cursor.rowcount
+                cursor.execute("COMMIT")
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            moved += count
+            years.add(int(year))
+            if progress:
+                progress(moved, total)
+
+    result = {"moved": moved, "recovered": recovered, "cutoff": cutoff, "years": sorted(years),
+              "folded": folded}
+    logger.info(f"Archived transactions: {result}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    from database.db_manager import db_manager
+    print(archive_transactions(db_manager, args.older_than_days, args.batch_size))
+
+if __name__ == "__main__":
+    main()
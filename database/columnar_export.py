@@ -0,0 +1,205 @@
+# database/columnar_export.py
+"""Typed, compressed columnar export of the ledger for analytics.
+
+Layout under the output directory::
+
+    transactions/date=YYYY-MM-DD/part-<first transaction_id>.<ext>
+    accounts/part-<n>.<ext>
+    loan_applications/part-<n>.<ext>
+    _export_state.json
+
+Files are Parquet when pandas has a Parquet engine (pyarrow or fastparquet)
+installed, otherwise compressed NumPy ``.npz`` archives with one typed array
+per column. Every file holds one chunk of at most ``chunk_size`` rows, so
+memory stays flat and each file is one row group. Money stays in integer
+minor units (``*_minor`` columns) and timestamps are UTC ``datetime64``.
+
+Transactions are append-only, so they are exported incrementally: only rows
+after the ``last_transaction_id`` recorded in the state file are written,
+from the yearly archives (database/archive.py) as well as bank.db.
+Accounts and loan applications change in place and are small, so they are
+rewritten as a full snapshot on every run.
+"""
+import os
+import json
+import shutil
+import threading
+import logging
+import importlib.util
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import COLUMNAR_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "_export_state.json"
+
+# (column, dtype) per table; "datetime" columns hold SQLite timestamp text
+TRANSACTION_COLUMNS = [
+    ("transaction_id", "int64"), ("account_number", "int64"), ("type", "string"),
+    ("amount_minor", "int64"), ("description", "string"), ("timestamp", "datetime"),
+]
+SNAPSHOT_TABLES = {
+    # Never export password hashes
+    "accounts": (
+        "SELECT account_number, name, balance, created_at FROM accounts ORDER BY account_number",
+        [("account_number", "int64"), ("name", "string"), ("balance_minor", "int64"),
+         ("created_at", "datetime")],
+    ),
+    "loan_applications": (
+        "SELECT application_id, account_number, income, credit_score, loan_amount, loan_term, "
+        "status, decision_date FROM loan_applications ORDER BY application_id",
+        [("application_id", "int64"), ("account_number", "int64"), ("income", "float64"),
+         ("credit_score", "int64"), ("loan_amount", "float64"), ("loan_term", "int64"),
+         ("status", "string"), ("decision_date", "datetime")],
+    ),
+}
+
+def parquet_available() -> bool:
+    """True if pandas can write Parquet in this environment."""
+    return any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet"))
+
+def _frame(rows: List[Tuple], columns: List[Tuple[str, str]]) -> pd.DataFrame:
+    """Build a typed DataFrame from raw SQLite rows."""
+    df = pd.DataFrame.from_records(rows, columns=[name for name, _ in columns])
+    for name, dtype in columns:
+        if dtype == "datetime":
+            df[name] = pd.to_datetime(df[name], errors="coerce")
+        else:
+            df[name] = df[name].astype(dtype)
+    return df
+
+def _write_part(df: pd.DataFrame, path: str, fmt: str) -> None:
+    """Write one chunk atomically as Parquet or compressed npz."""
+    tmp_path = f"{path}.tmp"
+    if fmt == "parquet":
+        df.to_parquet(tmp_path, index=False, compression="snappy")
+    else:
+        arrays = {}
+        for name in df.columns:
+            column = df[name]
+            if pd.api.types.is_string_dtype(column):
+                # Fixed-width unicode keeps the archive free of pickled objects
+                arrays[name] = column.fillna("").to_numpy(dtype=str)
+            else:
+                arrays[name] = column.to_numpy()
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+def read_columnar(path: str) -> pd.DataFrame:
+    """Load a part file, or every part under a table directory, into one DataFrame."""
+    if os.path.isdir(path):
+        parts = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names if name.endswith((".parquet", ".npz"))
+        )
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat([read_columnar(part) for part in parts], ignore_index=True)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with np.load(path, allow_pickle=False) as archive:
+        return pd.DataFrame({name: archive[name] for name in archive.files})
+
+def load_state(out_dir: str) -> Dict:
+    """Return the saved export state, or a fresh one."""
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"last_transaction_id": 0}
+
+def _save_state(out_dir: str, state: Dict) -> None:
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def export_columnar(db, out_dir: str, fmt: Optional[str] = None, chunk_size: int = COLUMNAR_CHUNK_SIZE,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Export new transactions and snapshot accounts and loans under ``out_dir``.
+
+    ``fmt`` is "parquet" or "npz"; by default Parquet is used when available.
+    Returns row counts per table and the new ``last_transaction_id``.
+    ``progress(done, total)`` counts new transactions; setting
+    ``cancel_event`` stops between chunks and returns None, keeping what was
+    written so the next run resumes from there.
+    """
+    fmt = fmt or ("parquet" if parquet_available() else "npz")
+    if fmt not in ("parquet", "npz"):
+        raise ValueError(f"Unknown columnar format: {fmt}")
+    os.makedirs(out_dir, exist_ok=True)
+    state = load_state(out_dir)
+    last_id = state["last_transaction_id"]
+    result = {"format": fmt}
+
+    # One snapshot for the whole run, so the tables agree with each other
+    with db.read_snapshot() as conn:
+        # Archived tiers hold the oldest ids, so read them first
+        sources = db.transaction_sources(conn)[::-1]
+        total = sum(
+            conn.execute(f"SELECT COUNT(*) FROM {schema}.transactions WHERE transaction_id > ?",
+                         (last_id,)).fetchone()[0]
+            for schema in sources
+        )
+        done = 0
+        for schema in sources:
+            # Starting after the last id read also skips a row that archiving
+            # has copied but not yet deleted
+            chunks = db.iter_query(
+                "SELECT transaction_id, account_number, type, amount, description, timestamp "
+                f"FROM {schema}.transactions WHERE transaction_id > ? ORDER BY transaction_id",
+                (last_id,), chunk_size
+            )
+            try:
+                for rows in chunks:
+                    if cancel_event is not None and cancel_event.is_set():
+                        logger.info(f"Columnar export cancelled after transaction {last_id}")
+                        return None
+                    df = _frame(rows, TRANSACTION_COLUMNS)
+                    # Timestamps are 'YYYY-MM-DD HH:MM:SS' text, so the date is a prefix
+                    for date, part in df.groupby([row[5][:10] for row in rows], sort=True):
+                        partition = os.path.join(out_dir, "transactions", f"date={date}")
+                        os.makedirs(partition, exist_ok=True)
+                        first_id = int(part["transaction_id"].iloc[0])
+                        _write_part(part, os.path.join(partition, f"part-{first_id:012d}.{fmt}"), fmt)
+                    done += len(rows)
+                    last_id = rows[-1][0]
+                    # Parts are named by their first row, so re-running a chunk
+                    # after a crash overwrites rather than duplicates it
+                    state["last_transaction_id"] = last_id
+                    _save_state(out_dir, state)
+                    if progress:
+                        progress(done, max(total, done))
+            finally:
+                chunks.close()
+        result["transactions"] = done
+        result["last_transaction_id"] = last_id
+
+        for table, (sql, columns) in SNAPSHOT_TABLES.items():
+            result[table] = _write_snapshot(db, out_dir, table, sql, columns, fmt, chunk_size)
+
+    state.update(format=fmt, exported_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    _save_state(out_dir, state)
+    logger.info(f"Columnar export to {out_dir}: {result}")
+    return result
+
+def _write_snapshot(db, out_dir: str, table: str, sql: str, columns: List[Tuple[str, str]],
+                    fmt: str, chunk_size: int) -> int:
+    """Rewrite a table directory from scratch and swap it into place."""
+    target = os.path.join(out_dir, table)
+    staging = f"{target}.new"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    count = 0
+    for n, rows in enumerate(db.iter_query(sql, (), chunk_size)):
+        _write_part(_frame(rows, columns), os.path.join(staging, f"part-{n:06d}.{fmt}"), fmt)
+        count += len(rows)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return count
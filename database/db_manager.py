@@ -1,33 +1,126 @@
 # database/db_manager.py
+import os
+import re
 import sqlite3
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 import bcrypt
-from typing import Optional, List, Tuple, Dict, Union
+from typing import Optional, List, Tuple, Dict, Union, Sequence, Iterable, Iterator
 import logging
+import atexit
+from contextlib import contextmanager
+import itertools
+import threading
+import time
+from config import (DATABASE_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+                    DB_STORAGE_PROFILES, DB_STORAGE_PROFILE, TRANSACTION_PAGE_SIZE,
+                    BATCH_CHUNK_SIZE, STATS_CACHE_TTL, ACCOUNT_PAGE_SIZE, EXPORT_FETCH_SIZE,
+                    ARCHIVE_DIR, DEBIT_TYPES)
+from database.pool import ConnectionPool
+from database.migrations import NEXT_CHANGE_TXN, apply_migrations
+from utils.money import to_minor, from_minor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# PRAGMAs applied to every new connection (journal_mode is database-wide)
+CONNECTION_PRAGMAS = ("synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+# Operation types accepted by apply_batch, mapped to ledger transaction types
+BATCH_OPERATION_TYPES = {"deposit": "Deposit", "withdrawal": "Withdrawal", "withdraw": "Withdrawal"}
+
+# Symbolic PRAGMA values as SQLite reports them back
+PRAGMA_VALUE_CODES = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+SIGNED_AMOUNT = f"CASE WHEN type IN {DEBIT_TYPES!r} THEN -amount ELSE amount END"
+
+# Final states of a loan application; anything else is still Pending
+LOAN_DECISIONS = ("Approved", "Rejected")
+
+# Yearly archive databases (database/archive.py), the one that older years
+# are folded into, and the schema name each is attached under
+ARCHIVE_FILE_PATTERN = re.compile(r"transactions_(\d{4}|older)\.db")
+ARCHIVE_SCHEMA_PREFIX = "archive_"
+ARCHIVE_OLDER = ARCHIVE_SCHEMA_PREFIX + "older"
+
+class ArchiveAttachError(RuntimeError):
+    """A transaction archive a query needs could not be attached.
+
+    Not an sqlite3.Error, so the history readers that turn database errors
+    into empty results let it through instead of returning partial history.
+    """
+
 class DatabaseManager:
     """A class to manage all database operations for the banking system."""
     
-    def __init__(self):
-        self.db_file = 'bank.db'
+    def __init__(self, db_file: str = DATABASE_PATH, pool_size: int = DB_POOL_SIZE,
+                 storage_profile: str = DB_STORAGE_PROFILE):
+        if storage_profile not in DB_STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {storage_profile}")
+        self.db_file = db_file
+        self.storage_profile = storage_profile
+        self.pragmas = DB_STORAGE_PROFILES[storage_profile]
+        self.pool = ConnectionPool(self.create_connection, size=pool_size, timeout=DB_POOL_TIMEOUT)
+        self._stats_cache = None  # (expires_at, stats)
+        self._stats_lock = threading.Lock()
+        self._account_fts = None  # whether migration 5 could index account names
+        # Cold transactions live in yearly archive databases next to db_file
+        self.archive_dir = os.path.join(os.path.dirname(os.path.abspath(db_file)), ARCHIVE_DIR)
+        self.archives: Dict[str, str] = {}  # schema name -> file
+        self._archive_dir_mtime = None
+        self.refresh_archives()
         
     def create_connection(self) -> sqlite3.Connection:
         """Create and return a database connection with proper settings."""
         try:
-            conn = sqlite3.connect(self.db_file, isolation_level=None)
+            # Pooled connections are handed between threads, one at a time
+            conn = sqlite3.connect(
+                self.db_file,
+                isolation_level=None,
+                check_same_thread=False,
+                timeout=self.pragmas["busy_timeout"] / 1000
+            )
             conn.execute("PRAGMA foreign_keys = ON")
+            for name in CONNECTION_PRAGMAS:
+                conn.execute(f"PRAGMA {name} = {self.pragmas[name]}")
             conn.row_factory = sqlite3.Row  # Enable dictionary-like access to rows
             return conn
         except sqlite3.Error as e:
             logger.error(f"Database connection error: {str(e)}")
             raise Exception(f"Database connection failed: {str(e)}")
+
+    def verify_storage_profile(self) -> Dict[str, Tuple]:
+        """Compare live PRAGMA values with the storage profile.
+
+        Returns a mapping of PRAGMA name to (expected, actual) for every
+        setting that did not take effect; an empty dict means all applied.
+        """
+        mismatches = {}
+        conn = self.pool.acquire()
+        try:
+            for name, expected in self.pragmas.items():
+                actual = conn.execute(f"PRAGMA {name}").fetchone()[0]
+                if name == "journal_mode":
+                    ok = str(actual).lower() == expected.lower()
+                else:
+                    ok = actual == PRAGMA_VALUE_CODES.get(name, {}).get(expected, expected)
+                if not ok:
+                    mismatches[name] = (expected, actual)
+            return mismatches
+        finally:
+            self.pool.release(conn)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.pool.close()
     
     def initialize_database(self) -> None:
         """Initialize the database with required tables and default admin."""
+        # Baseline schema; later changes are versioned in database/migrations.py
         tables = [
             """
             CREATE TABLE IF NOT EXISTS accounts (
@@ -73,10 +166,13 @@ class DatabaseManager:
             """
         ]
         
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             
+            # journal_mode is persistent and cannot change inside a transaction
+            cursor.execute(f"PRAGMA journal_mode = {self.pragmas['journal_mode']}")
+            
             # Create tables
             for table in tables:
                 cursor.execute(table)
@@ -92,13 +188,23 @@ class DatabaseManager:
                 )
             
             conn.commit()
+            
+            # Bring the schema up to date
+            apply_migrations(conn)
             logger.info("Database initialized successfully")
         except sqlite3.Error as e:
             conn.rollback()
             logger.error(f"Database initialization failed: {str(e)}")
             raise Exception(f"Database initialization failed: {str(e)}")
         finally:
-            conn.close()
+            self.pool.release(conn)
+            
+        mismatches = self.verify_storage_profile()
+        if mismatches:
+            for name, (expected, actual) in mismatches.items():
+                logger.warning(f"Storage profile '{self.storage_profile}': PRAGMA {name} is {actual}, expected {expected}")
+        else:
+            logger.info(f"Storage profile '{self.storage_profile}' active")
 
     # Account Management
     def create_account(self, name: str, password: str) -> Optional[int]:
@@ -112,7 +218,7 @@ class DatabaseManager:
             return None
             
         hashed_pwd = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
@@ -128,7 +234,7 @@ class DatabaseManager:
             logger.error(f"Account creation failed: {str(e)}")
             return None
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def authenticate_user(self, account_number: str, password: str) -> bool:
         """Authenticate a user with bcrypt password verification."""
@@ -138,7 +244,7 @@ class DatabaseManager:
             logger.warning(f"Authentication failed: invalid account number format {account_number}")
             return False
             
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
@@ -157,11 +263,11 @@ class DatabaseManager:
             logger.error(f"Authentication error: {str(e)}")
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def authenticate_admin(self, username: str, password: str) -> bool:
         """Authenticate an admin user."""
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
@@ -188,32 +294,52 @@ class DatabaseManager:
             logger.error(f"Admin authentication error: {str(e)}")
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    @staticmethod
+    def _parse_amount(amount) -> Optional[int]:
+        """Convert a positive rupee amount to paise, or None if it is invalid."""
+        try:
+            minor = to_minor(amount)
+        except ValueError:
+            return None
+        return minor if minor > 0 else None
+
+    @staticmethod
+    def begin_write(cursor: sqlite3.Cursor) -> None:
+        """Open a write transaction and number it in the change log.
+
+        Point-in-time restores replay only whole transactions, so every
+        write transaction should start here.
+        """
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(NEXT_CHANGE_TXN)
 
     # Transaction Management
     def deposit(self, account_number: int, amount: float, description: str = "Deposit") -> bool:
         """Deposit money into an account."""
-        if amount <= 0:
+        minor = self._parse_amount(amount)
+        if minor is None:
             logger.warning(f"Deposit failed: invalid amount {amount}")
             return False
             
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             
             # Start transaction
-            cursor.execute("BEGIN TRANSACTION")
+            self.begin_write(cursor)
             
             # Update balance
             cursor.execute(
                 "UPDATE accounts SET balance = balance + ? WHERE account_number = ?",
-                (amount, account_number)
+                (minor, account_number)
             )
             
             # Record transaction
             cursor.execute(
                 "INSERT INTO transactions (account_number, type, amount, description) VALUES (?, ?, ?, ?)",
-                (account_number, "Deposit", amount, description)
+                (account_number, "Deposit", minor, description)
             )
             
             conn.commit()
@@ -224,20 +350,21 @@ class DatabaseManager:
             logger.error(f"Deposit failed: {str(e)}")
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def withdraw(self, account_number: int, amount: float, description: str = "Withdrawal") -> bool:
         """Withdraw money from an account if sufficient balance exists."""
-        if amount <= 0:
+        minor = self._parse_amount(amount)
+        if minor is None:
             logger.warning(f"Withdrawal failed: invalid amount {amount}")
             return False
             
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             
             # Start transaction
-            cursor.execute("BEGIN TRANSACTION")
+            self.begin_write(cursor)
             
             # Check balance
             cursor.execute(
@@ -246,20 +373,20 @@ class DatabaseManager:
             )
             balance = cursor.fetchone()["balance"]
             
-            if balance < amount:
+            if balance < minor:
                 logger.warning(f"Withdrawal failed: insufficient balance in account #{account_number}")
                 return False
                 
             # Update balance
             cursor.execute(
                 "UPDATE accounts SET balance = balance - ? WHERE account_number = ?",
-                (amount, account_number)
+                (minor, account_number)
             )
             
             # Record transaction
             cursor.execute(
                 "INSERT INTO transactions (account_number, type, amount, description) VALUES (?, ?, ?, ?)",
-                (account_number, "Withdrawal", amount, description)
+                (account_number, "Withdrawal", minor, description)
             )
             
             conn.commit()
@@ -270,11 +397,12 @@ class DatabaseManager:
             logger.error(f"Withdrawal failed: {str(e)}")
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def transfer(self, from_account: int, to_account: int, amount: float, description: str = "Transfer") -> bool:
         """Transfer money between accounts."""
-        if amount <= 0:
+        minor = self._parse_amount(amount)
+        if minor is None:
             logger.warning(f"Transfer failed: invalid amount {amount}")
             return False
             
@@ -282,12 +410,12 @@ class DatabaseManager:
             logger.warning("Transfer failed: cannot transfer to same account")
             return False
             
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             
             # Start transaction
-            cursor.execute("BEGIN TRANSACTION")
+            self.begin_write(cursor)
             
             # Check if recipient exists
             cursor.execute("SELECT 1 FROM accounts WHERE account_number = ?", (to_account,))
@@ -302,7 +430,7 @@ class DatabaseManager:
             )
             balance = cursor.fetchone()["balance"]
             
-            if balance < amount:
+            if balance < minor:
                 logger.warning(f"Transfer failed: insufficient balance in account #{from_account}")
                 return False
                 
@@ -310,21 +438,21 @@ class DatabaseManager:
             # Deduct from sender
             cursor.execute(
                 "UPDATE accounts SET balance = balance - ? WHERE account_number = ?",
-                (amount, from_account)
+                (minor, from_account)
             )
             cursor.execute(
                 "INSERT INTO transactions (account_number, type, amount, description) VALUES (?, ?, ?, ?)",
-                (from_account, "Transfer Out", amount, f"To #{to_account}: {description}")
+                (from_account, "Transfer Out", minor, f"To #{to_account}: {description}")
             )
             
             # Add to recipient
             cursor.execute(
                 "UPDATE accounts SET balance = balance + ? WHERE account_number = ?",
-                (amount, to_account)
+                (minor, to_account)
             )
             cursor.execute(
                 "INSERT INTO transactions (account_number, type, amount, description) VALUES (?, ?, ?, ?)",
-                (to_account, "Transfer In", amount, f"From #{from_account}: {description}")
+                (to_account, "Transfer In", minor, f"From #{from_account}: {description}")
             )
             
             conn.commit()
@@ -335,12 +463,213 @@ class DatabaseManager:
             logger.error(f"Transfer failed: {str(e)}")
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    def apply_batch(self, operations: Iterable[Dict], chunk_size: int = BATCH_CHUNK_SIZE) -> List[Dict]:
+        """Apply many deposits and withdrawals with one commit per chunk.
+        
+        Each operation is a dict with ``type`` ('Deposit' or 'Withdrawal'),
+        ``account_number``, ``amount`` and an optional ``description``.
+        Operations are applied in order, so a withdrawal can spend a deposit
+        earlier in the same batch. A failing operation is reported and
+        skipped; it does not abort the rest of the batch. Returns one
+        ``{'index', 'success', 'error'}`` dict per operation.
+        """
+        operations = list(operations)
+        results = []
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(operations), chunk_size):
+                results.extend(self._apply_batch_chunk(cursor, operations[start:start + chunk_size], start))
+        finally:
+            self.pool.release(conn)
+            
+        succeeded = sum(1 for r in results if r['success'])
+        logger.info(f"Batch applied: {succeeded}/{len(results)} operations succeeded")
+        return results
+
+    def _apply_batch_chunk(self, cursor: sqlite3.Cursor, operations: List[Dict], offset: int) -> List[Dict]:
+        """Validate, net and write one chunk of apply_batch in a single transaction."""
+        results = []
+        valid = []
+        for i, op in enumerate(operations, start=offset):
+            result = {'index': i, 'success': False, 'error': None}
+            results.append(result)
+            try:
+                op_type = BATCH_OPERATION_TYPES.get(str(op.get('type', '')).lower())
+                amount = self._parse_amount(op.get('amount'))
+                if op_type is None:
+                    result['error'] = f"Unknown operation type: {op.get('type')}"
+                elif amount is None:
+                    result['error'] = f"Invalid amount: {op.get('amount')}"
+                else:
+                    account_number = int(op['account_number'])
+                    valid.append((result, op_type, account_number, amount, op.get('description') or op_type))
+            except (AttributeError, KeyError, TypeError, ValueError):
+                result['error'] = "Malformed operation"
+        if not valid:
+            return results
+            
+        try:
+            # Take the write lock before reading balances so they cannot change under us
+            self.begin_write(cursor)
+            balances = self._load_balances(cursor, {v[2] for v in valid})
+            deltas = {}
+            ledger_rows = []
+            for result, op_type, account_number, amount, description in valid:
+                if account_number not in balances:
+                    result['error'] = f"Account #{account_number} not found"
+                    continue
+                signed = amount if op_type == "Deposit" else -amount
+                if balances[account_number] + signed < 0:
+                    result['error'] = "Insufficient balance"
+                    continue
+                balances[account_number] += signed
+                deltas[account_number] = deltas.get(account_number, 0) + signed
+                ledger_rows.append((account_number, op_type, amount, description))
+                result['success'] = True
+                
+            self._write_ledger(cursor, deltas, ledger_rows)
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            if cursor.connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            logger.error(f"Batch chunk at operation {offset} failed: {str(e)}")
+            for result, *_ in valid:
+                if result['success'] or result['error'] is None:
+                    result['success'] = False
+                    result['error'] = f"Batch write failed: {str(e)}"
+        return results
+
+    def bulk_transfer(self, transfers: Iterable[Sequence], chunk_size: int = BATCH_CHUNK_SIZE) -> List[Dict]:
+        """Settle many transfers with a few set-based writes per chunk.
+        
+        Each transfer is a ``(from_account, to_account, amount[, description])``
+        tuple. Transfers are checked in processing order against running
+        in-memory balances, so the outcome of every row (and the ledger it
+        writes) matches calling ``transfer()`` once per row in the same order.
+        Returns one ``{'index', 'success', 'error'}`` dict per transfer.
+        """
+        transfers = list(transfers)
+        results = []
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(transfers), chunk_size):
+                results.extend(self._bulk_transfer_chunk(cursor, transfers[start:start + chunk_size], start))
+        finally:
+            self.pool.release(conn)
+            
+        succeeded = sum(1 for r in results if r['success'])
+        logger.info(f"Bulk transfer settled: {succeeded}/{len(results)} transfers succeeded")
+        return results
+
+    def _bulk_transfer_chunk(self, cursor: sqlite3.Cursor, transfers: List[Sequence], offset: int) -> List[Dict]:
+        """Net and write one chunk of bulk_transfer in a single transaction."""
+        results = []
+        valid = []
+        for i, transfer in enumerate(transfers, start=offset):
+            result = {'index': i, 'success': False, 'error': None}
+            results.append(result)
+            try:
+                from_account, to_account, amount = int(transfer[0]), int(transfer[1]), transfer[2]
+                description = transfer[3] if len(transfer) > 3 else "Transfer"
+            except (IndexError, TypeError, ValueError):
+                result['error'] = "Malformed transfer"
+                continue
+            minor = self._parse_amount(amount)
+            if minor is None:
+                result['error'] = f"Invalid amount: {amount}"
+            elif from_account == to_account:
+                result['error'] = "Cannot transfer to same account"
+            else:
+                valid.append((result, from_account, to_account, minor, description))
+        if not valid:
+            return results
+            
+        try:
+            self.begin_write(cursor)
+            balances = self._load_balances(cursor, {v[1] for v in valid} | {v[2] for v in valid})
+            deltas = {}
+            ledger_rows = []
+            for result, from_account, to_account, amount, description in valid:
+                if to_account not in balances:
+                    result['error'] = f"Recipient account #{to_account} not found"
+                    continue
+                if from_account not in balances:
+                    result['error'] = f"Sender account #{from_account} not found"
+                    continue
+                if balances[from_account] < amount:
+                    result['error'] = "Insufficient balance"
+                    continue
+                balances[from_account] -= amount
+                balances[to_account] += amount
+                deltas[from_account] = deltas.get(from_account, 0) - amount
+                deltas[to_account] = deltas.get(to_account, 0) + amount
+                ledger_rows.append((from_account, "Transfer Out", amount, f"To #{to_account}: {description}"))
+                ledger_rows.append((to_account, "Transfer In", amount, f"From #{from_account}: {description}"))
+                result['success'] = True
+                
+            self._write_ledger(cursor, deltas, ledger_rows)
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            if cursor.connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            logger.error(f"Bulk transfer chunk at row {offset} failed: {str(e)}")
+            for result, *_ in valid:
+                if result['success'] or result['error'] is None:
+                    result['success'] = False
+                    result['error'] = f"Bulk transfer write failed: {str(e)}"
+        return results
+
+    def _write_ledger(self, cursor: sqlite3.Cursor, deltas: Dict[int, int], ledger_rows: List[Tuple]) -> None:
+        """Write netted balance changes and their ledger rows.
+        
+        Balance updates go out in account-number order so concurrent bulk
+        writers always touch rows in the same order.
+        """
+        cursor.executemany(
+            "UPDATE accounts SET balance = balance + ? WHERE account_number = ?",
+            [(delta, account_number) for account_number, delta in sorted(deltas.items())]
+        )
+        cursor.executemany(
+            "INSERT INTO transactions (account_number, type, amount, description) VALUES (?, ?, ?, ?)",
+            ledger_rows
+        )
+
+    def _load_balances(self, cursor: sqlite3.Cursor, account_numbers) -> Dict[int, int]:
+        """Fetch current balances (in paise) for a set of accounts."""
+        account_numbers = list(account_numbers)
+        balances = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(account_numbers), 500):
+            chunk = account_numbers[start:start + 500]
+            cursor.execute(
+                f"SELECT account_number, balance FROM accounts WHERE account_number IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            balances.update((row['account_number'], row['balance']) for row in cursor.fetchall())
+        return balances
 
     # Account Information
-    def get_balance(self, account_number: int) -> Optional[float]:
+    @staticmethod
+    def _account_dict(row: sqlite3.Row) -> Dict:
+        """Account row as a dict with the balance in rupees."""
+        account = dict(row)
+        account['balance'] = from_minor(account['balance'])
+        return account
+
+    @staticmethod
+    def _transaction_dict(row: sqlite3.Row) -> Dict:
+        """Transaction row as a dict with the amount in rupees."""
+        transaction = dict(row)
+        transaction['amount'] = from_minor(transaction['amount'])
+        return transaction
+
+    def get_balance(self, account_number: int) -> Optional[Decimal]:
         """Get current balance of an account."""
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
@@ -348,16 +677,16 @@ class DatabaseManager:
                 (account_number,)
             )
             result = cursor.fetchone()
-            return result["balance"] if result else None
+            return from_minor(result["balance"]) if result else None
         except sqlite3.Error as e:
             logger.error(f"Balance check failed: {str(e)}")
             return None
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def get_account_details(self, account_number: int) -> Optional[Dict]:
         """Get all details of an account."""
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
@@ -365,54 +694,661 @@ class DatabaseManager:
                 (account_number,)
             )
             result = cursor.fetchone()
-            return dict(result) if result else None
+            return self._account_dict(result) if result else None
         except sqlite3.Error as e:
             logger.error(f"Account details fetch failed: {str(e)}")
             return None
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def get_transactions(self, account_number: int, limit: int = 100) -> List[Dict]:
         """Get transaction history for an account."""
-        conn = self.create_connection()
+        transactions, _ = self.get_transactions_page(account_number, page_size=limit)
+        return transactions
+
+    @staticmethod
+    def _transaction_filters(account_number: Optional[int] = None, types: Optional[Sequence[str]] = None,
+                             from_date: Optional[str] = None, to_date: Optional[str] = None,
+                             before: Optional[Tuple[str, int]] = None,
+                             accounts: Optional[Tuple[int, int]] = None) -> Tuple[str, List]:
+        """WHERE clause and parameters shared by the transaction history queries.
+        
+        ``before`` is a (timestamp, transaction_id) key that rows must sort
+        below and ``accounts`` an inclusive range of account numbers.
+        """
+        conditions = []
+        params = []
+        if account_number is not None:
+            conditions.append("account_number = ?")
+            params.append(account_number)
+        if accounts:
+            conditions.append("account_number BETWEEN ? AND ?")
+            params.extend(accounts)
+        if types:
+            conditions.append(f"type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        if from_date:
+            conditions.append("timestamp >= ?")
+            params.append(from_date)
+        if to_date:
+            conditions.append("timestamp < date(?, '+1 day')")
+            params.append(to_date)
+        if before:
+            conditions.append("(timestamp, transaction_id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def refresh_archives(self) -> None:
+        """Rescan the archive directory for transaction archives."""
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT type, amount, description, timestamp 
-                FROM transactions 
-                WHERE account_number = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-                """,
-                (account_number, limit)
+            mtime = os.stat(self.archive_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        archives = {}
+        if mtime is not None:
+            for name in os.listdir(self.archive_dir):
+                match = ARCHIVE_FILE_PATTERN.fullmatch(name)
+                if match:
+                    archives[ARCHIVE_SCHEMA_PREFIX + match.group(1)] = os.path.join(self.archive_dir, name)
+        # A yearly archive already copied into the older one is about to be
+        # deleted (database/archive.py); reading both would count it twice
+        folded = self.folded_years(archives[ARCHIVE_OLDER]) if ARCHIVE_OLDER in archives else set()
+        self.archives = {schema: path for schema, path in archives.items()
+                         if schema[len(ARCHIVE_SCHEMA_PREFIX):] not in folded}
+        self._archive_dir_mtime = mtime
+
+    @staticmethod
+    def folded_years(path: str) -> set:
+        conn = sqlite3.connect(path)
+        try:
+            return {row[0] for row in conn.execute("SELECT year FROM folded_years")}
+        except sqlite3.OperationalError:
+            return set()
+        finally:
+            conn.close()
+
+    def _archives_in_range(self, from_date: Optional[str], to_date: Optional[str]) -> List[str]:
+        """Archive schemas that can hold rows between the dates, newest first."""
+        years = sorted((s[len(ARCHIVE_SCHEMA_PREFIX):] for s in self.archives if s != ARCHIVE_OLDER),
+                       reverse=True)
+        schemas = [ARCHIVE_SCHEMA_PREFIX + year for year in years
+                   if (not from_date or from_date[:4] <= year) and (not to_date or to_date[:4] >= year)]
+        # The older archive holds every year before the oldest yearly one
+        if ARCHIVE_OLDER in self.archives and (not from_date or not years or from_date[:4] < years[-1]):
+            schemas.append(ARCHIVE_OLDER)
+        return schemas
+
+    @staticmethod
+    def _max_attached(conn: sqlite3.Connection) -> int:
+        """Archives one connection may attach: one below SQLite's limit, leaving a slot for tools."""
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(conn, "getlimit") else 10
+        return limit - 1
+
+    def transaction_sources(self, conn: sqlite3.Connection, from_date: Optional[str] = None,
+                            to_date: Optional[str] = None, before: Optional[Tuple[str, int]] = None) -> List[str]:
+        """Schemas holding transactions in the date range, newest first.
+        
+        ``main`` holds the hot rows, each ``archive_<year>`` one year of older
+        rows and ``archive_older`` the years before those. Archival keeps the
+        tiers' time ranges disjoint, so reading them in this order yields one
+        newest-first sequence. Only the archives the range can reach are
+        attached to ``conn``, ``before`` (a keyset cursor) bounding it like
+        ``to_date``; others are detached when SQLite's attach limit needs the
+        room. Inside a transaction nothing can be attached, so only archives
+        already attached are listed (read_snapshot attaches them all first).
+        Raises ArchiveAttachError if a needed archive cannot be attached.
+        """
+        if before and (not to_date or before[0][:10] < to_date):
+            to_date = before[0][:10]
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if conn.in_transaction:
+            return ["main"] + [schema for schema in self._archives_in_range(from_date, to_date)
+                               if schema in attached]
+
+        try:
+            mtime = os.stat(self.archive_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._archive_dir_mtime:
+            # Another process archived or folded since the last scan
+            self.refresh_archives()
+        needed = self._archives_in_range(from_date, to_date)
+        attached_archives = {s for s in attached if s.startswith(ARCHIVE_SCHEMA_PREFIX)}
+        missing = [schema for schema in needed if schema not in attached_archives]
+        max_attached = self._max_attached(conn)
+        if len(needed) > max_attached:
+            raise ArchiveAttachError(
+                f"{len(needed)} transaction archives needed but only {max_attached} can be attached; "
+                "run database/archive.py to fold old years together"
             )
-            return [dict(row) for row in cursor.fetchall()]
+        # Archives whose file is gone first, then ones this query does not need
+        detachable = sorted(attached_archives - set(needed), key=lambda s: s in self.archives)
+        for schema in detachable:
+            needs_room = len(attached_archives) + len(missing) > max_attached
+            if schema in self.archives and not needs_room:
+                break
+            try:
+                conn.execute(f"DETACH DATABASE {schema}")
+            except sqlite3.Error as e:
+                # Still being read by an open statement on this connection
+                if needs_room:
+                    raise ArchiveAttachError(f"Could not detach transaction archive {schema}: {e}") from e
+                continue
+            attached_archives.discard(schema)
+        for schema in missing:
+            path = self.archives[schema]
+            # ATTACH would silently create an empty database in its place
+            if not os.path.exists(path):
+                raise ArchiveAttachError(f"Transaction archive {path} is missing")
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            except sqlite3.Error as e:
+                raise ArchiveAttachError(f"Could not attach transaction archive {path}: {e}") from e
+        return ["main"] + needed
+
+    def _last_activity_column(self, conn: sqlite3.Connection) -> str:
+        """Latest transaction time of account ``a`` across all tiers.
+        
+        MAX over each tier's (account_number, timestamp) index is a single
+        seek, and COALESCE only reaches into the archives for accounts with
+        no hot activity.
+        """
+        lookups = [
+            f"(SELECT MAX(t.timestamp) FROM {schema}.transactions t WHERE t.account_number = a.account_number)"
+            for schema in self.transaction_sources(conn)
+        ]
+        if len(lookups) == 1:
+            return f"{lookups[0]} AS last_activity"
+        return f"COALESCE({', '.join(lookups)}) AS last_activity"
+
+    def get_transactions_page(self, account_number: Optional[int] = None, page_size: int = TRANSACTION_PAGE_SIZE,
+                              cursor: Optional[Tuple[str, int]] = None, types: Optional[Sequence[str]] = None,
+                              from_date: Optional[str] = None, to_date: Optional[str] = None
+                              ) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """Get one page of transaction history, newest first.
+        
+        Pages are keyed on (timestamp, transaction_id) rather than OFFSET, so
+        every page is a single index range scan no matter how deep it is.
+        Pass the returned cursor back to fetch the next page; it is None once
+        there are no more rows. ``account_number`` of None covers all
+        accounts (admin), ``types`` restricts transaction types and
+        ``from_date``/``to_date`` ('YYYY-MM-DD', inclusive) bound the range.
+        """
+        conn = self.pool.acquire()
+        try:
+            db_cursor = conn.cursor()
+            rows = []
+            # Hot rows first; archives are only read once they run out
+            for schema in self.transaction_sources(conn, from_date, to_date, cursor):
+                where, params = self._transaction_filters(account_number, types, from_date, to_date, cursor)
+                # Fetch one extra row to learn whether another page exists
+                db_cursor.execute(
+                    f"""
+                    SELECT transaction_id, account_number, type, amount, description, timestamp 
+                    FROM {schema}.transactions 
+                    {where}
+                    ORDER BY timestamp DESC, transaction_id DESC
+                    LIMIT ?
+                    """,
+                    (*params, page_size + 1 - len(rows))
+                )
+                rows.extend(self._transaction_dict(row) for row in db_cursor.fetchall())
+                if len(rows) > page_size:
+                    break
+                if rows:
+                    # Older tiers continue below the last row read
+                    cursor = (rows[-1]['timestamp'], rows[-1]['transaction_id'])
+            if len(rows) <= page_size:
+                return rows, None
+            rows = rows[:page_size]
+            return rows, (rows[-1]['timestamp'], rows[-1]['transaction_id'])
         except sqlite3.Error as e:
             logger.error(f"Transaction history fetch failed: {str(e)}")
-            return []
+            return [], None
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    def count_transactions(self, account_number: Optional[int] = None, from_date: Optional[str] = None,
+                           to_date: Optional[str] = None) -> int:
+        """Count the transactions matching the history filters."""
+        where, params = self._transaction_filters(account_number, from_date=from_date, to_date=to_date)
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            total = 0
+            sources = self.transaction_sources(conn, from_date, to_date)
+            for schema in sources:
+                cursor.execute(f"SELECT COUNT(*) FROM {schema}.transactions {where}", params)
+                total += cursor.fetchone()[0]
+            # Rows of an interrupted archive batch are in both tiers until the
+            # next archive run; they sort at or below the archive's newest row
+            for schema in sources[1:]:
+                cursor.execute(
+                    f"""
+                    SELECT COUNT(*) FROM main.transactions m
+                    {where + ' AND' if where else 'WHERE'}
+                        m.timestamp <= (SELECT MAX(timestamp) FROM {schema}.transactions)
+                        AND EXISTS (SELECT 1 FROM {schema}.transactions a WHERE a.transaction_id = m.transaction_id)
+                    """,
+                    params
+                )
+                total -= cursor.fetchone()[0]
+            return total
+        except sqlite3.Error as e:
+            logger.error(f"Transaction count failed: {str(e)}")
+            return 0
+        finally:
+            self.pool.release(conn)
+
+    def iter_transactions(self, account_number: Optional[int] = None, from_date: Optional[str] = None,
+                          to_date: Optional[str] = None, fetch_size: int = EXPORT_FETCH_SIZE
+                          ) -> Iterator[List[Tuple]]:
+        """Stream transaction history, newest first, in chunks of ``fetch_size`` rows.
+        
+        Each row is (transaction_id, account_number, type, amount, description,
+        timestamp) with the amount in rupees.
+        """
+        # Nested acquires in iter_query get this same connection
+        conn = self.pool.acquire()
+        last = None
+        try:
+            for schema in self.transaction_sources(conn, from_date, to_date):
+                # Older tiers continue below the last row read
+                where, params = self._transaction_filters(account_number, from_date=from_date,
+                                                          to_date=to_date, before=last)
+                chunks = self.iter_query(
+                    f"""
+                    SELECT transaction_id, account_number, type, amount, description, timestamp
+                    FROM {schema}.transactions
+                    {where}
+                    ORDER BY timestamp DESC, transaction_id DESC
+                    """,
+                    params, fetch_size
+                )
+                try:
+                    for rows in chunks:
+                        last = (rows[-1][5], rows[-1][0])
+                        yield [(r[0], r[1], r[2], from_minor(r[3]), r[4], r[5]) for r in rows]
+                finally:
+                    chunks.close()
+        finally:
+            self.pool.release(conn)
+
+    def union_tiers(self, conn: sqlite3.Connection, select: str, params: Sequence = (),
+                    from_date: Optional[str] = None, to_date: Optional[str] = None) -> Tuple[str, List]:
+        """``select`` over every transaction tier in the date range as one query.
+        
+        ``select`` names the table as ``{transactions}``. UNION drops rows that
+        archiving has copied but not yet deleted, so select the key column.
+        """
+        sources = self.transaction_sources(conn, from_date, to_date)
+        sql = " UNION ".join(select.format(transactions=f"{schema}.transactions") for schema in sources)
+        return sql, list(params) * len(sources)
+
+    def get_statement(self, account_number: int, from_date: Optional[str] = None,
+                      to_date: Optional[str] = None) -> Optional[Dict]:
+        """Get opening and closing balances and the line items for a period.
+        
+        ``from_date``/``to_date`` are 'YYYY-MM-DD' (UTC, inclusive); open ends
+        run from the first transaction or up to now. The opening balance is
+        the latest end-of-day snapshot before the period (database/eod.py)
+        plus any days the end-of-day job has not closed yet, so the cost
+        follows the days since the last run and the rows in the period, not
+        the length of the history. Line items are oldest first. Returns None
+        if the account does not exist.
+        """
+        statements = self.iter_statements(from_date, to_date, account_number, account_number)
+        try:
+            return next(statements, None)
+        except sqlite3.Error as e:
+            logger.error(f"Statement fetch failed: {str(e)}")
+            return None
+        finally:
+            statements.close()
+
+    def iter_statements(self, from_date: Optional[str] = None, to_date: Optional[str] = None,
+                        first_account: int = 1, last_account: Optional[int] = None,
+                        fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[Dict]:
+        """Stream the statements of a range of accounts, in account number order.
+        
+        Yields one ``get_statement`` dict per existing account numbered
+        ``first_account`` to ``last_account``, including accounts without
+        activity in the period. Opening balances are looked up for the whole
+        range at once and line items are read as one stream, so memory
+        follows the accounts in the range, not their rows. Raises
+        sqlite3.Error if a query fails.
+        """
+        bounds = (first_account, last_account if last_account is not None else 2 ** 63 - 1)
+        conn = self.pool.acquire()
+        chunks = None
+        try:
+            openings = self._opening_balances(conn, bounds, from_date)
+            where, params = self._transaction_filters(from_date=from_date, to_date=to_date, accounts=bounds)
+            union, params = self.union_tiers(
+                conn,
+                "SELECT transaction_id, account_number, type, amount, description, timestamp "
+                f"FROM {{transactions}} {where}",
+                params, from_date, to_date
+            )
+            chunks = self.iter_query(f"{union} ORDER BY account_number, timestamp, transaction_id",
+                                     params, fetch_size)
+            rows = itertools.chain.from_iterable(chunks)
+            by_account = itertools.groupby(rows, key=lambda row: row[1])
+            pending = next(by_account, None)
+            for account_number, opening in openings.items():
+                items = []
+                # Accounts deleted mid-stream can leave rows without an opening
+                while pending is not None and pending[0] <= account_number:
+                    if pending[0] == account_number:
+                        items = [
+                            {'transaction_id': r[0], 'account_number': r[1], 'type': r[2],
+                             'amount': from_minor(r[3]), 'description': r[4], 'timestamp': r[5]}
+                            for r in pending[1]
+                        ]
+                    pending = next(by_account, None)
+                yield self._statement(account_number, from_date, to_date, opening, items)
+        finally:
+            if chunks is not None:
+                chunks.close()
+            self.pool.release(conn)
+
+    def _opening_balances(self, conn: sqlite3.Connection, bounds: Tuple[int, int],
+                          from_date: Optional[str]) -> Dict[int, int]:
+        """Balance in paise of each account in ``bounds`` at the start of ``from_date``."""
+        cursor = conn.cursor()
+        if not from_date:
+            cursor.execute("SELECT account_number FROM accounts WHERE account_number BETWEEN ? AND ? "
+                           "ORDER BY account_number", bounds)
+            return {row[0]: 0 for row in cursor.fetchall()}
+            
+        before_period = (date.fromisoformat(from_date) - timedelta(days=1)).isoformat()
+        cursor.execute("SELECT MAX(day) FROM eod_runs WHERE day <= ?", (before_period,))
+        closed = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT a.account_number,
+                   COALESCE((SELECT b.closing_balance FROM daily_balances b
+                             WHERE b.account_number = a.account_number AND b.day <= ?
+                             ORDER BY b.day DESC LIMIT 1), 0)
+            FROM accounts a WHERE a.account_number BETWEEN ? AND ? ORDER BY a.account_number
+            """,
+            (closed or "", *bounds)
+        )
+        openings = dict(cursor.fetchall())
+        
+        replay_from = (date.fromisoformat(closed) + timedelta(days=1)).isoformat() if closed else None
+        if replay_from is None or replay_from <= before_period:
+            # Days the end-of-day job has not closed are summed from the ledger
+            where, params = self._transaction_filters(from_date=replay_from, to_date=before_period,
+                                                      accounts=bounds)
+            union, params = self.union_tiers(
+                conn, f"SELECT transaction_id, account_number, type, amount FROM {{transactions}} {where}",
+                params, replay_from, before_period
+            )
+            cursor.execute(f"SELECT account_number, SUM({SIGNED_AMOUNT}) FROM ({union}) GROUP BY account_number",
+                           params)
+            for account_number, net in cursor.fetchall():
+                if account_number in openings:
+                    openings[account_number] += net
+        return openings
+
+    @staticmethod
+    def _statement(account_number: int, from_date: Optional[str], to_date: Optional[str],
+                   opening: int, transactions: List[Dict]) -> Dict:
+        """Statement dict from an opening balance in paise and the period's line items."""
+        credits = sum(to_minor(t['amount']) for t in transactions if t['type'] not in DEBIT_TYPES)
+        debits = sum(to_minor(t['amount']) for t in transactions if t['type'] in DEBIT_TYPES)
+        return {
+            'account_number': account_number,
+            'from_date': from_date,
+            'to_date': to_date,
+            'opening_balance': from_minor(opening),
+            'total_credits': from_minor(credits),
+            'total_debits': from_minor(debits),
+            'closing_balance': from_minor(opening + credits - debits),
+            'transactions': transactions,
+        }
+
+    def iter_query(self, sql: str, params: Sequence = (), fetch_size: int = EXPORT_FETCH_SIZE
+                   ) -> Iterator[List[Tuple]]:
+        """Stream the rows of a read-only query as lists of plain tuples.
+        
+        One statement is read with ``fetchmany``, so memory stays flat however
+        many rows match and the whole stream sees a single consistent
+        snapshot. The pooled connection is held until the generator is
+        exhausted or closed, so consume it on one thread.
+        """
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            # Plain tuples: building a Row per record is measurable at this volume
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    return
+                yield rows
+        except sqlite3.Error as e:
+            # A silently truncated export is worse than a failed one
+            logger.error(f"Query stream failed: {str(e)}")
+            raise
+        finally:
+            self.pool.release(conn)
+
+    @contextmanager
+    def read_snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed reads on this thread against one consistent snapshot.
+        
+        Holds a read transaction on the thread's pooled connection, which every
+        DatabaseManager call made inside the block reuses. In WAL mode writers
+        carry on meanwhile; they just are not visible until the block exits.
+        """
+        conn = self.pool.acquire()
+        try:
+            # Archives cannot be attached once the transaction is open
+            self.transaction_sources(conn)
+            conn.execute("BEGIN")
+            # The read transaction starts at the first read, not at BEGIN
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self.pool.release(conn)
 
     # Admin Functions
-    def get_all_accounts(self) -> List[Dict]:
-        """Get all accounts in the system (admin only)."""
-        conn = self.create_connection()
+    def get_system_stats(self, use_cache: bool = True) -> Dict:
+        """Get bank-wide figures for the admin dashboard (admin only).
+        
+        Everything is computed with aggregate SQL, so no account rows are
+        loaded into Python. Results are cached for STATS_CACHE_TTL seconds
+        unless ``use_cache`` is False. Today's volume is by UTC day, matching
+        the stored timestamps.
+        """
+        if use_cache:
+            with self._stats_lock:
+                if self._stats_cache and self._stats_cache[0] > time.monotonic():
+                    return self._stats_cache[1]
+                    
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT account_number, name, balance, created_at FROM accounts ORDER BY account_number"
+                """
+                SELECT COUNT(*) AS total, COALESCE(SUM(balance), 0) AS total_balance,
+                       AVG(balance) AS average, MIN(balance) AS minimum, MAX(balance) AS maximum
+                FROM accounts
+                """
             )
-            return [dict(row) for row in cursor.fetchall()]
+            accounts = cursor.fetchone()
+            
+            cursor.execute(
+                """
+                SELECT type, COUNT(*) AS count, SUM(amount) AS amount
+                FROM transactions
+                WHERE timestamp >= date('now')
+                GROUP BY type
+                """
+            )
+            today = {row['type']: {'count': row['count'], 'amount': from_minor(row['amount'])}
+                     for row in cursor.fetchall()}
+            
+            cursor.execute("SELECT status, COUNT(*) AS count FROM loan_applications GROUP BY status")
+            loans = {row['status']: row['count'] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"System stats fetch failed: {str(e)}")
+            return {}
+        finally:
+            self.pool.release(conn)
+            
+        stats = {
+            'total_accounts': accounts['total'],
+            'total_balance': from_minor(accounts['total_balance']),
+            'average_balance': from_minor(round(accounts['average'] or 0)),
+            'min_balance': from_minor(accounts['minimum'] or 0),
+            'max_balance': from_minor(accounts['maximum'] or 0),
+            'today_by_type': today,
+            'today_count': sum(t['count'] for t in today.values()),
+            'today_amount': sum((t['amount'] for t in today.values()), from_minor(0)),
+            'loans_by_status': loans,
+        }
+        with self._stats_lock:
+            self._stats_cache = (time.monotonic() + STATS_CACHE_TTL, stats)
+        return stats
+
+    def get_all_transactions(self, limit: Optional[int] = 100, from_date: Optional[str] = None,
+                             to_date: Optional[str] = None) -> List[Dict]:
+        """Get the newest transactions across all accounts (admin only).
+        
+        A ``limit`` of None returns every matching row.
+        """
+        transactions = []
+        cursor = None
+        while True:
+            page_size = 1000 if limit is None else min(limit - len(transactions), 1000)
+            page, cursor = self.get_transactions_page(
+                page_size=page_size, cursor=cursor, from_date=from_date, to_date=to_date
+            )
+            transactions.extend(page)
+            if cursor is None or (limit is not None and len(transactions) >= limit):
+                return transactions
+
+    def get_all_accounts(self, include_last_activity: bool = False) -> List[Dict]:
+        """Get all accounts in the system (admin only).
+        
+        With ``include_last_activity`` each account also carries the timestamp
+        of its latest transaction (None if it has none) in ``last_activity``,
+        computed in the same query rather than one lookup per account.
+        """
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            if include_last_activity:
+                cursor.execute(
+                    f"SELECT a.account_number, a.name, a.balance, a.created_at, {self._last_activity_column(conn)} "
+                    "FROM accounts a ORDER BY a.account_number"
+                )
+            else:
+                cursor.execute(
+                    "SELECT account_number, name, balance, created_at FROM accounts ORDER BY account_number"
+                )
+            return [self._account_dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             logger.error(f"Account list fetch failed: {str(e)}")
             return []
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    def get_last_activity(self, account_number: int) -> Optional[Dict]:
+        """Get the most recent transaction of an account, or None if it has none."""
+        transactions = self.get_transactions(account_number, limit=1)
+        return transactions[0] if transactions else None
+
+    def search_accounts(self, term: str = "", page_size: int = ACCOUNT_PAGE_SIZE, after: Optional[int] = None,
+                        include_last_activity: bool = False) -> Tuple[List[Dict], Optional[int]]:
+        """Search accounts by number prefix or name, in account number order (admin only).
+        
+        A term of digits matches account numbers starting with it, looked up
+        as primary key ranges. Any other term matches anywhere in the name,
+        ignoring case: three or more characters use the ``accounts_fts``
+        trigram index, shorter terms fall back to LIKE, as do all terms where
+        SQLite could not build the index. An empty term lists
+        every account. Pages are keyed on account number; pass the returned
+        cursor as ``after`` to fetch the next page, it is None on the last.
+        """
+        term = term.strip()
+        columns = "a.account_number, a.name, a.balance, a.created_at"
+        after = after or 0
+        
+        conn = self.pool.acquire()
+        try:
+            if include_last_activity:
+                columns += f", {self._last_activity_column(conn)}"
+            cursor = conn.cursor()
+            # Each segment is (FROM/WHERE clause, key column, params); segments
+            # are visited in ascending key order until the page is full
+            if term.isascii() and term.isdigit():
+                if term.startswith("0"):
+                    return [], None
+                cursor.execute("SELECT MAX(account_number) FROM accounts")
+                max_number = cursor.fetchone()[0] or 0
+                prefix = int(term)
+                segments = []
+                scale = 1
+                while prefix * scale <= max_number:
+                    low, high = prefix * scale, (prefix + 1) * scale
+                    if high > after + 1:
+                        segments.append((
+                            "FROM accounts a WHERE a.account_number >= ? AND a.account_number < ?",
+                            "a.account_number", (low, high)
+                        ))
+                    scale *= 10
+            elif len(term) >= 3 and self._has_account_fts(conn):
+                phrase = '"' + term.replace('"', '""') + '"'
+                segments = [(
+                    "FROM accounts_fts f JOIN accounts a ON a.account_number = f.rowid "
+                    "WHERE accounts_fts MATCH ?",
+                    "f.rowid", (phrase,)
+                )]
+            elif term:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                segments = [("FROM accounts a WHERE a.name LIKE ? ESCAPE '\\'", "a.account_number", (pattern,))]
+            else:
+                segments = [("FROM accounts a WHERE 1", "a.account_number", ())]
+                
+            rows = []
+            for clause, key, params in segments:
+                # Fetch one extra row to learn whether another page exists
+                cursor.execute(
+                    f"SELECT {columns} {clause} AND {key} > ? ORDER BY {key} LIMIT ?",
+                    (*params, after, page_size + 1 - len(rows))
+                )
+                rows.extend(self._account_dict(row) for row in cursor.fetchall())
+                if len(rows) > page_size:
+                    break
+                    
+            if len(rows) <= page_size:
+                return rows, None
+            rows = rows[:page_size]
+            return rows, rows[-1]['account_number']
+        except sqlite3.Error as e:
+            logger.error(f"Account search failed: {str(e)}")
+            return [], None
+        finally:
+            self.pool.release(conn)
+
+    def _has_account_fts(self, conn: sqlite3.Connection) -> bool:
+        if self._account_fts is None:
+            self._account_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'accounts_fts'"
+            ).fetchone() is not None
+        return self._account_fts
 
     def delete_account(self, account_number: int) -> bool:
         """Delete an account and all its transactions (admin only)."""
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             
@@ -422,6 +1358,12 @@ class DatabaseManager:
                 logger.warning(f"Account deletion failed: account #{account_number} not found")
                 return False
                 
+            # Archived transactions have no foreign key to cascade through;
+            # attach the archives before the transaction opens
+            archives = self.transaction_sources(conn)[1:]
+            self.begin_write(cursor)
+            for schema in archives:
+                cursor.execute(f"DELETE FROM {schema}.transactions WHERE account_number = ?", (account_number,))
             # Delete account (transactions will be deleted automatically due to ON DELETE CASCADE)
             cursor.execute("DELETE FROM accounts WHERE account_number = ?", (account_number,))
             conn.commit()
@@ -432,7 +1374,7 @@ class DatabaseManager:
             logger.error(f"Account deletion failed: {str(e)}")
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     # Loan Management
     def submit_loan_application(self, account_number: int, income: float, credit_score: int, 
@@ -444,7 +1386,7 @@ class DatabaseManager:
         if credit_score < 300 or credit_score > 850:
             return False
             
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             cursor.execute(
@@ -462,11 +1404,11 @@ class DatabaseManager:
             conn.rollback()
             return False
         finally:
-            conn.close()
+            self.pool.release(conn)
 
     def get_loan_applications(self, account_number: Optional[int] = None) -> List[Dict]:
         """Get loan applications, optionally filtered by account."""
-        conn = self.create_connection()
+        conn = self.pool.acquire()
         try:
             cursor = conn.cursor()
             
@@ -488,13 +1430,52 @@ class DatabaseManager:
         except sqlite3.Error:
             return []
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    def get_all_loan_applications(self, status: Optional[str] = None) -> List[Dict]:
+        """Get every loan application, newest first, optionally only one status."""
+        if status is None:
+            return self.get_loan_applications()
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM loan_applications WHERE status = ? ORDER BY application_id DESC",
+                (status,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching loan applications: {str(e)}")
+            return []
+        finally:
+            self.pool.release(conn)
+
+    def update_loan_application(self, application_id: int, status: str) -> bool:
+        """Approve or reject an application, stamping its decision date."""
+        if status not in LOAN_DECISIONS:
+            return False
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE loan_applications SET status = ?, decision_date = ? WHERE application_id = ?",
+                (status, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), application_id)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.error(f"Error updating loan application {application_id}: {str(e)}")
+            conn.rollback()
+            return False
+        finally:
+            self.pool.release(conn)
 
 # Singleton instance for the application to use
 db_manager = DatabaseManager()
 
 # Initialize database when module is imported
 db_manager.initialize_database()
+atexit.register(db_manager.close)
 
 # Legacy functions for backward compatibility (can be deprecated later)
 def create_tables():
@@ -521,7 +1502,7 @@ def withdraw(account_number: int, amount: float) -> bool:
     """Legacy function for withdrawals."""
     return db_manager.withdraw(account_number, amount)
 
-def get_balance(account_number: int) -> Optional[float]:
+def get_balance(account_number: int) -> Optional[Decimal]:
     """Legacy function for balance check."""
     return db_manager.get_balance(account_number)
 
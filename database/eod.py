@@ -0,0 +1,104 @@
+# database/eod.py
+"""End-of-day balance snapshots.
+
+For every closed UTC day the job stores, in ``daily_balances``, the closing
+balance of each account that had transactions that day. A day is computed
+incrementally from each account's previous snapshot plus that day's net
+movement, so a run costs the day's transactions rather than the history.
+Accounts without activity keep their last snapshot, which is what
+``DatabaseManager.get_statement`` seeks to for opening balances.
+
+Every day is committed together with its ``eod_runs`` row, so a run that
+stops part way resumes at the first day not yet closed. The first run
+starts at the oldest transaction, archives included. Schedule it shortly
+after midnight UTC:
+
+    python -m database.eod [--through YYYY-MM-DD]
+"""
+import argparse
+import threading
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from database.db_manager import SIGNED_AMOUNT
+
+logger = logging.getLogger(__name__)
+
+def run_end_of_day(db, through: Optional[str] = None, progress: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Close every day after the last run up to ``through`` (default: yesterday UTC).
+
+    Returns the days closed and the snapshots written. ``progress(done,
+    total)`` counts days; setting ``cancel_event`` stops between days and
+    returns None, keeping the days already closed.
+    """
+    through = through or (datetime.now(timezone.utc).date() - timedelta(days=1)).isoformat()
+    closed = 0
+    snapshots = 0
+
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        last = cursor.execute("SELECT MAX(day) FROM eod_runs").fetchone()[0]
+        if last:
+            start = date.fromisoformat(last) + timedelta(days=1)
+        else:
+            union, params = db.union_tiers(conn, "SELECT MIN(timestamp) FROM {transactions}")
+            first = min((row[0] for row in cursor.execute(union, params) if row[0]), default=None)
+            start = date.fromisoformat(first[:10]) if first else date.fromisoformat(through)
+        days = [(start + timedelta(days=n)).isoformat()
+                for n in range((date.fromisoformat(through) - start).days + 1)]
+
+        for day in days:
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"End-of-day run cancelled before {day}")
+                return None
+            union, params = db.union_tiers(
+                conn,
+                "SELECT transaction_id, account_number, type, amount FROM {transactions} "
+                "WHERE timestamp >= ? AND timestamp < date(?, '+1 day')",
+                (day, day), day, day
+            )
+            db.begin_write(cursor)
+            try:
+                # Another run may have closed the day meanwhile
+                if cursor.execute("SELECT 1 FROM eod_runs WHERE day = ?", (day,)).fetchone():
+                    cursor.execute("ROLLBACK")
+                    continue
+                cursor.execute(
+                    f"""
+                    INSERT INTO daily_balances (account_number, day, closing_balance)
+                    SELECT t.account_number, ?,
+                           COALESCE((SELECT b.closing_balance FROM daily_balances b
+                                     WHERE b.account_number = t.account_number AND b.day < ?
+                                     ORDER BY b.day DESC LIMIT 1), 0) + SUM({SIGNED_AMOUNT})
+                    FROM ({union}) t
+                    WHERE t.account_number IN (SELECT account_number FROM main.accounts)
+                    GROUP BY t.account_number
+                    """,
+                    (day, day, *params)
+                )
+                count = cursor.rowcount
+                cursor.execute("INSERT INTO eod_runs (day, accounts) VALUES (?, ?)", (day, count))
+                cursor.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                raise
+            closed += 1
+            snapshots += count
+            if progress:
+                progress(closed, len(days))
+
+    result = {"days": closed, "snapshots": snapshots, "through": through}
+    logger.info(f"End-of-day run: {result}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--through", help="last UTC day to close, YYYY-MM-DD (default: yesterday)")
+    args = parser.parse_args()
+    from database.db_manager import db_manager
+    print(run_end_of_day(db_manager, args.through))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# database/exporter.py
+"""Streaming CSV export of transaction history.
+
+Rows flow from ``DatabaseManager.iter_transactions`` straight into a
+buffered file, so an export of any size runs in constant memory. The export
+is written to ``<path>.part`` and renamed into place when complete, so a
+failed or cancelled export never leaves a truncated file behind.
+"""
+import csv
+import os
+import threading
+import logging
+from typing import Callable, Optional
+from config import EXPORT_FETCH_SIZE, EXPORT_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+# progress(rows_written, total_rows)
+ProgressCallback = Callable[[int, int], None]
+
+def export_transactions_csv(db, file_path: str, account_number: Optional[int] = None,
+                            from_date: Optional[str] = None, to_date: Optional[str] = None,
+                            progress: Optional[ProgressCallback] = None,
+                            cancel_event: Optional[threading.Event] = None,
+                            fetch_size: int = EXPORT_FETCH_SIZE) -> Optional[int]:
+    """Export transactions to ``file_path`` and return the number of rows written.
+
+    Exports one account when ``account_number`` is given (without the
+    Account column), otherwise the whole bank. ``progress`` is called after
+    every chunk; setting ``cancel_event`` stops the export between chunks, in
+    which case nothing is written and None is returned. Runs on the calling
+    thread, so UIs should call it from a worker.
+    """
+    total = db.count_transactions(account_number, from_date, to_date) if progress else 0
+    header = ["ID", "Account", "Type", "Amount", "Description", "Date"]
+    if account_number is not None:
+        header.remove("Account")
+
+    part_path = f"{file_path}.part"
+    written = 0
+    cancelled = False
+    chunks = db.iter_transactions(account_number, from_date, to_date, fetch_size=fetch_size)
+    try:
+        with open(part_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for rows in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if account_number is not None:
+                    rows = [(r[0], r[2], r[3], r[4] or '', r[5]) for r in rows]
+                else:
+                    rows = [(r[0], r[1], r[2], r[3], r[4] or '', r[5]) for r in rows]
+                writer.writerows(rows)
+                written += len(rows)
+                if progress:
+                    progress(written, max(total, written))
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    finally:
+        # Hand the pooled connection back even if the stream was abandoned
+        chunks.close()
+
+    if cancelled:
+        os.remove(part_path)
+        logger.info(f"Transaction export to {file_path} cancelled after {written} rows")
+        return None
+    os.replace(part_path, file_path)
+    logger.info(f"Exported {written} transactions to {file_path}")
+    return written
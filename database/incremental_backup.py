@@ -0,0 +1,373 @@
+# database/incremental_backup.py
+"""Incremental backups and point-in-time restore.
+
+While a backup set is claimed, triggers (migrations 6 and 10) record every
+insert, update and delete on the ledger tables in ``change_log``, numbered
+by the transaction that made it. That is a second row write, holding a
+JSON copy of the row, for every ledger change, archiving deletes included.
+A database that has never taken a base backup, or whose set was released,
+captures nothing and pays nothing. A backup directory holds:
+
+    base-<time>.db              full online backups (database/backup.py)
+    incr-<first>-<last>.jsonl.gz  change_log rows, gzip-compressed JSON lines
+    manifest.json               set id, bases, increments and the last captured seq
+
+``write_increment`` copies the change log rows added since the previous
+increment and then prunes them from the live database, so its cost and size
+follow the churn, not the size of the ledger. Since pruning consumes the
+log, only one backup directory can follow a database: the database records
+the set id of that directory (``backup_set``), and increments for any other
+directory are refused. A base backup into a new directory hands the
+database over to it, and ``release_backup_set`` stops capture altogether.
+An increment also refuses to run if change log rows after its predecessor
+are already gone, rather than chaining over the gap.
+
+``restore`` copies the newest base taken before the target time and
+replays the increments on top of it, one whole transaction at a time, up
+to that time. Writes that do not start with ``DatabaseManager.begin_write``
+count as part of the transaction before them.
+
+Command line (for cron jobs and recovery):
+    python -m database.incremental_backup base <backup_dir>
+    python -m database.incremental_backup increment <backup_dir>
+    python -m database.incremental_backup restore <backup_dir> <dest.db> [--until "YYYY-MM-DD HH:MM:SS"]
+    python -m database.incremental_backup release
+"""
+import os
+import gzip
+import json
+import shutil
+import sqlite3
+import argparse
+import threading
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+from config import EXPORT_FETCH_SIZE
+from database.backup import backup_database, verify_backup
+from database.migrations import CHANGE_LOG_TABLES
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+def _utc_now() -> str:
+    """Current UTC time in the change log's timestamp format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+def load_manifest(backup_dir: str) -> Dict:
+    """Return the backup directory's manifest, or an empty one."""
+    try:
+        with open(os.path.join(backup_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"bases": [], "increments": [], "last_seq": 0}
+
+def _save_manifest(backup_dir: str, manifest: Dict) -> None:
+    path = os.path.join(backup_dir, MANIFEST)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+def _backup_set(db) -> Optional[str]:
+    """Set id of the backup directory that owns the database's change log."""
+    with db.pool.connection() as conn:
+        row = conn.execute("SELECT set_id FROM backup_set").fetchone()
+    return row[0] if row else None
+
+def _claim_backup_set(db, set_id: str, backup_dir: str) -> None:
+    with db.pool.connection() as conn:
+        conn.execute(
+            "INSERT INTO backup_set (id, set_id, backup_dir) VALUES (1, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET set_id = excluded.set_id, backup_dir = excluded.backup_dir, "
+            "claimed_at = CURRENT_TIMESTAMP",
+            (set_id, os.path.abspath(backup_dir))
+        )
+
+def release_backup_set(db) -> None:
+    """Stop change capture: forget the backup set and empty the change log.
+
+    Its directory takes no more increments; a base backup starts capture again.
+    """
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("DELETE FROM backup_set")
+            cursor.execute("DELETE FROM change_log")
+            cursor.execute("COMMIT")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+def take_base_backup(db, backup_dir: str, progress: Optional[Callable[[int, int], None]] = None,
+                     cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Take a full backup into ``backup_dir`` and record it in the manifest.
+
+    The backup directory becomes the database's backup set, which turns
+    change capture on; increments for the directory that held it before
+    are refused from then on.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    set_id = load_manifest(backup_dir).get("set_id") or uuid.uuid4().hex
+    owner = _backup_set(db)
+    claimed = owner != set_id
+    if claimed:
+        if owner is not None:
+            logger.warning(f"Backup set {owner} stops receiving increments; {backup_dir} takes over")
+        # Claimed before copying, so the previous set can no longer prune
+        # rows this base needs, and changes made meanwhile are captured
+        _claim_backup_set(db, set_id, backup_dir)
+    name = f"base-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}.db"
+    result = backup_database(db, os.path.join(backup_dir, name), progress=progress, cancel_event=cancel_event)
+    if result is None:
+        return None
+
+    # The copy knows exactly which change log rows it already contains
+    conn = sqlite3.connect(result["path"])
+    try:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    finally:
+        conn.close()
+    base = {"file": name, "seq": row[0] if row else 0, "taken_at": _utc_now()}
+
+    manifest = load_manifest(backup_dir)
+    manifest["set_id"] = set_id
+    manifest["bases"].append(base)
+    # Nothing older needs the rows before this base; after a claim the
+    # earlier increments cannot be continued anyway
+    starts_chain = claimed or not manifest["increments"]
+    if starts_chain:
+        manifest["last_seq"] = base["seq"]
+    _save_manifest(backup_dir, manifest)
+    if starts_chain:
+        _prune_change_log(db, base["seq"])
+    logger.info(f"Base backup {name} at change log seq {base['seq']}")
+    return {**result, **base}
+
+def _prune_change_log(db, upto_seq: int) -> None:
+    """Delete change log rows that a backup has captured.
+    
+    Later commits always get higher seqs, so nothing uncaptured is deleted.
+    """
+    with db.pool.connection() as conn:
+        conn.execute("DELETE FROM change_log WHERE seq <= ?", (upto_seq,))
+
+def write_increment(db, backup_dir: str, fetch_size: int = EXPORT_FETCH_SIZE) -> Dict:
+    """Capture change log rows since the last increment, then prune them.
+
+    Returns the increment's manifest entry, with ``rows`` of 0 and no file
+    when nothing changed. Raises ValueError if no base backup exists yet,
+    if the database does not belong to this directory's backup set, or if
+    change log rows since the last increment have already been pruned.
+    """
+    manifest = load_manifest(backup_dir)
+    if not manifest["bases"]:
+        raise ValueError("Take a base backup before writing increments")
+    after_seq = manifest["last_seq"]
+
+    owner = _backup_set(db)
+    if owner is None:
+        # Nothing was captured since the set was released
+        raise ValueError(f"The database has no backup set, so changes since the last increment were not "
+                         f"captured; take a base backup in {backup_dir}")
+    if owner != manifest.get("set_id"):
+        raise ValueError(f"The database's change log belongs to backup set {owner}, not {backup_dir}; "
+                         "take a base backup here to switch")
+    with db.pool.connection() as conn:
+        first = conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+        if first is None:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+            first = (row[0] if row else 0) + 1
+    if first > after_seq + 1:
+        raise ValueError(f"Change log rows {after_seq + 1} to {first - 1} were pruned before this backup "
+                         "captured them; take a new base backup")
+
+    part_path = os.path.join(backup_dir, "increment.part")
+    entry = {"after_seq": after_seq, "rows": 0}
+    with gzip.open(part_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        for rows in db.iter_query(
+            "SELECT seq, changed_at, table_name, op, row_key, row_data, txn FROM change_log "
+            "WHERE seq > ? ORDER BY seq",
+            (after_seq,), fetch_size
+        ):
+            # row_data is already JSON from the trigger; embed it as is
+            f.writelines(
+                f'{{"seq": {seq}, "at": "{changed_at}", "txn": {"null" if txn is None else txn}, '
+                f'"table": "{table}", "op": "{op}", "key": {json.dumps(key)}, "row": {data or "null"}}}\n'
+                for seq, changed_at, table, op, key, data, txn in rows
+            )
+            if entry["rows"] == 0:
+                entry["first_seq"], entry["first_at"] = rows[0][0], rows[0][1]
+            entry["rows"] += len(rows)
+            entry["last_seq"], entry["last_at"] = rows[-1][0], rows[-1][1]
+
+    if entry["rows"] == 0:
+        os.remove(part_path)
+        return entry
+    entry["file"] = f"incr-{entry['first_seq']:012d}-{entry['last_seq']:012d}.jsonl.gz"
+    with open(part_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(part_path, os.path.join(backup_dir, entry["file"]))
+    manifest["increments"].append(entry)
+    manifest["last_seq"] = entry["last_seq"]
+    _save_manifest(backup_dir, manifest)
+
+    # Only prune once the increment and manifest are durable
+    _prune_change_log(db, entry["last_seq"])
+    logger.info(f"Incremental backup {entry['file']}: {entry['rows']} changes")
+    return entry
+
+def _read_increment(path: str) -> Iterator[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+def _transactions(changes: Iterator[Dict]) -> Iterator[List[Dict]]:
+    """Group changes by the transaction that made them.
+
+    SQLite runs one write transaction at a time, so a transaction's changes
+    are consecutive. Changes logged before transactions were numbered stand
+    alone.
+    """
+    group = []
+    for change in changes:
+        if group and (change.get("txn") is None or change.get("txn") != group[-1].get("txn")):
+            yield group
+            group = []
+        group.append(change)
+    if group:
+        yield group
+
+def _decode(value):
+    if isinstance(value, dict) and "$hex" in value:
+        return bytes.fromhex(value["$hex"])
+    return value
+
+def _apply_change(cursor: sqlite3.Cursor, change: Dict) -> None:
+    """Replay one change log entry."""
+    table = change["table"]
+    key = CHANGE_LOG_TABLES[table][0]
+    if change["op"] == "D":
+        cursor.execute(f"DELETE FROM {table} WHERE {key} = ?", (change["key"],))
+        return
+    row = change["row"]
+    columns = list(row)
+    # Upsert rather than REPLACE: REPLACE deletes first, which would fire
+    # delete triggers and cascades that the log already accounts for
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET {updates}",
+        [_decode(row[c]) for c in columns]
+    )
+
+def _parse_until(until: str) -> str:
+    """``until`` in the change log's 'YYYY-MM-DD HH:MM:SS.fff' format, in UTC."""
+    try:
+        moment = datetime.fromisoformat(until)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid restore time {until!r}; expected 'YYYY-MM-DD HH:MM:SS[.fff]' (UTC)")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+def restore(backup_dir: str, dest_path: str, until: Optional[str] = None) -> Dict:
+    """Rebuild the database as of ``until`` into ``dest_path``.
+
+    ``until`` is an ISO 8601 time, UTC unless it carries an offset, such as
+    '2026-01-01 10:00:00' or '2026-01-01T10:00:00.250'. Without it
+    everything captured is replayed. Whole transactions are applied in
+    commit order, up to the last one whose changes are all stamped at or
+    before ``until``, so the result is a state the database committed. Raises
+    ValueError for an unparseable ``until``, if no base backup precedes it
+    or if the increments after it are incomplete.
+    """
+    if until is not None:
+        until = _parse_until(until)
+    manifest = load_manifest(backup_dir)
+    bases = [b for b in manifest["bases"] if until is None or b["taken_at"] <= until]
+    if not bases:
+        raise ValueError(f"No base backup taken before {until}")
+    base = max(bases, key=lambda b: b["seq"])
+
+    # Increments must chain on from the base without a gap
+    chain = []
+    seq = base["seq"]
+    for entry in sorted(manifest["increments"], key=lambda e: e["first_seq"]):
+        if entry["last_seq"] <= seq:
+            continue
+        if entry["after_seq"] > seq:
+            raise ValueError(f"Missing changes between seq {seq} and {entry['first_seq']}")
+        chain.append(entry)
+        seq = entry["last_seq"]
+
+    part_path = f"{dest_path}.part"
+    shutil.copyfile(os.path.join(backup_dir, base["file"]), part_path)
+    conn = sqlite3.connect(part_path, isolation_level=None)
+    applied = 0
+    last = {"seq": base["seq"], "at": base["taken_at"]}
+    try:
+        conn.execute("PRAGMA foreign_keys = OFF")
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        changes = (change for entry in chain for change in _read_increment(os.path.join(backup_dir, entry["file"]))
+                   if change["seq"] > base["seq"])
+        for transaction in _transactions(changes):
+            if until is not None and max(change["at"] for change in transaction) > until:
+                break
+            for change in transaction:
+                _apply_change(cursor, change)
+            applied += len(transaction)
+            last = transaction[-1]
+        if cursor.execute("PRAGMA foreign_key_check").fetchone():
+            raise sqlite3.IntegrityError("foreign key violations after replay")
+        # Replaying fired the change log triggers again; the restored
+        # database starts a fresh log that continues the original numbering
+        cursor.execute("DELETE FROM change_log")
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'change_log'")
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('change_log', ?)", (last["seq"],))
+        cursor.execute("COMMIT")
+    except BaseException:
+        conn.close()
+        os.remove(part_path)
+        raise
+    conn.close()
+
+    if not verify_backup(part_path):
+        os.remove(part_path)
+        raise sqlite3.DatabaseError("Restored database failed integrity check")
+    os.replace(part_path, dest_path)
+    result = {"base": base["file"], "applied": applied, "last_seq": last["seq"], "restored_to": last["at"]}
+    logger.info(f"Restored {dest_path}: {result}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("base", help="take a full base backup").add_argument("backup_dir")
+    commands.add_parser("increment", help="capture changes since the last backup").add_argument("backup_dir")
+    commands.add_parser("release", help="stop capturing changes for incremental backups")
+    restore_parser = commands.add_parser("restore", help="rebuild the database as of a point in time")
+    restore_parser.add_argument("backup_dir")
+    restore_parser.add_argument("dest")
+    restore_parser.add_argument("--until", help="ISO time, UTC unless an offset is given: "
+                                                "'YYYY-MM-DD HH:MM:SS' (default: latest)")
+    args = parser.parse_args()
+
+    if args.command == "restore":
+        print(restore(args.backup_dir, args.dest, args.until))
+        return
+    from database.db_manager import db_manager
+    if args.command == "base":
+        print(take_base_backup(db_manager, args.backup_dir))
+    elif args.command == "release":
+        release_backup_set(db_manager)
+    else:
+        print(write_increment(db_manager, args.backup_dir))
+
+if __name__ == "__main__":
+    main()
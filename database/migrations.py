@@ -0,0 +1,345 @@
+# database/migrations.py
+"""Versioned schema migrations for bank.db.
+
+``initialize_database`` creates the baseline tables; everything after that is
+a numbered migration recorded in the ``schema_version`` table. Migrations are
+applied in order, each in its own transaction. Append new entries to
+``MIGRATIONS``; never edit or renumber one that has shipped.
+"""
+import sqlite3
+import logging
+from typing import Callable, List, Tuple, Union
+from config import CURRENCY_DECIMALS
+
+logger = logging.getLogger(__name__)
+
+# A step is either an SQL statement or a callable that receives the cursor
+MigrationStep = Union[str, Callable[[sqlite3.Cursor], None]]
+
+def _rebuild_table(cursor: sqlite3.Cursor, table: str, create_sql: str, select_sql: str) -> None:
+    """Rebuild ``table`` with a new definition, keeping its rows and dependents.
+    
+    ``create_sql`` must create ``<table>_new``; ``select_sql`` is the
+    ``SELECT ... FROM <table>`` that fills it. Indexes, triggers and the
+    AUTOINCREMENT counter are carried over. Foreign keys must be off.
+    """
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    )
+    dependents = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+    row = cursor.fetchone()
+    old_seq = row[0] if row else 0
+    
+    cursor.execute(create_sql)
+    cursor.execute(f"INSERT INTO {table}_new {select_sql}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for sql in dependents:
+        cursor.execute(sql)
+        
+    # Never hand out an account/transaction number that was used before
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+    row = cursor.fetchone()
+    seq = max(old_seq, row[0] if row else 0)
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+    if seq:
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, seq))
+
+def _store_money_as_minor_units(cursor: sqlite3.Cursor) -> None:
+    """Convert REAL rupee balances and amounts to INTEGER paise."""
+    scale = 10 ** CURRENCY_DECIMALS
+    _rebuild_table(
+        cursor, "accounts",
+        """
+        CREATE TABLE accounts_new (
+            account_number INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            password TEXT NOT NULL,
+            balance INTEGER NOT NULL DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT balance_non_negative CHECK (balance >= 0)
+        )
+        """,
+        f"SELECT account_number, name, password, CAST(ROUND(balance * {scale}) AS INTEGER), created_at FROM accounts"
+    )
+    _rebuild_table(
+        cursor, "transactions",
+        """
+        CREATE TABLE transactions_new (
+            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_number INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            description TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (account_number) REFERENCES accounts(account_number) ON DELETE CASCADE
+        )
+        """,
+        f"SELECT transaction_id, account_number, type, CAST(ROUND(amount * {scale}) AS INTEGER), "
+        "description, timestamp FROM transactions"
+    )
+
+# FTS5 tokenizer of the account name index. Trigrams match any substring of
+# three or more characters, case-insensitively; SQLite has them from 3.34.
+ACCOUNT_NAME_TOKENIZER = "trigram"
+
+def _index_account_names(cursor: sqlite3.Cursor) -> None:
+    """Create the external-content FTS5 index over account names.
+
+    Without FTS5 or the tokenizer (SQLite before 3.34) no index is built
+    and DatabaseManager.search_accounts keeps matching names with LIKE.
+    """
+    cursor.execute("SAVEPOINT account_names_fts")
+    try:
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts USING fts5("
+            f"name, content='accounts', content_rowid='account_number', tokenize='{ACCOUNT_NAME_TOKENIZER}')"
+        )
+    except sqlite3.OperationalError as e:
+        cursor.execute("ROLLBACK TO account_names_fts")
+        cursor.execute("RELEASE account_names_fts")
+        logger.warning(f"SQLite {sqlite3.sqlite_version} cannot index account names ({str(e)}); "
+                       "name search falls back to LIKE")
+        return
+    cursor.execute("RELEASE account_names_fts")
+    for step in (
+        """
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_insert AFTER INSERT ON accounts BEGIN
+            INSERT INTO accounts_fts (rowid, name) VALUES (new.account_number, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_delete AFTER DELETE ON accounts BEGIN
+            INSERT INTO accounts_fts (accounts_fts, rowid, name) VALUES ('delete', old.account_number, old.name);
+        END
+        """,
+        # OF name: balance updates must not touch the index
+        """
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_update AFTER UPDATE OF name ON accounts BEGIN
+            INSERT INTO accounts_fts (accounts_fts, rowid, name) VALUES ('delete', old.account_number, old.name);
+            INSERT INTO accounts_fts (rowid, name) VALUES (new.account_number, new.name);
+        END
+        """,
+        "INSERT INTO accounts_fts (accounts_fts) VALUES ('rebuild')",
+    ):
+        cursor.execute(step)
+
+# Tables captured by the change log: primary key and columns. A migration
+# that changes one of these tables must recreate its change log triggers.
+CHANGE_LOG_TABLES = {
+    "accounts": ("account_number", ["account_number", "name", "password", "balance", "created_at"]),
+    "transactions": ("transaction_id", ["transaction_id", "account_number", "type", "amount",
+                                        "description", "timestamp"]),
+    "loan_applications": ("application_id", ["application_id", "account_number", "income", "credit_score",
+                                             "loan_amount", "loan_term", "status", "decision_date"]),
+    "admin": ("username", ["username", "password", "full_name", "last_login"]),
+}
+
+def _change_log_row(columns: List[str]) -> str:
+    """json_object() of a changed row. JSON cannot hold BLOBs (bcrypt hashes
+    are stored as bytes), so they are logged as {"$hex": "..."}."""
+    return "json_object(" + ", ".join(
+        f"'{c}', CASE typeof(new.{c}) WHEN 'blob' THEN json_object('$hex', hex(new.{c})) ELSE new.{c} END"
+        for c in columns
+    ) + ")"
+
+def _change_log_steps() -> List[str]:
+    """SQL creating the change_log table and the triggers that fill it."""
+    steps = [
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D')),
+            row_key,
+            row_data TEXT
+        )
+        """
+    ]
+    for table, (key, columns) in CHANGE_LOG_TABLES.items():
+        for event, op in (("INSERT", "I"), ("UPDATE", "U")):
+            steps.append(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_change_log_{event.lower()} AFTER {event} ON {table} BEGIN "
+                f"INSERT INTO change_log (table_name, op, row_key, row_data) "
+                f"VALUES ('{table}', '{op}', new.{key}, {_change_log_row(columns)}); END"
+            )
+        steps.append(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_change_log_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO change_log (table_name, op, row_key) VALUES ('{table}', 'D', old.{key}); END"
+        )
+    return steps
+
+# Run by every write transaction right after BEGIN (DatabaseManager.begin_write):
+# numbers the transaction so that a restore replays only whole ones. It
+# writes nothing while no backup set is claimed.
+NEXT_CHANGE_TXN = "UPDATE change_log_txn SET txn = txn + 1 WHERE EXISTS (SELECT 1 FROM backup_set)"
+
+def _backup_set_capture_steps() -> List[str]:
+    """SQL limiting change capture to a claimed backup set and numbering
+    every change with the transaction that made it."""
+    steps = [
+        "ALTER TABLE change_log ADD COLUMN txn INTEGER",
+        """
+        CREATE TABLE IF NOT EXISTS change_log_txn (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            txn INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO change_log_txn (id, txn) VALUES (1, 0)",
+        # Nothing consumes the log without a backup set
+        "DELETE FROM change_log WHERE NOT EXISTS (SELECT 1 FROM backup_set)",
+    ]
+    captured = "WHEN EXISTS (SELECT 1 FROM backup_set)"
+    txn = "(SELECT txn FROM change_log_txn)"
+    for table, (key, columns) in CHANGE_LOG_TABLES.items():
+        for event, op in (("INSERT", "I"), ("UPDATE", "U")):
+            steps.append(f"DROP TRIGGER IF EXISTS {table}_change_log_{event.lower()}")
+            steps.append(
+                f"CREATE TRIGGER {table}_change_log_{event.lower()} AFTER {event} ON {table} {captured} BEGIN "
+                f"INSERT INTO change_log (table_name, op, row_key, row_data, txn) "
+                f"VALUES ('{table}', '{op}', new.{key}, {_change_log_row(columns)}, {txn}); END"
+            )
+        steps.append(f"DROP TRIGGER IF EXISTS {table}_change_log_delete")
+        steps.append(
+            f"CREATE TRIGGER {table}_change_log_delete AFTER DELETE ON {table} {captured} BEGIN "
+            f"INSERT INTO change_log (table_name, op, row_key, txn) VALUES ('{table}', 'D', old.{key}, {txn}); END"
+        )
+    return steps
+
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, "Index transaction history by account", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_account_timestamp "
+        "ON transactions (account_number, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_account_id "
+        "ON transactions (account_number, transaction_id)",
+    ]),
+    (2, "Index loan applications by status and account", [
+        "CREATE INDEX IF NOT EXISTS idx_loan_applications_status_id "
+        "ON loan_applications (status, application_id)",
+        "CREATE INDEX IF NOT EXISTS idx_loan_applications_account_id "
+        "ON loan_applications (account_number, application_id)",
+    ]),
+    (3, "Index transactions by time for bank-wide history", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_timestamp "
+        "ON transactions (timestamp)",
+    ]),
+    (4, "Store balances and amounts as integer minor units", [
+        _store_money_as_minor_units,
+    ]),
+    (5, "Index account names for substring search", [
+        _index_account_names,
+    ]),
+    # Row-level change capture for incremental backups (database/incremental_backup.py)
+    (6, "Log row changes for incremental backups", _change_log_steps()),
+    # End-of-day balance snapshots (database/eod.py). Sparse: an account has
+    # a row only for days on which it had transactions.
+    (7, "Add daily balance snapshots", [
+        """
+        CREATE TABLE IF NOT EXISTS daily_balances (
+            account_number INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            closing_balance INTEGER NOT NULL,
+            PRIMARY KEY (account_number, day),
+            FOREIGN KEY (account_number) REFERENCES accounts(account_number) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS eod_runs (
+            day TEXT PRIMARY KEY,
+            accounts INTEGER NOT NULL,
+            completed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    # One row per bulk scoring run (services/loan_scoring.py), for throughput history
+    (8, "Record bulk loan scoring runs", [
+        """
+        CREATE TABLE IF NOT EXISTS loan_scoring_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at DATETIME NOT NULL,
+            applications INTEGER NOT NULL,
+            approved INTEGER NOT NULL,
+            seconds REAL NOT NULL,
+            per_second REAL NOT NULL,
+            completed INTEGER NOT NULL
+        )
+        """,
+    ]),
+    # The backup directory whose increments prune change_log
+    # (database/incremental_backup.py); at most one row
+    (9, "Record the incremental backup set", [
+        """
+        CREATE TABLE IF NOT EXISTS backup_set (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            set_id TEXT NOT NULL,
+            backup_dir TEXT NOT NULL,
+            claimed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    # Change capture costs a second row write per ledger change, so it only
+    # runs while a backup set is claimed (database/incremental_backup.py)
+    (10, "Capture changes for a backup set by transaction", _backup_set_capture_steps()),
+]
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the highest applied migration version (0 for a fresh database)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def apply_migrations(conn: sqlite3.Connection, migrations=MIGRATIONS) -> int:
+    """Apply all pending migrations and return the resulting schema version.
+
+    ``conn`` must be in autocommit mode (``isolation_level=None``).
+    Foreign keys are switched off while migrations run so tables can be
+    rebuilt (dropping a parent would otherwise cascade); integrity is
+    checked with ``foreign_key_check`` before each commit instead.
+    """
+    version = get_schema_version(conn)
+    pending = [m for m in sorted(migrations, key=lambda m: m[0]) if m[0] > version]
+    if not pending:
+        return version
+        
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for target, description, steps in pending:
+            cursor = conn.cursor()
+            # IMMEDIATE takes the write lock up front so two processes starting
+            # together cannot both apply the same migration
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if get_schema_version(conn) >= target:
+                    cursor.execute("ROLLBACK")
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                if cursor.execute("PRAGMA foreign_key_check").fetchone():
+                    raise sqlite3.IntegrityError("foreign key violations after migration")
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (target, description)
+                )
+                cursor.execute("COMMIT")
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK")
+                logger.error(f"Migration {target} ({description}) failed: {str(e)}")
+                raise
+            version = target
+            logger.info(f"Applied migration {target}: {description}")
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    return version
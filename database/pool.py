@@ -0,0 +1,135 @@
+# database/pool.py
+import queue
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+class ConnectionPool:
+    """A thread-aware pool of long-lived SQLite connections.
+
+    Connections are created lazily by ``factory`` up to ``size`` and handed out
+    to one thread at a time. A thread that already holds a connection gets the
+    same one back on a nested ``acquire()``, so pooled methods can call each
+    other without deadlocking on an exhausted pool. A ``size`` of 0 disables
+    pooling: every ``acquire()`` opens a fresh connection and ``release()``
+    closes it.
+    """
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int = 5, timeout: float = 30.0):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        # LIFO so the most recently used (warmest) connection is reused first
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size) if size > 0 else None
+        self._local = threading.local()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def acquire(self) -> sqlite3.Connection:
+        """Borrow a connection, waiting up to ``timeout`` seconds for a free one."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        if self._closed:
+            raise Exception("Database connection pool is closed")
+
+        if self._slots is None:
+            conn = self.factory()
+        else:
+            if not self._slots.acquire(timeout=self.timeout):
+                logger.error("Timed out waiting for a pooled database connection")
+                raise Exception(f"No database connection available after {self.timeout}s")
+            try:
+                conn = self._checkout()
+            except Exception:
+                self._slots.release()
+                raise
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection borrowed with ``acquire()``."""
+        if getattr(self._local, "conn", None) is not conn:
+            logger.warning("Released a database connection not held by this thread")
+            return
+
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        if self._slots is None:
+            conn.close()
+            return
+
+        try:
+            # Methods may bail out mid-transaction (e.g. insufficient balance);
+            # never hand an open transaction to the next borrower.
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding pooled connection: {str(e)}")
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager form of ``acquire()``/``release()``."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections; borrowed ones are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        """Take a healthy idle connection, or open a new one."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self.factory()
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _discard(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
@@ -1,5 +1,6 @@
 from database.db_manager import db_manager
 from utils.helpers import format_currency, format_date
+from utils.money import to_minor
 
 class AccountService:
     @staticmethod
@@ -16,6 +17,6 @@ class AccountService:
         """Handle money transfer with validation"""
         if from_acc == to_acc:
             raise ValueError("Cannot transfer to same account")
-        if amount <= 0:
+        if to_minor(amount) <= 0:
             raise ValueError("Amount must be positive")
         return db_manager.transfer(from_acc, to_acc, amount, description)
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""Fixtures shared by the test modules."""
+import os
+import shutil
+import tempfile
+import unittest
+from database.db_manager import DatabaseManager
+
+class DatabaseTestCase(unittest.TestCase):
+    """Runs each test against a fresh database file."""
+
+    pool_size = 2
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "test.db"), pool_size=self.pool_size)
+        self.db.initialize_database()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
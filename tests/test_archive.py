@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import unittest
+from datetime import datetime, timedelta, timezone
+from database.db_manager import ArchiveAttachError
+from helpers import DatabaseTestCase
+from database.archive import TRANSACTION_COLUMNS, _create_archive
+from database.archive import archive_transactions
+from database.columnar_export import export_columnar, read_columnar
+from database.exporter import export_transactions_csv
+
+class TestArchive(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = self.db.create_account("Alice", "password123")
+        self.bob = self.db.create_account("Bob", "password123")
+        self.carol = self.db.create_account("Carol", "password123")
+        self.db.apply_batch([{'type': 'Deposit', 'account_number': (self.alice, self.bob)[i % 2], 'amount': 10 + i}
+                             for i in range(60)])
+        self.db.deposit(self.carol, 5)
+        # Spread the history over three years, ten days apart, newest last.
+        # Half a day off the ten-day grid, so no row sits on an archive cutoff
+        # that is a whole number of days before the (slightly later) run.
+        now = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=12)
+        with self.db.pool.connection() as conn:
+            ids = [row[0] for row in conn.execute("SELECT transaction_id FROM transactions ORDER BY transaction_id")]
+            conn.executemany(
+                "UPDATE transactions SET timestamp = ? WHERE transaction_id = ?",
+                [((now - timedelta(days=10 * (len(ids) - n))).strftime("%Y-%m-%d %H:%M:%S"), tid)
+                 for n, tid in enumerate(ids)]
+            )
+        self.before = self.history()
+
+    def history(self, **filters):
+        rows, cursor = [], None
+        while True:
+            page, cursor = self.db.get_transactions_page(page_size=7, cursor=cursor, **filters)
+            rows.extend(page)
+            if cursor is None:
+                return rows
+
+    def hot_count(self):
+        with self.db.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM main.transactions").fetchone()[0]
+
+    def test_archived_history_reads_the_same(self):
+        result = archive_transactions(self.db, older_than_days=180, batch_size=5)
+        self.assertEqual(result['moved'], 61 - 18)
+        self.assertEqual(self.hot_count(), 18)
+        self.assertTrue(all(os.path.exists(os.path.join(self.db.archive_dir, f"transactions_{year}.db"))
+                            for year in result['years']))
+
+        self.assertEqual(self.history(), self.before)
+        self.assertEqual(self.history(account_number=self.alice),
+                         [t for t in self.before if t['account_number'] == self.alice])
+        self.assertEqual(self.db.count_transactions(), 61)
+        from_date = self.before[40]['timestamp'][:10]
+        to_date = self.before[20]['timestamp'][:10]
+        self.assertEqual(self.history(from_date=from_date, to_date=to_date), self.before[20:41])
+        self.assertEqual(self.db.count_transactions(from_date=from_date, to_date=to_date), 21)
+
+    def test_exports_cover_archives(self):
+        archive_transactions(self.db, older_than_days=180)
+        csv_path = os.path.join(self.tmp_dir, "all.csv")
+        self.assertEqual(export_transactions_csv(self.db, csv_path), 61)
+
+        out_dir = os.path.join(self.tmp_dir, "analytics")
+        self.assertEqual(export_columnar(self.db, out_dir, fmt="npz")["transactions"], 61)
+        exported = read_columnar(os.path.join(out_dir, "transactions"))
+        self.assertEqual(sorted(exported["transaction_id"].tolist()),
+                         sorted(t['transaction_id'] for t in self.before))
+
+    def test_last_activity_falls_back_to_archive(self):
+        archive_transactions(self.db, older_than_days=1)
+        self.assertEqual(self.hot_count(), 0)
+        accounts = {a['account_number']: a for a in self.db.get_all_accounts(include_last_activity=True)}
+        newest = {}
+        for t in self.before:
+            newest.setdefault(t['account_number'], t['timestamp'])
+        for number, timestamp in newest.items():
+            self.assertEqual(accounts[number]['last_activity'], timestamp)
+        self.assertEqual(self.db.get_last_activity(self.carol)['timestamp'], newest[self.carol])
+
+    def test_delete_account_removes_archived_rows(self):
+        archive_transactions(self.db, older_than_days=30)
+        self.assertTrue(self.db.delete_account(self.alice))
+        self.assertEqual(self.history(account_number=self.alice), [])
+        self.assertEqual(self.db.count_transactions(), 61 - 30)
+
+    def test_rerun_after_partial_move_is_safe(self):
+        archive_transactions(self.db, older_than_days=180)
+        # Simulate a crash between the archive and the hot-table commits of
+        # the last batch, leaving its newest row in both tiers
+        archived = self.before[18]
+        with self.db.pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO transactions (transaction_id, account_number, type, amount, description, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (archived['transaction_id'], archived['account_number'], archived['type'],
+                 int(archived['amount'] * 100), archived['description'], archived['timestamp'])
+            )
+        # Readers skip the duplicate
+        self.assertEqual(self.history(), self.before)
+        self.assertEqual(self.db.count_transactions(), 61)
+        self.assertEqual(self.db.count_transactions(account_number=archived['account_number']),
+                         sum(t['account_number'] == archived['account_number'] for t in self.before))
+        # The next run finishes the batch before moving anything
+        result = archive_transactions(self.db, older_than_days=180)
+        self.assertEqual((result['recovered'], result['moved']), (1, 0))
+        self.assertEqual(self.hot_count(), 18)
+        self.assertEqual(self.history(), self.before)
+        self.assertEqual(archive_transactions(self.db, older_than_days=180)['recovered'], 0)
+
+    def test_archive_files_are_plain_databases(self):
+        result = archive_transactions(self.db, older_than_days=180)
+        total = 0
+        for year in result['years']:
+            conn = sqlite3.connect(os.path.join(self.db.archive_dir, f"transactions_{year}.db"))
+            try:
+                years = conn.execute("SELECT DISTINCT substr(timestamp, 1, 4) FROM transactions").fetchall()
+                self.assertEqual(years, [(str(year),)])
+                total += conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            finally:
+                conn.close()
+        self.assertEqual(total, result['moved'])
+
+class TestManyArchiveYears(DatabaseTestCase):
+    """More years of history than SQLite can attach archives for."""
+
+    def setUp(self):
+        super().setUp()
+        self.alice = self.db.create_account("Alice", "password123")
+        # Two deposits in each of 2010-2020, then a fresh one
+        self.db.apply_batch([{'type': 'Deposit', 'account_number': self.alice, 'amount': 10 + i} for i in range(22)])
+        with self.db.pool.connection() as conn:
+            ids = [row[0] for row in conn.execute("SELECT transaction_id FROM transactions ORDER BY transaction_id")]
+            conn.executemany("UPDATE transactions SET timestamp = ? WHERE transaction_id = ?",
+                             [(f"{2010 + n // 2}-0{3 + n % 2 * 3}-15 12:00:00", tid) for n, tid in enumerate(ids)])
+        self.db.deposit(self.alice, 5)
+
+    def archive_files(self):
+        return sorted(name for name in os.listdir(self.db.archive_dir) if name.endswith(".db"))
+
+    def test_old_years_share_one_archive(self):
+        result = archive_transactions(self.db, older_than_days=30)
+        self.assertEqual(result['moved'], 22)
+        self.assertEqual(self.archive_files(),
+                         [f"transactions_{y}.db" for y in range(2013, 2021)] + ["transactions_older.db"])
+        history = self.db.get_transactions(self.alice)
+        self.assertEqual(len(history), 23)
+        self.assertEqual([t['timestamp'][:4] for t in history[1:]],
+                         [str(2010 + n // 2) for n in reversed(range(22))])
+        self.assertEqual(self.db.count_transactions(self.alice), 23)
+        statement = self.db.get_statement(self.alice)
+        self.assertEqual(len(statement['transactions']), 23)
+
+        # A query attaches only the archives its range reaches
+        self.assertEqual(self.db.count_transactions(self.alice, from_date="2019-01-01", to_date="2019-12-31"), 2)
+        with self.db.pool.connection() as conn:
+            self.assertEqual(self.db.transaction_sources(conn, "2019-01-01", "2019-12-31"), ["main", "archive_2019"])
+            self.assertEqual(self.db.transaction_sources(conn, "2011-01-01", "2011-12-31"), ["main", "archive_older"])
+
+    def test_existing_yearly_archives_are_folded(self):
+        # Eleven yearly files, as earlier versions created them
+        with self.db.pool.connection() as conn:
+            rows = conn.execute(f"SELECT {TRANSACTION_COLUMNS} FROM transactions "
+                                "WHERE timestamp < '2021-01-01'").fetchall()
+            conn.execute("DELETE FROM transactions WHERE timestamp < '2021-01-01'")
+        os.makedirs(self.db.archive_dir)
+        for year in range(2010, 2021):
+            path = os.path.join(self.db.archive_dir, f"transactions_{year}.db")
+            _create_archive(path)
+            archive = sqlite3.connect(path)
+            archive.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
+                                [tuple(r) for r in rows if r[5].startswith(str(year))])
+            archive.commit()
+            archive.close()
+
+        # Too many to attach at once: an error, not a short history
+        with self.assertRaises(ArchiveAttachError):
+            self.db.get_transactions(self.alice)
+        self.assertEqual(self.db.count_transactions(self.alice, from_date="2020-01-01"), 3)
+
+        result = archive_transactions(self.db, older_than_days=30)
+        self.assertEqual((result['moved'], result['folded']), (0, [2010, 2011, 2012]))
+        self.assertEqual(len(self.archive_files()), 9)
+        self.assertEqual(len(self.db.get_transactions(self.alice)), 23)
+        self.assertEqual(self.db.count_transactions(), 23)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import threading
+import unittest
+from helpers import DatabaseTestCase
+from database.backup import backup_database, verify_backup
+
+class TestOnlineBackup(DatabaseTestCase):
+    pool_size = 3
+
+    def setUp(self):
+        super().setUp()
+        with self.db.pool.connection() as conn:
+            conn.execute("INSERT INTO accounts (name, password) VALUES ('Alice', 'x')")
+            conn.executemany(
+                "INSERT INTO transactions (account_number, type, amount, description) VALUES (1, 'Deposit', ?, ?)",
+                [(i, "x" * 200) for i in range(5000)]
+            )
+            conn.commit()
+        self.dest = os.path.join(self.tmp_dir, "backup.db")
+
+    def count(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_backup_is_a_consistent_snapshot_while_writers_continue(self):
+        started = threading.Event()
+        stop = threading.Event()
+        writes = []
+
+        def writer():
+            started.wait()
+            while not stop.is_set():
+                if self.db.deposit(1, 1):
+                    writes.append(1)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        steps = []
+
+        def progress(done, total):
+            steps.append((done, total))
+            started.set()
+
+        try:
+            result = backup_database(self.db, self.dest, pages=5, sleep=0.005, progress=progress)
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertGreater(len(steps), 10)
+        self.assertEqual(steps[-1][0], steps[-1][1])
+        # Writers were not blocked, and none of their rows leaked into the copy
+        self.assertTrue(writes)
+        self.assertEqual(self.count(self.dest), 5000)
+        self.assertEqual(result["pages"], steps[-1][1])
+        self.assertTrue(verify_backup(self.dest))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+        self.assertFalse(os.path.exists(self.dest + "-wal"))
+
+    def test_cancel_leaves_existing_backup_untouched(self):
+        with open(self.dest, "wb") as f:
+            f.write(b"previous backup")
+        cancel = threading.Event()
+        result = backup_database(self.db, self.dest, pages=5, progress=lambda done, total: cancel.set(),
+                                 cancel_event=cancel)
+        self.assertIsNone(result)
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), b"previous backup")
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+if __name__ == '__main__':
+    unittest.main()
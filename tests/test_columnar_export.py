@@ -0,0 +1,77 @@
+import os
+import threading
+import unittest
+from helpers import DatabaseTestCase
+from database.columnar_export import export_columnar, read_columnar, load_state, parquet_available
+
+class TestColumnarExport(DatabaseTestCase):
+    fmt = "npz"
+
+    def setUp(self):
+        super().setUp()
+        self.out_dir = os.path.join(self.tmp_dir, "analytics")
+        with self.db.pool.connection() as conn:
+            conn.executemany("INSERT INTO accounts (name, password, balance) VALUES (?, 'secret', ?)",
+                             [("Alice", 150050), ("Bob", 0)])
+            self.add_transactions(conn, 1, 25)
+            conn.execute(
+                "INSERT INTO loan_applications (account_number, income, credit_score, loan_amount, loan_term) "
+                "VALUES (1, 50000, 700, 100000, 60)"
+            )
+            conn.commit()
+
+    @staticmethod
+    def add_transactions(conn, first, count):
+        # Ten transactions per day starting 2024-03-01
+        conn.executemany(
+            "INSERT INTO transactions (account_number, type, amount, description, timestamp) "
+            "VALUES (?, 'Deposit', ?, NULL, datetime('2024-03-01', ? || ' hours'))",
+            [(1 + i % 2, 100 * i + 5, (i - 1) * 24 // 10) for i in range(first, first + count)]
+        )
+
+    def test_typed_partitioned_export(self):
+        result = export_columnar(self.db, self.out_dir, fmt=self.fmt, chunk_size=7)
+        self.assertEqual(result, {"format": self.fmt, "transactions": 25, "last_transaction_id": 25,
+                                  "accounts": 2, "loan_applications": 1})
+        partitions = sorted(os.listdir(os.path.join(self.out_dir, "transactions")))
+        self.assertEqual(partitions, ["date=2024-03-01", "date=2024-03-02", "date=2024-03-03"])
+
+        transactions = read_columnar(os.path.join(self.out_dir, "transactions")).sort_values("transaction_id")
+        self.assertEqual(transactions["transaction_id"].tolist(), list(range(1, 26)))
+        self.assertEqual(str(transactions["amount_minor"].dtype), "int64")
+        self.assertEqual(transactions["amount_minor"].iloc[0], 105)
+        self.assertEqual(transactions["timestamp"].dtype.kind, "M")
+
+        accounts = read_columnar(os.path.join(self.out_dir, "accounts"))
+        self.assertNotIn("password", accounts.columns)
+        self.assertEqual(accounts["balance_minor"].tolist(), [150050, 0])
+        loans = read_columnar(os.path.join(self.out_dir, "loan_applications"))
+        self.assertEqual(loans["status"].tolist(), ["Pending"])
+
+    def test_incremental_runs_export_only_new_rows(self):
+        export_columnar(self.db, self.out_dir, fmt=self.fmt, chunk_size=10)
+        with self.db.pool.connection() as conn:
+            self.add_transactions(conn, 26, 5)
+            conn.commit()
+        result = export_columnar(self.db, self.out_dir, fmt=self.fmt, chunk_size=10)
+        self.assertEqual((result["transactions"], result["last_transaction_id"]), (5, 30))
+        ids = read_columnar(os.path.join(self.out_dir, "transactions"))["transaction_id"]
+        self.assertEqual(sorted(ids.tolist()), list(range(1, 31)))
+        self.assertEqual(export_columnar(self.db, self.out_dir, fmt=self.fmt)["transactions"], 0)
+
+    def test_cancel_resumes_from_last_chunk(self):
+        cancel = threading.Event()
+        result = export_columnar(self.db, self.out_dir, fmt=self.fmt, chunk_size=10,
+                                 progress=lambda done, total: cancel.set(), cancel_event=cancel)
+        self.assertIsNone(result)
+        self.assertEqual(load_state(self.out_dir)["last_transaction_id"], 10)
+        self.assertEqual(export_columnar(self.db, self.out_dir, fmt=self.fmt)["transactions"], 15)
+        ids = read_columnar(os.path.join(self.out_dir, "transactions"))["transaction_id"]
+        self.assertEqual(sorted(ids.tolist()), list(range(1, 26)))
+
+@unittest.skipUnless(parquet_available(), "no Parquet engine installed")
+class TestParquetExport(TestColumnarExport):
+    fmt = "parquet"
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from utils import predictor
+from utils.compiled_forest import CompiledForest, compile_forest, file_digest
+
+class TestCompiledForest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3)
+        X = rng.normal(size=(3000, 6)) * [1, 10, 1e3, 1e-3, 1, 5e5]
+        y = (X[:, 0] + X[:, 1] / 10 > 0).astype(int) + (X[:, 2] > 500)
+        # Deep, bootstrapped trees with three classes and fractional leaves
+        cls.model = RandomForestClassifier(n_estimators=40, min_samples_leaf=3, random_state=0).fit(X, y)
+        cls.X = rng.normal(size=(5000, 6)).astype(np.float32) * np.float32([1, 10, 1e3, 1e-3, 1, 5e5])
+        cls.forest = compile_forest(cls.model)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_matches_sklearn_exactly(self):
+        self.assertGreater(self.forest.max_depth, 5)
+        np.testing.assert_array_equal(self.forest.predict_proba(self.X), self.model.predict_proba(self.X))
+        np.testing.assert_array_equal(self.forest.predict(self.X), self.model.predict(self.X))
+        one = self.X[7:8]
+        np.testing.assert_array_equal(self.forest.predict_proba(one), self.model.predict_proba(one))
+
+    def test_leaf_counts_are_normalised(self):
+        # scikit-learn before 1.4 stores weighted class counts in tree_.value
+        def as_counts(estimator):
+            tree = estimator.tree_
+            counts = tree.value * tree.weighted_n_node_samples[:, None, None]
+            return SimpleNamespace(tree_=SimpleNamespace(
+                node_count=tree.node_count, children_left=tree.children_left, children_right=tree.children_right,
+                feature=tree.feature, threshold=tree.threshold, value=counts, max_depth=tree.max_depth))
+        old_model = SimpleNamespace(n_outputs_=1, n_classes_=self.model.n_classes_, classes_=self.model.classes_,
+                                    n_features_in_=self.model.n_features_in_,
+                                    estimators_=[as_counts(e) for e in self.model.estimators_])
+        forest = compile_forest(old_model)
+        np.testing.assert_allclose(forest.predict_proba(self.X), self.model.predict_proba(self.X), atol=1e-12)
+        np.testing.assert_array_equal(forest.predict(self.X), self.model.predict(self.X))
+
+    def test_thresholds_compare_exactly(self):
+        # Rows sitting exactly on, and one float32 step either side of, split points
+        tree = self.model.estimators_[0].tree_
+        splits = tree.children_left >= 0
+        rows = np.repeat(self.X[:1], splits.sum() * 3, axis=0)
+        thresholds = tree.threshold[splits].astype(np.float32)
+        values = np.concatenate([np.nextafter(thresholds, -np.inf), thresholds, np.nextafter(thresholds, np.inf)])
+        rows[np.arange(len(rows)), np.tile(tree.feature[splits], 3)] = values
+        np.testing.assert_array_equal(self.forest.predict_proba(rows), self.model.predict_proba(rows))
+
+    def test_save_and_load(self):
+        path = os.path.join(self.tmp_dir, "forest.npz")
+        self.forest.source_digest = "abc"
+        self.forest.save(path)
+        loaded = CompiledForest.load(path)
+        self.assertEqual(loaded.source_digest, "abc")
+        self.assertEqual((loaded.n_trees, loaded.n_nodes), (40, self.forest.n_nodes))
+        np.testing.assert_array_equal(loaded.predict_proba(self.X), self.model.predict_proba(self.X))
+
+    def test_shipped_model_is_current(self):
+        forest = CompiledForest.load(predictor.COMPILED_MODEL_PATH)
+        self.assertEqual(forest.source_digest, file_digest(predictor.MODEL_PATH))
+
+    def test_stale_compiled_model_is_rebuilt(self):
+        path = os.path.join(self.tmp_dir, "loan_model.npz")
+        self.forest.source_digest = "stale"
+        self.forest.save(path)
+        with mock.patch.object(predictor, "COMPILED_MODEL_PATH", path):
+            forest = predictor._load_forest()
+        self.assertEqual(forest.n_trees, len(predictor.get_model().estimators_))
+        self.assertEqual(CompiledForest.load(path).source_digest, file_digest(predictor.MODEL_PATH))
+
+if __name__ == '__main__':
+    unittest.main()
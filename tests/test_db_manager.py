@@ -0,0 +1,313 @@
+import os
+import threading
+import unittest
+from decimal import Decimal
+from database.db_manager import DatabaseManager
+from helpers import DatabaseTestCase
+
+class TestConnectionPool(DatabaseTestCase):
+    def test_connections_are_reused(self):
+        conn = self.db.pool.acquire()
+        self.db.pool.release(conn)
+        again = self.db.pool.acquire()
+        self.db.pool.release(again)
+        self.assertIs(conn, again)
+
+    def test_nested_acquire_returns_held_connection(self):
+        with self.db.pool.connection() as outer:
+            with self.db.pool.connection() as inner:
+                self.assertIs(outer, inner)
+
+    def test_release_rolls_back_open_transaction(self):
+        account = self.db.create_account("Pool User", "password123")
+        conn = self.db.pool.acquire()
+        conn.execute("BEGIN")
+        conn.execute("UPDATE accounts SET balance = 99 WHERE account_number = ?", (account,))
+        self.db.pool.release(conn)
+        self.assertEqual(self.db.get_balance(account), 0)
+
+    def test_failed_withdrawal_leaves_connection_clean(self):
+        account = self.db.create_account("Pool User", "password123")
+        self.assertFalse(self.db.withdraw(account, 50))
+        self.assertTrue(self.db.deposit(account, 20))
+        self.assertEqual(self.db.get_balance(account), 20)
+
+    def test_threads_share_bounded_pool(self):
+        account = self.db.create_account("Pool User", "password123")
+        workers = [threading.Thread(target=lambda: [self.db.deposit(account, 1) for _ in range(25)])
+                   for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        self.assertEqual(self.db.get_balance(account), 100)
+
+    def test_close_rejects_new_borrowers(self):
+        self.db.close()
+        with self.assertRaises(Exception):
+            self.db.pool.acquire()
+
+class TestStorageProfile(DatabaseTestCase):
+    def test_profile_applied_at_startup(self):
+        self.assertEqual(self.db.verify_storage_profile(), {})
+        with self.db.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_open_reader_does_not_block_writer(self):
+        account = self.db.create_account("WAL User", "password123")
+        reader = self.db.create_connection()
+        try:
+            reader.execute("BEGIN")
+            reader.execute("SELECT COUNT(*) FROM transactions").fetchone()
+            self.assertTrue(self.db.deposit(account, 10))
+            # The reader keeps its snapshot until it ends its transaction
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM transactions").fetchone()[0], 0)
+            reader.execute("COMMIT")
+        finally:
+            reader.close()
+
+    def test_unknown_profile_rejected(self):
+        with self.assertRaises(ValueError):
+            DatabaseManager(os.path.join(self.tmp_dir, "other.db"), storage_profile="turbo")
+
+class TestTransactionPaging(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.account = self.db.create_account("Paging User", "password123")
+        other = self.db.create_account("Other User", "password123")
+        rows = []
+        for i in range(30):
+            # Several rows share each timestamp, as they do within one second
+            day = 1 + i // 10
+            kind = "Deposit" if i % 3 else "Withdrawal"
+            rows.append((self.account, kind, 1, f"2024-01-{day:02d} 10:00:00"))
+            rows.append((other, "Deposit", 1, f"2024-01-{day:02d} 10:00:00"))
+        with self.db.pool.connection() as conn:
+            conn.executemany(
+                "INSERT INTO transactions (account_number, type, amount, timestamp) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def fetch_all(self, **filters):
+        pages, cursor = [], None
+        while True:
+            page, cursor = self.db.get_transactions_page(self.account, page_size=7, cursor=cursor, **filters)
+            pages.append(page)
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_history_once_in_order(self):
+        pages = self.fetch_all()
+        rows = [t for page in pages for t in page]
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(len({t['transaction_id'] for t in rows}), 30)
+        keys = [(t['timestamp'], t['transaction_id']) for t in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertTrue(all(t['account_number'] == self.account for t in rows))
+
+    def test_type_and_date_filters_run_in_sql(self):
+        rows = [t for page in self.fetch_all(types=("Withdrawal",), from_date="2024-01-02",
+                                             to_date="2024-01-02") for t in page]
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(t['type'] == "Withdrawal" and t['timestamp'].startswith("2024-01-02")
+                            for t in rows))
+
+    def test_bank_wide_history(self):
+        self.assertEqual(len(self.db.get_all_transactions(limit=None)), 60)
+        self.assertEqual(len(self.db.get_all_transactions(limit=25)), 25)
+
+class TestMinorUnits(DatabaseTestCase):
+    def test_amounts_are_exact(self):
+        account = self.db.create_account("Cents User", "password123")
+        for _ in range(10):
+            self.assertTrue(self.db.deposit(account, 0.1))
+        self.assertTrue(self.db.withdraw(account, "0.30"))
+        self.assertEqual(self.db.get_balance(account), Decimal("0.70"))
+        self.assertEqual(self.db.get_transactions(account, limit=1)[0]['amount'], Decimal("0.30"))
+        with self.db.pool.connection() as conn:
+            stored = conn.execute("SELECT balance, typeof(balance) FROM accounts").fetchone()
+        self.assertEqual(tuple(stored), (70, "integer"))
+
+    def test_sub_paise_and_invalid_amounts_rejected(self):
+        account = self.db.create_account("Cents User", "password123")
+        self.assertFalse(self.db.deposit(account, 0.001))
+        self.assertFalse(self.db.deposit(account, "ten"))
+        self.assertFalse(self.db.deposit(account, True))
+
+    def test_amounts_finer_than_a_paisa_are_not_rounded(self):
+        a = self.db.create_account("Cents User", "password123")
+        b = self.db.create_account("Other User", "password123")
+        self.assertTrue(self.db.deposit(a, 100))
+        for amount in (10.005, "10.005", Decimal("0.015")):
+            self.assertFalse(self.db.deposit(a, amount))
+            self.assertFalse(self.db.withdraw(a, amount))
+            self.assertFalse(self.db.transfer(a, b, amount))
+        # Trailing zeros are still whole paise
+        self.assertTrue(self.db.deposit(a, "0.500"))
+
+        results = self.db.apply_batch([
+            {'type': 'Deposit', 'account_number': a, 'amount': 10.005},
+            {'type': 'Withdrawal', 'account_number': a, 'amount': "0.001"},
+            {'type': 'Deposit', 'account_number': a, 'amount': 10.01},
+        ])
+        self.assertEqual([r['success'] for r in results], [False, False, True])
+        self.assertEqual(results[0]['error'], "Invalid amount: 10.005")
+        results = self.db.bulk_transfer([(a, b, 10.005, "Split"), (a, b, 10.5, "Whole")])
+        self.assertEqual([r['success'] for r in results], [False, True])
+
+        self.assertEqual(self.db.get_balance(a), Decimal("100.01"))
+        self.assertEqual(self.db.get_balance(b), Decimal("10.50"))
+
+class TestSystemStats(DatabaseTestCase):
+    def test_aggregates_and_cache(self):
+        a = self.db.create_account("Stats A", "password123")
+        b = self.db.create_account("Stats B", "password123")
+        self.db.deposit(a, 100)
+        self.db.deposit(b, "50.50")
+        self.db.transfer(a, b, 25)
+        self.db.submit_loan_application(a, 50000, 700, 100000, 60)
+
+        stats = self.db.get_system_stats()
+        self.assertEqual(stats['total_accounts'], 2)
+        self.assertEqual(stats['total_balance'], Decimal("150.50"))
+        self.assertEqual(stats['average_balance'], Decimal("75.25"))
+        self.assertEqual((stats['min_balance'], stats['max_balance']), (Decimal("75.00"), Decimal("75.50")))
+        self.assertEqual(stats['today_by_type']['Deposit'], {'count': 2, 'amount': Decimal("150.50")})
+        self.assertEqual(stats['today_count'], 4)
+        self.assertEqual(stats['loans_by_status'], {'Pending': 1})
+
+        self.db.deposit(a, 1)
+        self.assertIs(self.db.get_system_stats(), stats)
+        self.assertEqual(self.db.get_system_stats(use_cache=False)['today_count'], 5)
+
+class TestLastActivity(DatabaseTestCase):
+    def test_accounts_listing_is_one_query(self):
+        accounts = [self.db.create_account(f"User {i}", "password123") for i in range(5)]
+        for account in accounts[:3]:
+            self.db.deposit(account, 10)
+        self.db.transfer(accounts[0], accounts[1], 5)
+
+        statements = []
+        conn = self.db.pool.acquire()
+        conn.set_trace_callback(statements.append)
+        try:
+            listing = self.db.get_all_accounts(include_last_activity=True)
+        finally:
+            conn.set_trace_callback(None)
+            self.db.pool.release(conn)
+
+        self.assertEqual(len([s for s in statements if s.lstrip().upper().startswith("SELECT")]), 1)
+        for acc in listing:
+            last = self.db.get_last_activity(acc['account_number'])
+            self.assertEqual(acc['last_activity'], last['timestamp'] if last else None)
+        self.assertIsNone(listing[4]['last_activity'])
+        self.assertEqual(self.db.get_last_activity(accounts[1])['type'], "Transfer In")
+
+class TestAccountSearch(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        names = ["Asha Verma", "Rahul Sharma", "ASHOK Kumar", "Priya 50% Off", "Neha_Singh"]
+        with self.db.pool.connection() as conn:
+            # Skip bcrypt: only the names matter here
+            conn.executemany(
+                "INSERT INTO accounts (name, password) VALUES (?, 'x')",
+                [(names[i % len(names)],) for i in range(130)]
+            )
+            conn.commit()
+
+    def search_all(self, term, page_size=7):
+        found, after = [], None
+        while True:
+            rows, after = self.db.search_accounts(term, page_size=page_size, after=after)
+            found.extend(row['account_number'] for row in rows)
+            if after is None:
+                return found
+
+    def test_name_substring_ignores_case(self):
+        expected = [n for n in range(1, 131) if n % 5 in (1, 3)]
+        self.assertEqual(self.search_all("ash"), expected)
+        self.assertEqual(self.search_all("ASH", page_size=100), expected)
+        self.assertEqual(self.search_all("sh"), [n for n in range(1, 131) if n % 5 in (1, 2, 3)])
+        self.assertEqual(self.search_all("50%"), list(range(4, 131, 5)))
+        self.assertEqual(self.search_all("%"), list(range(4, 131, 5)))
+        self.assertEqual(self.search_all("a_s"), list(range(5, 131, 5)))
+        self.assertEqual(self.search_all("a%"), [])
+        self.assertEqual(self.search_all(""), list(range(1, 131)))
+
+    def test_number_prefix(self):
+        self.assertEqual(self.search_all("1"), [1] + list(range(10, 20)) + list(range(100, 131)))
+        self.assertEqual(self.search_all("12"), [12] + list(range(120, 130)))
+        self.assertEqual(self.search_all("0"), [])
+        self.assertEqual(self.search_all("999"), [])
+
+    def test_index_follows_renames_and_deletes(self):
+        with self.db.pool.connection() as conn:
+            conn.execute("UPDATE accounts SET name = 'Zoravar Gill' WHERE account_number = 2")
+            conn.commit()
+        self.db.deposit(7, 10)
+        self.db.delete_account(12)
+        self.assertEqual(self.search_all("zoravar"), [2])
+        self.assertNotIn(2, self.search_all("sharma"))
+        self.assertNotIn(12, self.search_all("sharma"))
+        self.assertIn(7, self.search_all("sharma"))
+
+class TestApplyBatch(DatabaseTestCase):
+    def test_per_operation_results_in_order(self):
+        account = self.db.create_account("Batch User", "password123")
+        results = self.db.apply_batch([
+            {'type': 'Deposit', 'account_number': account, 'amount': 100},
+            {'type': 'Withdrawal', 'account_number': account, 'amount': 60},
+            {'type': 'Withdrawal', 'account_number': account, 'amount': 60},
+            {'type': 'Deposit', 'account_number': 9999, 'amount': 10},
+            {'type': 'Deposit', 'account_number': account, 'amount': -5},
+            {'type': 'Refund', 'account_number': account, 'amount': 5},
+            {'type': 'deposit', 'account_number': account, 'amount': 20, 'description': 'Salary'},
+        ], chunk_size=3)
+        self.assertEqual([r['success'] for r in results], [True, True, False, False, False, False, True])
+        self.assertEqual(results[2]['error'], "Insufficient balance")
+        self.assertEqual(self.db.get_balance(account), 60)
+        history = self.db.get_transactions(account)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[0]['description'], 'Salary')
+
+class TestBulkTransfer(DatabaseTestCase):
+    def make_ledger(self, db):
+        accounts = [db.create_account(f"Settle {i}", "password123") for i in range(3)]
+        db.deposit(accounts[0], 100)
+        db.deposit(accounts[1], 10)
+        return accounts
+
+    def ledger(self, db):
+        with db.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT account_number, type, amount, description FROM transactions ORDER BY transaction_id"
+            ).fetchall()
+            balances = conn.execute("SELECT account_number, balance FROM accounts ORDER BY account_number").fetchall()
+        return [tuple(r) for r in rows], [tuple(b) for b in balances]
+
+    def test_matches_sequential_transfers(self):
+        a, b, c = self.make_ledger(self.db)
+        transfers = [
+            (a, b, 70, "Invoice 1"),
+            (b, c, 75, "Invoice 2"),   # only possible thanks to the first row
+            (a, c, 40, "Invoice 3"),   # overdraft
+            (c, c, 5, "Self"),
+            (c, 9999, 5, "Unknown"),
+            (c, a, 0, "Zero"),
+            (c, a, 25.5, "Refund"),
+        ]
+        bulk = self.db.bulk_transfer(transfers, chunk_size=4)
+
+        other = DatabaseManager(os.path.join(self.tmp_dir, "sequential.db"), pool_size=1)
+        other.initialize_database()
+        try:
+            self.make_ledger(other)
+            sequential = [other.transfer(*t) for t in transfers]
+            self.assertEqual([r['success'] for r in bulk], sequential)
+            self.assertEqual(self.ledger(self.db), self.ledger(other))
+        finally:
+            other.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from helpers import DatabaseTestCase
+from database.eod import run_end_of_day
+from database.archive import archive_transactions
+from utils.report_generator import generate_statement_pdf
+
+DAYS = 20
+
+class TestEndOfDay(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = self.db.create_account("Alice", "password123")
+        self.bob = self.db.create_account("Bob", "password123")
+        # Two operations a day for DAYS days ending today, a transfer every third day
+        for day in range(DAYS):
+            self.assertTrue(self.db.deposit(self.alice, 100 + day))
+            if day % 3 == 0:
+                self.assertTrue(self.db.transfer(self.alice, self.bob, Decimal('12.34')))
+            else:
+                self.assertTrue(self.db.withdraw(self.alice, 7))
+        self.start = date.today() - timedelta(days=DAYS - 1)
+        with self.db.pool.connection() as conn:
+            rows = conn.execute("SELECT transaction_id FROM transactions ORDER BY transaction_id").fetchall()
+            # Transfers write two rows, so stamp by position in the day's batch
+            stamps, day, seen = [], 0, 0
+            for (tid,) in rows:
+                stamps.append((f"{self.start + timedelta(days=day)} 12:{seen:02d}:00", tid))
+                seen += 1
+                if seen == (3 if day % 3 == 0 else 2):
+                    day, seen = day + 1, 0
+            conn.executemany("UPDATE transactions SET timestamp = ? WHERE transaction_id = ?", stamps)
+
+    def day(self, n):
+        return (self.start + timedelta(days=n)).isoformat()
+
+    def replayed(self, account_number, from_date, to_date):
+        """Statement computed the slow way, from the full history."""
+        history = self.db.get_all_transactions(limit=None)
+        history = [t for t in reversed(history) if t['account_number'] == account_number]
+        sign = lambda t: -t['amount'] if t['type'] in ("Withdrawal", "Transfer Out") else t['amount']
+        opening = sum((sign(t) for t in history if t['timestamp'][:10] < from_date), Decimal("0.00"))
+        items = [t for t in history if from_date <= t['timestamp'][:10] <= to_date]
+        return opening, opening + sum((sign(t) for t in items), Decimal("0.00")), items
+
+    def assert_statement_matches(self, account_number, from_date, to_date):
+        statement = self.db.get_statement(account_number, from_date, to_date)
+        opening, closing, items = self.replayed(account_number, from_date, to_date)
+        self.assertEqual(statement['opening_balance'], opening)
+        self.assertEqual(statement['closing_balance'], closing)
+        self.assertEqual(statement['transactions'], items)
+
+    def test_statement_without_snapshots(self):
+        self.assert_statement_matches(self.alice, self.day(5), self.day(9))
+
+    def test_snapshots_are_incremental_and_resumable(self):
+        first = run_end_of_day(self.db, through=self.day(9))
+        self.assertEqual(first['days'], 10)
+        second = run_end_of_day(self.db, through=self.day(DAYS - 2))
+        self.assertEqual(second['days'], DAYS - 2 - 9)
+        self.assertEqual(run_end_of_day(self.db, through=self.day(DAYS - 2))['days'], 0)
+        with self.db.pool.connection() as conn:
+            bob_days = conn.execute("SELECT COUNT(*) FROM daily_balances WHERE account_number = ?",
+                                    (self.bob,)).fetchone()[0]
+            latest = conn.execute("SELECT closing_balance FROM daily_balances WHERE account_number = ? "
+                                  "ORDER BY day DESC LIMIT 1", (self.alice,)).fetchone()[0]
+        # Sparse: Bob only has a snapshot on transfer days
+        self.assertEqual(bob_days, len(range(0, DAYS - 1, 3)))
+        _, closing, _ = self.replayed(self.alice, self.day(0), self.day(DAYS - 2))
+        self.assertEqual(Decimal(latest) / 100, closing)
+
+    def test_statement_ranges_match_replay(self):
+        run_end_of_day(self.db, through=self.day(12))
+        for account in (self.alice, self.bob):
+            for from_day, to_day in ((0, 0), (3, 7), (10, 15), (13, DAYS - 1), (1, DAYS - 1)):
+                self.assert_statement_matches(account, self.day(from_day), self.day(to_day))
+        statement = self.db.get_statement(self.alice, self.day(0), self.day(DAYS - 1))
+        self.assertEqual(statement['closing_balance'], self.db.get_balance(self.alice))
+
+    def test_statement_uses_archives(self):
+        run_end_of_day(self.db, through=self.day(DAYS - 2))
+        archive_transactions(self.db, older_than_days=DAYS // 2)
+        self.assert_statement_matches(self.alice, self.day(2), self.day(DAYS - 1))
+
+    def test_unknown_account(self):
+        self.assertIsNone(self.db.get_statement(9999, self.day(0), self.day(1)))
+        with self.assertRaises(ValueError):
+            generate_statement_pdf(9999, self.day(0), self.day(1), db=self.db)
+
+    def test_statement_pdf(self):
+        self.db.deposit(self.bob, 1, "Gift ₹ from Zoë")
+        pdf = generate_statement_pdf(self.bob, self.day(0), date.today().isoformat(), db=self.db)
+        self.assertIsInstance(pdf, bytes)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+
+if __name__ == '__main__':
+    unittest.main()
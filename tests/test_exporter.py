@@ -0,0 +1,53 @@
+import csv
+import os
+import threading
+import unittest
+from helpers import DatabaseTestCase
+from database.exporter import export_transactions_csv
+
+class TestTransactionExport(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = self.db.create_account("Alice", "password123")
+        self.bob = self.db.create_account("Bob", "password123")
+        ops = [{'type': 'Deposit', 'account_number': self.alice, 'amount': "10.05", 'description': 'Cash'}] * 40
+        ops += [{'type': 'Deposit', 'account_number': self.bob, 'amount': 3}] * 15
+        self.db.apply_batch(ops)
+        self.path = os.path.join(self.tmp_dir, "export.csv")
+
+    def read_rows(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+
+    def test_bank_export_streams_every_row_newest_first(self):
+        progress = []
+        written = export_transactions_csv(
+            self.db, self.path, fetch_size=7, progress=lambda done, total: progress.append((done, total))
+        )
+        self.assertEqual(written, 55)
+        rows = self.read_rows()
+        self.assertEqual(rows[0], ["ID", "Account", "Type", "Amount", "Description", "Date"])
+        self.assertEqual([int(r[0]) for r in rows[1:]], list(range(55, 0, -1)))
+        self.assertEqual(rows[-1][1:5], [str(self.alice), "Deposit", "10.05", "Cash"])
+        self.assertEqual(progress[0], (7, 55))
+        self.assertEqual(progress[-1], (55, 55))
+        # The pooled connection was handed back
+        self.assertIsNone(getattr(self.db.pool._local, "conn", None))
+
+    def test_account_export_omits_account_column(self):
+        self.assertEqual(export_transactions_csv(self.db, self.path, account_number=self.bob), 15)
+        rows = self.read_rows()
+        self.assertEqual(rows[0], ["ID", "Type", "Amount", "Description", "Date"])
+        self.assertEqual(rows[1][1:3], ["Deposit", "3.00"])
+
+    def test_cancel_leaves_no_file(self):
+        cancel = threading.Event()
+        result = export_transactions_csv(
+            self.db, self.path, fetch_size=10, cancel_event=cancel, progress=lambda done, total: cancel.set()
+        )
+        self.assertIsNone(result)
+        self.assertFalse([f for f in os.listdir(self.tmp_dir) if f.startswith("export")])
+        self.assertIsNone(getattr(self.db.pool._local, "conn", None))
+
+if __name__ == '__main__':
+    unittest.main()
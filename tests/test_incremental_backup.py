@@ -0,0 +1,209 @@
+import os
+import gzip
+import json
+import sqlite3
+import time
+import unittest
+from database.db_manager import DatabaseManager
+from helpers import DatabaseTestCase
+from database.incremental_backup import (take_base_backup, write_increment, restore, release_backup_set,
+                                         load_manifest, MANIFEST)
+
+TABLES = {
+    "accounts": "account_number",
+    "transactions": "transaction_id",
+    "loan_applications": "application_id",
+    "admin": "username",
+}
+
+class TestIncrementalBackup(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backup_dir = os.path.join(self.tmp_dir, "backups")
+        self.alice = self.db.create_account("Alice", "password123")
+        self.bob = self.db.create_account("Bob", "password123")
+        self.db.deposit(self.alice, 500)
+
+    def dump(self, conn):
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY {key}").fetchall()
+                for table, key in TABLES.items()}
+
+    def live_state(self):
+        with self.db.pool.connection() as conn:
+            conn.row_factory = None
+            try:
+                return self.dump(conn)
+            finally:
+                conn.row_factory = sqlite3.Row
+
+    def restored_state(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return self.dump(conn)
+        finally:
+            conn.close()
+
+    def now(self):
+        with self.db.pool.connection() as conn:
+            return conn.execute("SELECT strftime('%Y-%m-%d %H:%M:%f', 'now')").fetchone()[0]
+
+    def test_restore_latest_matches_live_database(self):
+        take_base_backup(self.db, self.backup_dir)
+        self.db.transfer(self.alice, self.bob, "120.50")
+        carol = self.db.create_account("Carol", "password123")
+        self.db.deposit(carol, 75)
+        self.db.submit_loan_application(carol, 50000, 700, 100000, 60)
+        first = write_increment(self.db, self.backup_dir)
+        self.db.delete_account(self.bob)
+        with self.db.pool.connection() as conn:
+            conn.execute("UPDATE accounts SET name = 'Alice Rao' WHERE account_number = ?", (self.alice,))
+        second = write_increment(self.db, self.backup_dir)
+
+        self.assertGreater(first["rows"], 0)
+        self.assertEqual(second["after_seq"], first["last_seq"])
+        # Captured rows are pruned from the live log, and an idle increment is empty
+        with self.db.pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0], 0)
+        self.assertEqual(write_increment(self.db, self.backup_dir)["rows"], 0)
+
+        dest = os.path.join(self.tmp_dir, "restored.db")
+        result = restore(self.backup_dir, dest)
+        self.assertEqual(result["last_seq"], second["last_seq"])
+        self.assertEqual(self.restored_state(dest), self.live_state())
+
+        restored = DatabaseManager(dest, pool_size=1)
+        try:
+            self.assertTrue(restored.authenticate_user(str(self.alice), "password123"))
+            self.assertEqual([a["account_number"] for a in restored.search_accounts("rao")[0]], [self.alice])
+            self.assertEqual(restored.search_accounts("bob")[0], [])
+        finally:
+            restored.close()
+
+    def test_restore_to_point_in_time(self):
+        take_base_backup(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 40)
+        time.sleep(0.01)
+        until = self.now()
+        expected = self.live_state()
+        time.sleep(0.01)
+        self.db.withdraw(self.alice, 100)
+        self.db.delete_account(self.bob)
+        write_increment(self.db, self.backup_dir)
+
+        dest = os.path.join(self.tmp_dir, "restored.db")
+        result = restore(self.backup_dir, dest, until=until)
+        self.assertLessEqual(result["restored_to"], until)
+        self.assertEqual(self.restored_state(dest), expected)
+
+        with self.assertRaises(ValueError):
+            restore(self.backup_dir, dest, until="2000-01-01 00:00:00")
+
+        # The same moment written with a 'T' or an offset is the same point
+        os.remove(dest)
+        restore(self.backup_dir, dest, until=until.replace(" ", "T"))
+        self.assertEqual(self.restored_state(dest), expected)
+        os.remove(dest)
+        restore(self.backup_dir, dest, until=until.replace(" ", "T") + "+00:00")
+        self.assertEqual(self.restored_state(dest), expected)
+        for bad in ("yesterday", "2026-13-01 00:00:00", "01/02/2026"):
+            with self.assertRaises(ValueError):
+                restore(self.backup_dir, dest, until=bad)
+
+    def test_restore_never_splits_a_transaction(self):
+        take_base_backup(self.db, self.backup_dir)
+        expected = self.live_state()
+        self.db.apply_batch([{"type": "Deposit", "account_number": self.bob, "amount": 1}] * 20000,
+                            chunk_size=20000)
+        entry = write_increment(self.db, self.backup_dir)
+        with gzip.open(os.path.join(self.backup_dir, entry["file"]), "rt", encoding="utf-8") as f:
+            stamps = [json.loads(line)["at"] for line in f]
+        middle = stamps[len(stamps) // 2]
+        # The batch's changes are stamped over time, so the middle one splits it
+        self.assertLess(middle, stamps[-1])
+
+        dest = os.path.join(self.tmp_dir, "restored.db")
+        result = restore(self.backup_dir, dest, until=middle)
+        self.assertEqual(result["applied"], 0)
+        self.assertEqual(self.restored_state(dest), expected)
+        conn = sqlite3.connect(dest)
+        try:
+            mismatched = conn.execute(
+                "SELECT COUNT(*) FROM accounts a WHERE balance != (SELECT COALESCE(SUM(CASE WHEN type IN "
+                "('Withdrawal', 'Transfer Out') THEN -amount ELSE amount END), 0) FROM transactions t "
+                "WHERE t.account_number = a.account_number)"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(mismatched, 0)
+
+        os.remove(dest)
+        self.assertEqual(restore(self.backup_dir, dest, until=stamps[-1])["applied"], len(stamps))
+        self.assertEqual(self.restored_state(dest), self.live_state())
+
+    def test_changes_are_captured_only_for_a_backup_set(self):
+        def logged():
+            with self.db.pool.connection() as conn:
+                return conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+        # setUp's writes happened before any base backup
+        self.assertEqual(logged(), 0)
+        take_base_backup(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 1)
+        self.assertGreater(logged(), 0)
+
+        release_backup_set(self.db)
+        self.db.deposit(self.bob, 2)
+        self.assertEqual(logged(), 0)
+        with self.assertRaises(ValueError):
+            write_increment(self.db, self.backup_dir)
+        # A new base in the same directory starts capturing again
+        take_base_backup(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 3)
+        self.assertGreater(write_increment(self.db, self.backup_dir)["rows"], 0)
+        dest = os.path.join(self.tmp_dir, "restored.db")
+        restore(self.backup_dir, dest)
+        self.assertEqual(self.restored_state(dest), self.live_state())
+
+    def test_missing_increment_is_detected(self):
+        take_base_backup(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 1)
+        write_increment(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 2)
+        write_increment(self.db, self.backup_dir)
+
+        manifest = load_manifest(self.backup_dir)
+        del manifest["increments"][0]
+        with open(os.path.join(self.backup_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        with self.assertRaises(ValueError):
+            restore(self.backup_dir, os.path.join(self.tmp_dir, "restored.db"))
+
+    def test_second_backup_directory_is_refused(self):
+        take_base_backup(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 1)
+        write_increment(self.db, self.backup_dir)
+
+        # A base elsewhere takes the change log over from the first set
+        other_dir = os.path.join(self.tmp_dir, "other")
+        take_base_backup(self.db, other_dir)
+        self.db.deposit(self.bob, 2)
+        with self.assertRaises(ValueError):
+            write_increment(self.db, self.backup_dir)
+        self.assertGreater(write_increment(self.db, other_dir)["rows"], 0)
+        self.assertNotEqual(load_manifest(other_dir)["set_id"], load_manifest(self.backup_dir)["set_id"])
+
+    def test_pruned_changes_are_detected(self):
+        take_base_backup(self.db, self.backup_dir)
+        self.db.deposit(self.bob, 1)
+        self.db.deposit(self.bob, 2)
+        # Another consumer of the log pruned rows this set has not captured
+        with self.db.pool.connection() as conn:
+            conn.execute("DELETE FROM change_log WHERE seq = (SELECT MIN(seq) FROM change_log)")
+        with self.assertRaises(ValueError):
+            write_increment(self.db, self.backup_dir)
+        with self.db.pool.connection() as conn:
+            conn.execute("DELETE FROM change_log")
+        with self.assertRaises(ValueError):
+            write_increment(self.db, self.backup_dir)
+
+if __name__ == '__main__':
+    unittest.main()
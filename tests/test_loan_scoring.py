@@ -0,0 +1,95 @@
+import os
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+from services import loan_scoring
+from helpers import DatabaseTestCase
+from services.loan_scoring import score_pending_loans
+from utils.predictor import predict_loan_eligibility_batch
+
+class TestLoanScoring(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.account = self.db.create_account("Alice", "password123")
+        rng = np.random.default_rng(7)
+        self.features = np.column_stack([
+            rng.integers(5000, 200000, 250), rng.integers(300, 851, 250),
+            rng.integers(1000, 500000, 250), rng.integers(6, 361, 250),
+        ])
+        with self.db.pool.connection() as conn:
+            conn.executemany(
+                "INSERT INTO loan_applications (account_number, income, credit_score, loan_amount, loan_term) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.account, *row) for row in self.features.tolist()]
+            )
+
+    def statuses(self):
+        with self.db.pool.connection() as conn:
+            return conn.execute(
+                "SELECT status, decision_date FROM loan_applications ORDER BY application_id"
+            ).fetchall()
+
+    def test_scores_every_pending_application(self):
+        # Decided by hand before the run: must not be rescored
+        self.assertTrue(self.db.update_loan_application(1, "Approved"))
+        seen = []
+        result = score_pending_loans(self.db, chunk_size=64, progress=lambda done, total: seen.append((done, total)))
+
+        eligible, _ = predict_loan_eligibility_batch(self.features)
+        expected = ["Approved" if e else "Rejected" for e in eligible]
+        expected[0] = "Approved"
+        rows = self.statuses()
+        self.assertEqual([r['status'] for r in rows], expected)
+        self.assertTrue(all(r['decision_date'] for r in rows))
+        self.assertEqual(result['applications'], 249)
+        self.assertEqual(result['approved'] + result['rejected'], 249)
+        self.assertEqual(result['approved'], expected[1:].count("Approved"))
+        self.assertEqual(seen[-1], (249, 249))
+        self.assertEqual(len(seen), 4)
+
+        with self.db.pool.connection() as conn:
+            run = conn.execute("SELECT * FROM loan_scoring_runs").fetchone()
+        self.assertEqual((run['applications'], run['approved'], run['completed']), (249, result['approved'], 1))
+        self.assertEqual(score_pending_loans(self.db)['applications'], 0)
+
+    def test_decisions_made_during_the_run_are_not_counted(self):
+        # An admin decides application 5 after the chunk is read, before it is written
+        def decide_then_score(features):
+            self.assertTrue(self.db.update_loan_application(5, "Approved"))
+            return predict_loan_eligibility_batch(features)
+        with mock.patch.object(loan_scoring, "predict_loan_eligibility_batch", side_effect=decide_then_score):
+            result = score_pending_loans(self.db, chunk_size=1000)
+
+        eligible, _ = predict_loan_eligibility_batch(self.features)
+        expected = ["Approved" if e else "Rejected" for e in eligible]
+        expected[4] = "Approved"
+        self.assertEqual([r['status'] for r in self.statuses()], expected)
+        approved = sum(e for i, e in enumerate(eligible.tolist()) if i != 4)
+        self.assertEqual((result['applications'], result['approved']), (249, approved))
+        with self.db.pool.connection() as conn:
+            run = conn.execute("SELECT applications, approved FROM loan_scoring_runs").fetchone()
+        self.assertEqual(tuple(run), (249, approved))
+
+    def test_cancel_keeps_written_chunks(self):
+        cancel = threading.Event()
+        result = score_pending_loans(self.db, chunk_size=100, progress=lambda done, total: cancel.set(),
+                                     cancel_event=cancel)
+        self.assertIsNone(result)
+        self.assertEqual(len(self.db.get_all_loan_applications("Pending")), 150)
+        with self.db.pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT completed FROM loan_scoring_runs").fetchone()[0], 0)
+        self.assertEqual(score_pending_loans(self.db)['applications'], 150)
+        self.assertEqual(self.db.get_all_loan_applications("Pending"), [])
+
+    def test_update_loan_application(self):
+        self.assertFalse(self.db.update_loan_application(1, "Pending"))
+        self.assertFalse(self.db.update_loan_application(9999, "Rejected"))
+        self.assertTrue(self.db.update_loan_application(2, "Rejected"))
+        rejected = self.db.get_all_loan_applications("Rejected")
+        self.assertEqual([a['application_id'] for a in rejected], [2])
+        self.assertIsNotNone(rejected[0]['decision_date'])
+        self.assertEqual(len(self.db.get_all_loan_applications()), 250)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+from database.db_manager import DatabaseManager
+from helpers import DatabaseTestCase
+from database import migrations
+from database.migrations import MIGRATIONS, apply_migrations, get_schema_version
+
+class TestMigrations(DatabaseTestCase):
+    pool_size = 1
+
+    def query_plan(self, sql, params=()):
+        with self.db.pool.connection() as conn:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return " | ".join(row["detail"] for row in rows)
+
+    def test_all_migrations_applied_once(self):
+        latest = max(version for version, _, _ in MIGRATIONS)
+        with self.db.pool.connection() as conn:
+            self.assertEqual(get_schema_version(conn), latest)
+            # Re-running is a no-op
+            self.assertEqual(apply_migrations(conn), latest)
+            count = conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+        self.assertEqual(count, len(MIGRATIONS))
+
+    def test_transaction_history_uses_account_timestamp_index(self):
+        plan = self.query_plan(
+            "SELECT type, amount, description, timestamp FROM transactions "
+            "WHERE account_number = ? ORDER BY timestamp DESC LIMIT ?",
+            (1, 100)
+        )
+        self.assertIn("idx_transactions_account_timestamp", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_transaction_lookup_by_id_uses_account_id_index(self):
+        plan = self.query_plan(
+            "SELECT transaction_id FROM transactions "
+            "WHERE account_number = ? AND transaction_id > ? ORDER BY transaction_id",
+            (1, 0)
+        )
+        self.assertIn("idx_transactions_account_id", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_transaction_pages_use_index_without_sort(self):
+        plan = self.query_plan(
+            "SELECT * FROM transactions WHERE account_number = ? AND (timestamp, transaction_id) < (?, ?) "
+            "ORDER BY timestamp DESC, transaction_id DESC LIMIT ?",
+            (1, "2024-01-01 00:00:00", 10, 50)
+        )
+        self.assertIn("idx_transactions_account_timestamp", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_loan_queries_use_indexes(self):
+        by_account = self.query_plan(
+            "SELECT * FROM loan_applications WHERE account_number = ? ORDER BY application_id DESC",
+            (1,)
+        )
+        self.assertIn("idx_loan_applications_account_id", by_account)
+        self.assertNotIn("TEMP B-TREE", by_account)
+
+        by_status = self.query_plan(
+            "SELECT * FROM loan_applications WHERE status = ? ORDER BY application_id",
+            ("Pending",)
+        )
+        self.assertIn("idx_loan_applications_status_id", by_status)
+        self.assertNotIn("TEMP B-TREE", by_status)
+
+    def test_account_search_avoids_scans_and_sorts(self):
+        by_name = self.query_plan(
+            "SELECT a.account_number FROM accounts_fts f JOIN accounts a ON a.account_number = f.rowid "
+            "WHERE accounts_fts MATCH ? AND f.rowid > ? ORDER BY f.rowid LIMIT ?",
+            ('"sharma"', 0, 50)
+        )
+        self.assertIn("VIRTUAL TABLE INDEX", by_name)
+        self.assertNotIn("TEMP B-TREE", by_name)
+
+        by_number = self.query_plan(
+            "SELECT account_number FROM accounts a WHERE a.account_number >= ? AND a.account_number < ? "
+            "AND a.account_number > ? ORDER BY a.account_number LIMIT ?",
+            (120, 130, 0, 50)
+        )
+        self.assertIn("INTEGER PRIMARY KEY", by_number)
+        self.assertNotIn("TEMP B-TREE", by_number)
+
+class TestAccountNameIndexFallback(unittest.TestCase):
+    def test_search_without_trigram_tokenizer(self):
+        # As on SQLite before 3.34, which has no trigram tokenizer
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        db = DatabaseManager(os.path.join(tmp_dir, "old.db"), pool_size=1)
+        self.addCleanup(db.close)
+        with mock.patch.object(migrations, "ACCOUNT_NAME_TOKENIZER", "no_such_tokenizer"), \
+                self.assertLogs(migrations.logger, "WARNING"):
+            db.initialize_database()
+        with db.pool.connection() as conn:
+            self.assertEqual(get_schema_version(conn), max(version for version, _, _ in MIGRATIONS))
+            self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'accounts_fts'").fetchone())
+
+        alice = db.create_account("Alice Rao", "password123")
+        db.create_account("Bob", "password123")
+        self.assertEqual([a["account_number"] for a in db.search_accounts("RAO")[0]], [alice])
+        self.assertEqual([a["account_number"] for a in db.search_accounts("lice r")[0]], [alice])
+
+class TestMinorUnitMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "legacy.db"), pool_size=1)
+        # Build the database as it was before money moved to integer paise
+        before = [m for m in MIGRATIONS if m[0] < 4]
+        with mock.patch("database.db_manager.apply_migrations",
+                        lambda conn: apply_migrations(conn, before)):
+            self.db.initialize_database()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_real_rupees_become_integer_paise(self):
+        with self.db.pool.connection() as conn:
+            conn.execute("INSERT INTO accounts (account_number, name, password, balance) VALUES (7, 'A', 'x', ?)",
+                         (0.1 + 0.2,))
+            conn.execute("INSERT INTO transactions (account_number, type, amount) VALUES (7, 'Deposit', 1234.565)")
+            apply_migrations(conn)
+            balance = conn.execute("SELECT balance, typeof(balance) FROM accounts").fetchone()
+            amount = conn.execute("SELECT amount, typeof(amount) FROM transactions").fetchone()
+            indexes = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transactions'")}
+            seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'accounts'").fetchone()[0]
+
+        self.assertEqual(tuple(balance), (30, "integer"))
+        self.assertEqual(tuple(amount), (123457, "integer"))
+        self.assertIn("idx_transactions_account_timestamp", indexes)
+        self.assertEqual(seq, 7)
+        self.assertEqual(self.db.get_balance(7), Decimal("0.30"))
+
+if __name__ == "__main__":
+    unittest.main()
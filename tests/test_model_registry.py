@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from utils import predictor
+from utils.model_registry import ModelRegistry
+from utils.predictor import FEATURES, predict_loan_eligibility, prediction_cache
+
+APPLICATION = (45000, 700, 100000, 60)
+
+def fit_model(path, approve_good_credit=True, n_features=4):
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(5000, 200000, 500), rng.integers(300, 851, 500),
+                         rng.integers(1000, 500000, 500), rng.integers(6, 361, 500)])[:, :n_features]
+    y = (X[:, 1] > 600) == approve_good_credit
+    joblib.dump(RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y.astype(int)), path)
+    return path
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.registry = ModelRegistry(os.path.join(self.tmp_dir, "registry"))
+        self.approver = fit_model(os.path.join(self.tmp_dir, "approver.pkl"))
+        self.rejecter = fit_model(os.path.join(self.tmp_dir, "rejecter.pkl"), approve_good_credit=False)
+
+    def test_register_and_activate(self):
+        self.assertEqual((self.registry.versions(), self.registry.active_version()), ([], None))
+        report = {"rows": 500, "stages": [{"stage": "evaluate", "accuracy": 0.99}]}
+        first = self.registry.register(self.approver, FEATURES, report)
+        second = self.registry.register(self.rejecter, FEATURES, activate=True)
+        self.assertEqual((first, second), ("v0001", "v0002"))
+        self.assertEqual(self.registry.versions(), ["v0001", "v0002"])
+        self.assertEqual(self.registry.active_version(), "v0002")
+        # Only the versions and the pointer are left behind
+        self.assertEqual(sorted(os.listdir(self.registry.root)), ["ACTIVE", "v0001", "v0002"])
+
+        metadata = self.registry.metadata(first)
+        self.assertEqual(metadata["features"], list(FEATURES))
+        self.assertEqual((metadata["n_trees"], metadata["params"]["n_estimators"]), (10, 10))
+        self.assertEqual(metadata["training"], report)
+        self.assertIn("trained_at", metadata)
+        X = np.array([APPLICATION], dtype=np.float32)
+        np.testing.assert_array_equal(self.registry.load_forest(first).predict_proba(X),
+                                      joblib.load(self.approver).predict_proba(X))
+
+        self.registry.activate(first)
+        self.assertEqual(self.registry.active_version(), first)
+
+    def test_rejects_unusable_models(self):
+        version = self.registry.register(self.approver, FEATURES, activate=True)
+        with self.assertRaises(ValueError):
+            self.registry.register(fit_model(os.path.join(self.tmp_dir, "three.pkl"), n_features=3), FEATURES)
+        self.assertEqual(sorted(os.listdir(self.registry.root)), ["ACTIVE", version])
+        with self.assertRaises(ValueError):
+            self.registry.activate("v0099")
+
+        broken = self.registry.register(self.rejecter, FEATURES)
+        with open(self.registry.path(broken, "model.npz"), "wb") as f:
+            f.write(b"not a forest")
+        with self.assertRaises(Exception):
+            self.registry.activate(broken)
+        self.assertEqual(self.registry.active_version(), version)
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.registry = ModelRegistry(os.path.join(self.tmp_dir, "registry"))
+        self.registry.register(fit_model(os.path.join(self.tmp_dir, "approver.pkl")), FEATURES, activate=True)
+        patches = [mock.patch.object(predictor, name, None)
+                   for name in ("_model", "_forest", "_forest_version", "_forest_signature", "_failed_signature")]
+        patches += [mock.patch.object(predictor, "_model_path", predictor.MODEL_PATH),
+                    mock.patch.object(predictor, "REGISTRY_DIR", self.registry.root),
+                    mock.patch.object(predictor, "MODEL_CHECK_INTERVAL", 0),
+                    mock.patch.object(predictor, "_next_model_check", 0.0)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(predictor.wait_for_reload)
+        prediction_cache.clear()
+
+    def test_swaps_after_new_model_loads(self):
+        self.assertTrue(predict_loan_eligibility(*APPLICATION))
+        self.assertEqual(predictor.current_model_version(), "v0001")
+        self.registry.register(fit_model(os.path.join(self.tmp_dir, "rejecter.pkl"), approve_good_credit=False),
+                               FEATURES, activate=True)
+
+        # Hold the new model's load open: predictions meanwhile come from v0001
+        loading = threading.Event()
+        release = threading.Event()
+        load_forest = ModelRegistry.load_forest
+        def slow_load(registry, version):
+            loading.set()
+            release.wait(5)
+            return load_forest(registry, version)
+        with mock.patch.object(ModelRegistry, "load_forest", slow_load):
+            self.assertTrue(predict_loan_eligibility(*APPLICATION))
+            self.assertTrue(loading.wait(5))
+            self.assertTrue(predict_loan_eligibility(*APPLICATION))
+            self.assertEqual(predictor.current_model_version(), "v0001")
+            release.set()
+            predictor.wait_for_reload()
+
+        self.assertEqual(predictor.current_model_version(), "v0002")
+        self.assertFalse(predict_loan_eligibility(*APPLICATION))
+        self.assertTrue(predictor.get_model().estimators_)
+
+    def test_broken_model_keeps_current(self):
+        self.assertTrue(predict_loan_eligibility(*APPLICATION))
+        broken = self.registry.register(fit_model(os.path.join(self.tmp_dir, "rejecter.pkl"),
+                                                  approve_good_credit=False), FEATURES)
+        with open(self.registry.path(broken, "model.npz"), "wb") as f:
+            f.write(b"not a forest")
+        # Pointed at directly, as activate() would refuse it
+        with open(os.path.join(self.registry.root, "ACTIVE"), "w") as f:
+            f.write(broken)
+
+        with self.assertLogs(predictor.logger, "ERROR"):
+            self.assertTrue(predict_loan_eligibility(*APPLICATION))
+            predictor.wait_for_reload()
+        self.assertEqual(predictor.current_model_version(), "v0001")
+        # Not retried on every prediction
+        reload_thread = predictor._reload_thread
+        self.assertTrue(predict_loan_eligibility(*APPLICATION))
+        self.assertIs(predictor._reload_thread, reload_thread)
+
+if __name__ == '__main__':
+    unittest.main()
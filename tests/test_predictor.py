@@ -0,0 +1,177 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import threading
+import unittest
+import warnings
+from unittest import mock
+import numpy as np
+import pandas as pd
+from utils import predictor
+from utils.predictor import (FEATURES, PredictionCache, bucket_features, predict_loan_eligibility,
+                             predict_loan_eligibility_batch, prediction_cache)
+
+def random_applications(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(5000, 200000, n),
+        rng.integers(300, 851, n),
+        rng.integers(1000, 500000, n),
+        rng.integers(6, 361, n),
+    ])
+
+class TestPredictor(unittest.TestCase):
+    def reference(self, X):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            frame = pd.DataFrame(X, columns=list(FEATURES))
+            return predictor.get_model().predict(frame) == 1, predictor.get_model().predict_proba(frame)[:, 1]
+
+    def test_batch_matches_model(self):
+        X = random_applications(2000)
+        eligible, probability = predict_loan_eligibility_batch(X)
+        expected_eligible, expected_probability = self.reference(X)
+        np.testing.assert_array_equal(eligible, expected_eligible)
+        np.testing.assert_array_equal(probability, expected_probability)
+
+    def test_column_arguments(self):
+        X = random_applications(50, seed=1)
+        by_matrix = predict_loan_eligibility_batch(X)
+        by_columns = predict_loan_eligibility_batch(income=X[:, 0], credit=list(X[:, 1]),
+                                                    loan_amount=X[:, 2], loan_term=X[:, 3])
+        np.testing.assert_array_equal(by_matrix[0], by_columns[0])
+        np.testing.assert_array_equal(by_matrix[1], by_columns[1])
+
+    def test_single_row_matches_batch(self):
+        X = random_applications(200, seed=2)
+        eligible, _ = predict_loan_eligibility_batch(X)
+        self.assertEqual([predict_loan_eligibility(*row) for row in X.tolist()], eligible.tolist())
+        self.assertIsInstance(predict_loan_eligibility(45000, 700, 100000, 60), bool)
+
+    def test_rejects_malformed_input(self):
+        with self.assertRaises(ValueError):
+            predict_loan_eligibility_batch([[1, 2, 3]])
+        with self.assertRaises(ValueError):
+            predict_loan_eligibility_batch(income=[1, 2], credit=[700], loan_amount=[1, 2], loan_term=[1, 2])
+        with self.assertRaises(ValueError):
+            predict_loan_eligibility_batch([[45000, float("nan"), 100000, 60]])
+        with self.assertRaises(ValueError):
+            predict_loan_eligibility(45000, float("inf"), 100000, 60)
+
+class TestLazyLoading(unittest.TestCase):
+    def test_import_does_not_load_model(self):
+        # A fresh interpreter, so other tests cannot have loaded sklearn already
+        code = ("import sys; from utils import predictor; "
+                "assert not predictor.is_model_loaded() and 'sklearn' not in sys.modules; "
+                "predictor.warm_up().join(); assert predictor.is_model_loaded(); "
+                "predictor.predict_loan_eligibility(45000, 700, 100000, 60); "
+                # The compiled forest needs NumPy only
+                "assert 'sklearn' not in sys.modules")
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True)
+
+    def test_concurrent_loads_share_one_model(self):
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(predictor.get_forest())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(models), 8)
+        self.assertTrue(all(m is models[0] for m in models))
+        self.assertIs(predictor.model, predictor.get_model())
+
+class TestPredictionCache(unittest.TestCase):
+    def setUp(self):
+        prediction_cache.clear()
+
+    def test_lru_and_ttl(self):
+        now = [0.0]
+        cache = PredictionCache(max_size=2, ttl=10, clock=lambda: now[0])
+        cache.put("a", True)
+        cache.put("b", False)
+        self.assertTrue(cache.get("a"))
+        cache.put("c", True)  # evicts b, the least recently used
+        self.assertIsNone(cache.get("b"))
+        now[0] = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats(), {"size": 1, "hits": 1, "misses": 2, "evictions": 1, "expirations": 1})
+
+    def test_put_after_clear_is_dropped(self):
+        cache = PredictionCache(max_size=4, ttl=10)
+        generation = cache.generation
+        cache.clear()
+        cache.put("a", True, generation)
+        self.assertIsNone(cache.get("a"))
+
+    def test_repeat_checks_hit(self):
+        expected = predict_loan_eligibility_batch([[45000, 700, 100000, 60]])[0][0]
+        before = prediction_cache.stats()
+        for _ in range(3):
+            self.assertEqual(predict_loan_eligibility(45000, 700, 100000, 60), expected)
+        # Equal as float32, so the same entry
+        self.assertEqual(predict_loan_eligibility(45000.000001, 700, 100000, 60), expected)
+        after = prediction_cache.stats()
+        self.assertEqual((after['misses'] - before['misses'], after['hits'] - before['hits']), (1, 3))
+
+    def test_bucketed_checks_share_an_entry(self):
+        rounded = bucket_features(45210, 702, 99600, 60)
+        self.assertEqual(rounded, (45000, 700, 100000, 60))
+        expected = predict_loan_eligibility_batch([rounded])[0][0]
+        before = prediction_cache.stats()['misses']
+        self.assertEqual(predict_loan_eligibility(45210, 702, 99600, 60, bucketed=True), expected)
+        self.assertEqual(predict_loan_eligibility(44900, 699, 100400, 60, bucketed=True), expected)
+        self.assertEqual(prediction_cache.stats()['misses'] - before, 1)
+
+    def use_model_copy(self):
+        """Serve a copy of the shipped model files; returns their paths by name."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        paths = {name: os.path.join(tmp_dir, os.path.basename(getattr(predictor, name)))
+                 for name in ("MODEL_PATH", "COMPILED_MODEL_PATH")}
+        for name, path in paths.items():
+            shutil.copy(getattr(predictor, name), path)
+        patches = [mock.patch.object(predictor, name, path) for name, path in paths.items()]
+        patches += [mock.patch.object(predictor, name, None)
+                    for name in ("_model", "_forest", "_forest_version", "_forest_signature", "_failed_signature")]
+        patches += [mock.patch.object(predictor, "_model_path", paths["MODEL_PATH"]),
+                    mock.patch.object(predictor, "REGISTRY_DIR", os.path.join(tmp_dir, "registry")),
+                    mock.patch.object(predictor, "MODEL_CHECK_INTERVAL", 0)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(predictor.wait_for_reload)
+        return paths
+
+    def test_model_file_change_invalidates(self):
+        paths = self.use_model_copy()
+        predict_loan_eligibility(45000, 700, 100000, 60)
+        forest = predictor.get_forest()
+        predict_loan_eligibility(45000, 700, 100000, 60)
+        self.assertEqual(prediction_cache.stats()['size'], 1)
+        self.assertIs(predictor.get_forest(), forest)
+
+        stat = os.stat(paths["MODEL_PATH"])
+        os.utime(paths["MODEL_PATH"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        predictor._next_model_check = 0
+        generation = prediction_cache.generation
+        # Answered by the current forest while the new one loads
+        predict_loan_eligibility(45000, 700, 100000, 60)
+        predictor.wait_for_reload()
+        self.assertEqual(prediction_cache.generation, generation + 1)
+        self.assertIsNot(predictor.get_forest(), forest)
+
+    def test_recompiling_does_not_reload(self):
+        paths = self.use_model_copy()
+        os.remove(paths["COMPILED_MODEL_PATH"])
+        forest = predictor.get_forest()
+        self.assertTrue(os.path.exists(paths["COMPILED_MODEL_PATH"]))
+        generation = prediction_cache.generation
+        predict_loan_eligibility(45000, 700, 100000, 60)
+        predictor.wait_for_reload()
+        self.assertEqual(prediction_cache.generation, generation)
+        self.assertIs(predictor.get_forest(), forest)
+
+if __name__ == '__main__':
+    unittest.main()
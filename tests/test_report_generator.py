@@ -0,0 +1,87 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import zlib
+import unittest
+from decimal import Decimal
+from utils.report_generator import StatementTemplate, get_template, build_statement_pdf
+
+def statement(rows, description="Deposit"):
+    return {
+        'account_number': 7, 'from_date': '2026-01-01', 'to_date': '2026-01-31',
+        'opening_balance': Decimal('100.00'), 'total_credits': Decimal('2469.00'),
+        'total_debits': Decimal('1234.50'), 'closing_balance': Decimal('1334.50'),
+        'transactions': [
+            {'transaction_id': i, 'account_number': 7, 'timestamp': f'2026-01-{1 + i % 28:02d} 10:00:00',
+             'type': ('Deposit', 'Withdrawal', 'Transfer Out')[i % 3], 'amount': Decimal('1234.5'),
+             'description': description}
+            for i in range(rows)
+        ],
+    }
+
+def page_texts(pdf):
+    """Strings drawn on each page, in order."""
+    data = bytes(pdf.output())
+    streams = [zlib.decompress(m.group(1)) for m in
+               re.finditer(rb"/Filter /FlateDecode[^>]*>>\s*stream\r?\n(.*?)\r?\nendstream", data, re.S)]
+    return [[s.decode("latin-1") for s in re.findall(rb"\((.*?)\) Tj", stream)]
+            for stream in streams if b"Tj" in stream]
+
+class TestStatementTemplate(unittest.TestCase):
+    def setUp(self):
+        self.template = get_template()
+
+    def test_template_is_shared(self):
+        self.assertIs(get_template(), self.template)
+        self.assertIs(build_statement_pdf(statement(1)).template, self.template)
+
+    def test_saves_to_path(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "statement.pdf")
+            pdf = build_statement_pdf(statement(3), path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), bytes(pdf.output()))
+
+    def test_text_width_matches_fpdf(self):
+        pdf = build_statement_pdf(statement(0))
+        pdf.set_font(StatementTemplate.FONT, '', 10)
+        for text in ("Rs. 1,234.50", "Transfer Out", "WWW iii"):
+            self.assertAlmostEqual(self.template.text_width(text), pdf.get_string_width(text))
+
+    def test_rows_are_formatted_up_front(self):
+        rows = self.template.format_rows(statement(3, "x" * 200 + " ₹")['transactions'])
+        self.assertEqual([r[2] for r in rows], ["Rs. 1,234.50", "-Rs. 1,234.50", "-Rs. 1,234.50"])
+        for _, _, amount, amount_x, description in rows:
+            self.assertAlmostEqual(amount_x + self.template.text_width(amount), self.template.amount_right)
+            self.assertTrue(description.endswith("..."))
+            self.assertLessEqual(self.template.text_width(description), self.template.description_width)
+
+    def test_long_statement_breaks_pages(self):
+        pdf = build_statement_pdf(statement(60))
+        pages = page_texts(pdf)
+        self.assertEqual(len(pages), pdf.page_no())
+        self.assertGreater(pdf.page_no(), 1)
+        for n, texts in enumerate(pages, start=1):
+            # Title, column headings and footer repeat on every page
+            self.assertEqual(texts[0], "Bank Account Statement")
+            self.assertIn("Description", texts)
+            self.assertEqual(texts[-1], f"Page {n}")
+        drawn = [t for texts in pages for t in texts]
+        self.assertEqual(drawn.count("-Rs. 1,234.50"), 40)
+        self.assertIn("Closing Balance: Rs. 1,334.50", drawn)
+
+class TestImport(unittest.TestCase):
+    def test_import_does_not_open_database(self):
+        # A fresh interpreter in an empty directory, where bank.db would be created
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            code = ("import sys, utils.report_generator, utils.statement_run; "
+                    "assert 'database.db_manager' not in sys.modules")
+            subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True, cwd=tmp_dir,
+                           env={**os.environ, "PYTHONPATH": root})
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from decimal import Decimal
 from services.account_service import AccountService
 from database.db_manager import db_manager
 
@@ -21,8 +22,8 @@ class TestAccountService(unittest.TestCase):
         # Verify balances
         acc1 = db_manager.get_account_details(self.account1)
         acc2 = db_manager.get_account_details(self.account2)
-        self.assertEqual(acc1['balance'], 500)
-        self.assertEqual(acc2['balance'], 500)
+        self.assertEqual(acc1['balance'], Decimal("500.00"))
+        self.assertEqual(acc2['balance'], Decimal("500.00"))
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import threading
+import unittest
+from datetime import date
+from helpers import DatabaseTestCase
+from utils.statement_run import run_statements, load_checkpoint
+
+class TestStatementRun(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.db.pool.connection() as conn:
+            conn.executemany("INSERT INTO accounts (name, password) VALUES (?, 'x')",
+                             [(f"Holder {i}",) for i in range(25)])
+        self.db.apply_batch([{'type': 'Deposit', 'account_number': 1 + i % 25, 'amount': 10 + i}
+                             for i in range(200)])
+        self.out_dir = os.path.join(self.tmp_dir, "statements")
+        self.today = date.today().isoformat()
+
+    def written(self):
+        return sorted(name for _, _, names in os.walk(self.out_dir) for name in names if name.endswith(".pdf"))
+
+    def test_renders_every_account(self):
+        result = run_statements(self.db, self.out_dir, self.today, self.today, workers=2, shard_size=10)
+        self.assertEqual(result['statements'], 25)
+        self.assertEqual(result['shards'], 3)
+        self.assertGreaterEqual(result['pages'], 25)
+        self.assertEqual(self.written(), sorted(f"statement-{n}.pdf" for n in range(1, 26)))
+        with open(os.path.join(self.out_dir, "shard-000000000011", "statement-11.pdf"), "rb") as f:
+            self.assertTrue(f.read().startswith(b"%PDF"))
+
+    def test_resumes_from_checkpoint(self):
+        run_statements(self.db, self.out_dir, self.today, self.today, workers=1, shard_size=10)
+        self.assertEqual(set(load_checkpoint(self.out_dir)['shards']), {"1", "11", "21"})
+        # Nothing left to do for the same period
+        self.assertEqual(run_statements(self.db, self.out_dir, self.today, self.today,
+                                        workers=1, shard_size=10)['statements'], 0)
+        with self.assertRaises(ValueError):
+            run_statements(self.db, self.out_dir, "2020-01-01", self.today, workers=1, shard_size=10)
+
+    def test_cancel_keeps_finished_shards(self):
+        cancel = threading.Event()
+        result = run_statements(self.db, self.out_dir, self.today, self.today, workers=1, shard_size=10,
+                                progress=lambda done, total: cancel.set(), cancel_event=cancel)
+        self.assertIsNone(result)
+        finished = load_checkpoint(self.out_dir)['shards']
+        self.assertTrue(finished)
+        resumed = run_statements(self.db, self.out_dir, self.today, self.today, workers=1, shard_size=10)
+        self.assertEqual(resumed['statements'] + sum(s[0] for s in finished.values()), 25)
+
+if __name__ == '__main__':
+    unittest.main()
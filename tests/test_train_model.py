@@ -0,0 +1,115 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import joblib
+import numpy as np
+from database.db_manager import DatabaseManager
+import train_model
+from train_model import iter_csv_chunks, run_training
+from utils.compiled_forest import CompiledForest
+from utils.model_registry import ModelRegistry
+
+SMALL_GRID = {"n_estimators": [10, 20], "max_depth": [None, 4], "max_samples": [None, 0.5]}
+
+def synthetic_applications(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.integers(5000, 200000, n), rng.integers(300, 851, n),
+                         rng.integers(1000, 500000, n), rng.integers(6, 361, n)])
+    y = ((X[:, 1] > 600) & (X[:, 2] < X[:, 0] * 3)).astype(int)
+    return X, y
+
+class TestTrainModel(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        X, y = synthetic_applications(400)
+        self.csv_path = os.path.join(self.tmp_dir, "loans.csv")
+        with open(self.csv_path, "w") as f:
+            f.write("Income,CreditScore,LoanAmount,LoanTerm,Eligibility\n")
+            f.writelines(f"{a},{b},{c},{d},{e}\n" for (a, b, c, d), e in zip(X.tolist(), y.tolist()))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def train(self, name, **kwargs):
+        kwargs.setdefault("csv_path", self.csv_path)
+        out_path = os.path.join(self.tmp_dir, f"{name}.pkl")
+        report = run_training(out_path=out_path, folds=3, iterations=3, param_distributions=SMALL_GRID,
+                              chunk_size=64, **kwargs)
+        return report, out_path
+
+    def test_peak_unknown_without_proc_or_resource(self):
+        # As on Windows: no /proc and no resource module
+        with mock.patch("builtins.open", side_effect=OSError), mock.patch.dict("sys.modules", {"resource": None}):
+            self.assertIsNone(train_model._peak_rss())
+
+    def test_pipeline_records_every_stage(self):
+        report, out_path = self.train("model")
+        stages = {r['stage']: r for r in report['stages']}
+        self.assertEqual(list(stages), ["load", "split", "search", "fit", "evaluate", "save"])
+        for record in stages.values():
+            self.assertGreaterEqual(record['seconds'], 0)
+            self.assertGreater(record['peak_rss_bytes'], 0)
+        self.assertEqual(stages['load']['rows'], 400)
+        self.assertEqual((stages['split']['train_rows'], stages['split']['test_rows']), (320, 80))
+        self.assertEqual(stages['search']['folds'], 3)
+        self.assertGreater(stages['evaluate']['accuracy'], 0.8)
+
+        with open(os.path.join(self.tmp_dir, "model_report.json")) as f:
+            self.assertEqual(json.load(f)['params'], report['params'])
+        model = joblib.load(out_path)
+        forest = CompiledForest.load(os.path.join(self.tmp_dir, "model.npz"))
+        X, _ = synthetic_applications(200, seed=1)
+        X = X.astype(np.float32)
+        np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+    def test_same_seed_same_model(self):
+        _, first = self.train("first")
+        _, second = self.train("second")
+        X, _ = synthetic_applications(200, seed=2)
+        np.testing.assert_array_equal(joblib.load(first).predict_proba(X), joblib.load(second).predict_proba(X))
+
+    def test_csv_is_read_in_chunks(self):
+        chunks = list(iter_csv_chunks(self.csv_path, chunk_size=150))
+        self.assertEqual([len(y) for _, y in chunks], [150, 150, 100])
+        self.assertEqual(chunks[0][0].dtype, np.float32)
+
+    def test_trains_from_decided_applications(self):
+        db = DatabaseManager(os.path.join(self.tmp_dir, "bank.db"), pool_size=2)
+        self.addCleanup(db.close)
+        db.initialize_database()
+        account = db.create_account("Alice", "password123")
+        X, y = synthetic_applications(300, seed=3)
+        with db.pool.connection() as conn:
+            conn.executemany(
+                "INSERT INTO loan_applications (account_number, income, credit_score, loan_amount, loan_term, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(account, *row, "Approved" if label else "Rejected") for row, label in zip(X.tolist(), y.tolist())]
+            )
+            # Undecided applications are not training data
+            conn.execute("INSERT INTO loan_applications (account_number, income, credit_score, loan_amount, "
+                         "loan_term) VALUES (?, 50000, 700, 100000, 60)", (account,))
+        report, _ = self.train("from_db", source="db", db=db)
+        load = report['stages'][0]
+        self.assertEqual((load['rows'], load['positive']), (300, int(y.sum())))
+
+    def test_registers_trained_model(self):
+        registry = ModelRegistry(os.path.join(self.tmp_dir, "registry"))
+        report, out_path = self.train("registered", registry=registry, activate=True)
+        self.assertEqual((report['version'], registry.active_version()), ("v0001", "v0001"))
+        metadata = registry.metadata("v0001")
+        self.assertEqual(metadata['training']['params'], report['params'])
+        self.assertEqual([r['stage'] for r in metadata['training']['stages']][-1], "save")
+
+    def test_tiny_dataset(self):
+        csv_path = os.path.join(os.path.dirname(__file__), "..", "dataset", "loan_data.csv")
+        report, _ = self.train("tiny", csv_path=csv_path)
+        stages = {r['stage']: r for r in report['stages']}
+        self.assertNotIn("evaluate", stages)
+        self.assertEqual(stages['split']['test_rows'], 0)
+        self.assertEqual(stages['search']['folds'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
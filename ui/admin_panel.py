@@ -1,10 +1,19 @@
 # ui/admin_panel.py
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import csv
+import threading
 from database.db_manager import db_manager
+from database.exporter import export_transactions_csv
+from database.columnar_export import export_columnar
+from database.backup import backup_database
+from database.incremental_backup import load_manifest, take_base_backup, write_increment
+from database.archive import archive_transactions
+from database.eod import run_end_of_day
+from utils.statement_run import run_statements
+from services.loan_scoring import score_pending_loans
+from config import TRANSACTION_PAGE_SIZE, ARCHIVE_AFTER_DAYS
 
 class AdminPanel:
     """Administrative interface for managing bank accounts and system settings."""
@@ -18,6 +27,9 @@ class AdminPanel:
         # Current admin user (set during login)
         self.admin_user = None
         
+        # Set while a background job (export, backup) runs; setting it cancels the job
+        self.job_cancel = None
+        
         self.setup_ui()
         self.load_dashboard()
         
@@ -226,6 +238,15 @@ class AdminPanel:
         
         self.accounts_tree.bind("<Button-3>", self.show_account_context_menu)
         
+        # Search results are fetched a page at a time
+        self.accounts_cursor = None
+        self.load_more_accounts_btn = ttk.Button(
+            tab,
+            text="Load More",
+            command=self.load_more_accounts
+        )
+        self.load_more_accounts_btn.pack(pady=5)
+        
         # Load initial data
         self.load_accounts()
         
@@ -275,6 +296,15 @@ class AdminPanel:
             self.transactions_tree.column(col, width=col_widths.get(col, 100), 
                                         anchor=tk.CENTER if col not in ("Description", "Type") else tk.W)
         
+        # Older pages are fetched on demand
+        self.transactions_cursor = None
+        self.load_more_btn = ttk.Button(
+            tab,
+            text="Load More",
+            command=self.load_more_transactions
+        )
+        self.load_more_btn.pack(pady=5)
+        
         # Load initial data
         self.load_transactions()
         
@@ -302,6 +332,12 @@ class AdminPanel:
             command=self.load_loan_applications
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(
+            filter_frame,
+            text="Score Pending Applications",
+            command=self.score_pending_loans
+        ).pack(side=tk.RIGHT, padx=5)
+        
         # Loans treeview
         self.loans_tree = ttk.Treeview(
             tab,
@@ -368,6 +404,36 @@ class AdminPanel:
             command=self.backup_database
         ).pack(fill=tk.X, pady=2)
         
+        ttk.Button(
+            action_frame,
+            text="Incremental Backup",
+            command=self.incremental_backup
+        ).pack(fill=tk.X, pady=2)
+        
+        ttk.Button(
+            action_frame,
+            text="Run End-of-Day Balances",
+            command=self.run_end_of_day
+        ).pack(fill=tk.X, pady=2)
+        
+        ttk.Button(
+            action_frame,
+            text="Generate Month-End Statements",
+            command=self.generate_statements
+        ).pack(fill=tk.X, pady=2)
+        
+        ttk.Button(
+            action_frame,
+            text="Archive Old Transactions",
+            command=self.archive_old_transactions
+        ).pack(fill=tk.X, pady=2)
+        
+        ttk.Button(
+            action_frame,
+            text="Export Analytics (Columnar)",
+            command=self.export_analytics
+        ).pack(fill=tk.X, pady=2)
+        
         ttk.Button(
             action_frame,
             text="View System Logs",
@@ -378,20 +444,22 @@ class AdminPanel:
         self.load_admin_list()
         
     # Data loading methods
-    def load_dashboard_stats(self):
+    def load_dashboard_stats(self, refresh: bool = False):
         """Load statistics for the dashboard."""
         try:
+            # Aggregates come from SQL; refresh bypasses the short-lived cache
+            stats = db_manager.get_system_stats(use_cache=not refresh)
+            
             # Total accounts
-            accounts = db_manager.get_all_accounts()
-            self.total_accounts_var.set(f"{len(accounts):,}")
+            self.total_accounts_var.set(f"{stats['total_accounts']:,}")
             
             # Total balance
-            total_balance = sum(acc['balance'] for acc in accounts)
+            total_balance = stats['total_balance']
             self.total_balance_var.set(f"₹{total_balance:,.2f}")
             
             # Recent activity
             transactions = db_manager.get_all_transactions(limit=10)
-            self.recent_activity_var.set(f"{len(transactions)} recent")
+            self.recent_activity_var.set(f"{stats['today_count']:,} today")
             
             # Update activity tree
             self.activity_tree.delete(*self.activity_tree.get_children())
@@ -405,52 +473,58 @@ class AdminPanel:
                 ))
                 
             # Update system stats
-            self.stats_var.set(f"Accounts: {len(accounts):,} | Balance: ₹{total_balance:,.2f}")
+            self.stats_var.set(f"Accounts: {stats['total_accounts']:,} | Balance: ₹{total_balance:,.2f}")
             
         except Exception as e:
             self.update_status(f"Error loading dashboard: {str(e)}")
             
     def load_accounts(self):
-        """Load account data with optional search filter."""
+        """Load the first page of accounts matching the search box."""
+        self.accounts_cursor = None
+        self.accounts_tree.delete(*self.accounts_tree.get_children())
+        self.load_more_accounts()
+        
+    def load_more_accounts(self):
+        """Append the next page of accounts matching the search box."""
         try:
-            search_term = self.search_var.get().lower()
-            accounts = db_manager.get_all_accounts()
-            
-            self.accounts_tree.delete(*self.accounts_tree.get_children())
+            accounts, self.accounts_cursor = db_manager.search_accounts(
+                self.search_var.get(),
+                after=self.accounts_cursor,
+                include_last_activity=True
+            )
+            self.load_more_accounts_btn.config(state=tk.NORMAL if self.accounts_cursor else tk.DISABLED)
             
             for acc in accounts:
-                # Apply search filter
-                if search_term:
-                    if (search_term not in str(acc['account_number']) and 
-                        search_term not in acc['name'].lower()):
-                        continue
-                        
-                # Get last activity
-                last_txn = db_manager.get_last_activity(acc['account_number'])
-                
                 self.accounts_tree.insert("", tk.END, values=(
                     acc['account_number'],
                     acc['name'],
                     f"₹{acc['balance']:,.2f}",
                     acc['created_at'][:10],
-                    last_txn['timestamp'][:16] if last_txn else "Never"
+                    acc['last_activity'][:16] if acc['last_activity'] else "Never"
                 ))
                 
         except Exception as e:
             self.update_status(f"Error loading accounts: {str(e)}")
             
     def load_transactions(self):
-        """Load transaction data with optional date filter."""
+        """Load the first page of transactions for the date filter."""
+        self.transactions_cursor = None
+        self.transactions_tree.delete(*self.transactions_tree.get_children())
+        self.load_more_transactions()
+        
+    def load_more_transactions(self):
+        """Append the next page of transactions with optional date filter."""
         try:
             from_date = self.from_date_var.get()
             to_date = self.to_date_var.get()
             
-            transactions = db_manager.get_all_transactions(
+            transactions, self.transactions_cursor = db_manager.get_transactions_page(
+                page_size=TRANSACTION_PAGE_SIZE,
+                cursor=self.transactions_cursor,
                 from_date=from_date if from_date else None,
                 to_date=to_date if to_date else None
             )
-            
-            self.transactions_tree.delete(*self.transactions_tree.get_children())
+            self.load_more_btn.config(state=tk.NORMAL if self.transactions_cursor else tk.DISABLED)
             
             for t in transactions:
                 self.transactions_tree.insert("", tk.END, values=(
@@ -469,14 +543,11 @@ class AdminPanel:
         """Load loan applications with status filter."""
         try:
             status_filter = self.loan_status_var.get()
-            loans = db_manager.get_all_loan_applications()
+            loans = db_manager.get_all_loan_applications(None if status_filter == "All" else status_filter)
             
             self.loans_tree.delete(*self.loans_tree.get_children())
             
             for loan in loans:
-                if status_filter != "All" and loan['status'] != status_filter:
-                    continue
-                    
                 self.loans_tree.insert("", tk.END, values=(
                     loan['application_id'],
                     loan['account_number'],
@@ -485,7 +556,7 @@ class AdminPanel:
                     f"₹{loan['income']:,.2f}",
                     loan['credit_score'],
                     loan['status'],
-                    loan.get('decision_date', loan.get('applied_date', ''))[:10]
+                    (loan['decision_date'] or '')[:10]
                 ))
                 
         except Exception as e:
@@ -551,7 +622,7 @@ class AdminPanel:
                 )
                 dialog.destroy()
                 self.load_accounts()
-                self.load_dashboard_stats()
+                self.load_dashboard_stats(refresh=True)
             except ValueError:
                 messagebox.showerror("Error", "Invalid deposit amount")
             except Exception as e:
@@ -574,12 +645,13 @@ class AdminPanel:
         account = db_manager.get_account_details(account_id)
         
         if account:
+            last_txn = db_manager.get_last_activity(account_id)
             details = (
                 f"Account Number: {account['account_number']}\n"
                 f"Account Holder: {account['name']}\n"
                 f"Current Balance: ₹{account['balance']:,.2f}\n"
                 f"Created On: {account['created_at']}\n"
-                f"Last Activity: {db_manager.get_last_activity(account_id)['timestamp']}"
+                f"Last Activity: {last_txn['timestamp'] if last_txn else 'Never'}"
             )
             messagebox.showinfo("Account Details", details)
             
@@ -610,16 +682,27 @@ class AdminPanel:
             tree.heading(col, text=col)
             tree.column(col, width=100, anchor=tk.CENTER if col not in ("Description", "Type") else tk.W)
         
-        # Load transactions
-        transactions = db_manager.get_transactions(account_id, limit=100)
-        for t in transactions:
-            tree.insert("", tk.END, values=(
-                t.get('transaction_id', ''),
-                t['type'],
-                f"₹{t['amount']:,.2f}",
-                t.get('description', ''),
-                t['timestamp']
-            ))
+        # Load transactions a page at a time
+        page_cursor = None
+        
+        def load_more():
+            nonlocal page_cursor
+            transactions, page_cursor = db_manager.get_transactions_page(
+                account_id, page_size=TRANSACTION_PAGE_SIZE, cursor=page_cursor
+            )
+            for t in transactions:
+                tree.insert("", tk.END, values=(
+                    t.get('transaction_id', ''),
+                    t['type'],
+                    f"₹{t['amount']:,.2f}",
+                    t.get('description', ''),
+                    t['timestamp']
+                ))
+            more_btn.config(state=tk.NORMAL if page_cursor else tk.DISABLED)
+            
+        more_btn = ttk.Button(dialog, text="Load More", command=load_more)
+        more_btn.pack(pady=(0, 10))
+        load_more()
             
     def delete_account_dialog(self):
         """Confirm and delete selected account."""
@@ -638,7 +721,7 @@ class AdminPanel:
             if db_manager.delete_account(account_id):
                 messagebox.showinfo("Success", "Account deleted successfully")
                 self.load_accounts()
-                self.load_dashboard_stats()
+                self.load_dashboard_stats(refresh=True)
             else:
                 messagebox.showerror("Error", "Failed to delete account")
                 
@@ -708,7 +791,10 @@ class AdminPanel:
         ).pack(pady=10)
         
     def export_transactions(self):
-        """Export transactions to CSV file."""
+        """Export all transactions to CSV on a worker thread."""
+        if self.offer_cancel_job():
+            return
+            
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
             filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")],
@@ -718,29 +804,194 @@ class AdminPanel:
         if not file_path:
             return
             
-        try:
-            transactions = db_manager.get_all_transactions()
+        def done(rows):
+            self.update_status(f"Exported {rows:,} transactions")
+            messagebox.showinfo("Success", f"Transactions exported to {file_path}")
+            
+        self.start_background_job(
+            "Transaction export",
+            lambda progress, cancel: export_transactions_csv(
+                db_manager, file_path, progress=progress, cancel_event=cancel
+            ),
+            done
+        )
+        
+    def export_analytics(self):
+        """Export the ledger in columnar form for analytics on a worker thread."""
+        if self.offer_cancel_job():
+            return
+            
+        out_dir = filedialog.askdirectory(title="Choose Analytics Export Folder")
+        if not out_dir:
+            return
+            
+        def done(result):
+            self.update_status(f"Exported {result['transactions']:,} new transactions ({result['format']})")
+            messagebox.showinfo(
+                "Success",
+                f"Analytics export updated in {out_dir}\n"
+                f"New transactions: {result['transactions']:,}\n"
+                f"Accounts: {result['accounts']:,}\n"
+                f"Loan applications: {result['loan_applications']:,}"
+            )
+            
+        self.start_background_job(
+            "Analytics export",
+            lambda progress, cancel: export_columnar(
+                db_manager, out_dir, progress=progress, cancel_event=cancel
+            ),
+            done
+        )
+        
+    def run_end_of_day(self):
+        """Snapshot daily closing balances up to yesterday on a worker thread."""
+        if self.offer_cancel_job():
+            return
+            
+        def done(result):
+            message = (f"Closed {result['days']:,} days through {result['through']} "
+                       f"({result['snapshots']:,} balance snapshots)")
+            self.update_status(message)
+            messagebox.showinfo("End of Day", message)
             
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["ID", "Account", "Type", "Amount", "Description", "Date"])
+        self.start_background_job(
+            "End-of-day run",
+            lambda progress, cancel: run_end_of_day(db_manager, progress=progress, cancel_event=cancel),
+            done
+        )
+        
+    def generate_statements(self):
+        """Render last month's statement for every account in worker processes."""
+        if self.offer_cancel_job():
+            return
+            
+        out_dir = filedialog.askdirectory(title="Choose Statements Folder")
+        if not out_dir:
+            return
+        last_day = datetime.now().date().replace(day=1) - timedelta(days=1)
+        from_date, to_date = last_day.replace(day=1).isoformat(), last_day.isoformat()
+        
+        def done(result):
+            message = (f"{result['statements']:,} statements for {from_date} to {to_date} in "
+                       f"{result['seconds']:,.0f}s ({result['statements_per_second']:,.0f}/s, "
+                       f"{result['workers']} workers)")
+            self.update_status(message)
+            messagebox.showinfo("Statements", message)
+            
+        self.start_background_job(
+            "Statement run",
+            lambda progress, cancel: run_statements(
+                db_manager, out_dir, from_date, to_date, progress=progress, cancel_event=cancel
+            ),
+            done
+        )
+        
+    def archive_old_transactions(self):
+        """Move old transactions into the yearly archives on a worker thread."""
+        if self.offer_cancel_job():
+            return
+            
+        days = simpledialog.askinteger(
+            "Archive Old Transactions",
+            "Archive transactions older than how many days?",
+            initialvalue=ARCHIVE_AFTER_DAYS, minvalue=1
+        )
+        if days is None:
+            return
+            
+        def done(result):
+            years = ", ".join(map(str, result['years'])) or "none"
+            self.update_status(f"Archived {result['moved']:,} transactions")
+            messagebox.showinfo(
+                "Success",
+                f"Archived {result['moved']:,} transactions older than {result['cutoff']} UTC\n"
+                f"Archive years: {years}"
+            )
+            
+        self.start_background_job(
+            "Archiving",
+            lambda progress, cancel: archive_transactions(
+                db_manager, days, progress=progress, cancel_event=cancel
+            ),
+            done
+        )
+        
+    def score_pending_loans(self):
+        """Decide every Pending loan application with the model on a worker thread."""
+        if self.offer_cancel_job():
+            return
+            
+        def done(result):
+            message = (f"Scored {result['applications']:,} applications: {result['approved']:,} approved, "
+                       f"{result['rejected']:,} rejected ({result['per_second']:,.0f}/s)")
+            self.update_status(message)
+            messagebox.showinfo("Loan Scoring", message)
+            self.load_loan_applications()
+            
+        self.start_background_job(
+            "Loan scoring",
+            lambda progress, cancel: score_pending_loans(db_manager, progress=progress, cancel_event=cancel),
+            done
+        )
+        
+    def offer_cancel_job(self) -> bool:
+        """If a background job is running, offer to cancel it and return True."""
+        if self.job_cancel is None:
+            return False
+        if messagebox.askyesno("Job Running", "A background job is in progress. Cancel it?"):
+            self.job_cancel.set()
+        return True
+        
+    def start_background_job(self, label: str, work, on_success):
+        """Run ``work(progress, cancel_event)`` on a worker thread.
+        
+        Progress is shown in the status bar; ``on_success`` receives the
+        result on the Tk thread. A result of None means the job was cancelled.
+        """
+        # The worker only writes to this dict; the Tk thread polls it
+        job = {'done_count': 0, 'total': 0, 'done': False, 'result': None, 'error': None}
+        
+        def progress(done_count, total):
+            job['done_count'], job['total'] = done_count, total
+            
+        def run():
+            try:
+                job['result'] = work(progress, self.job_cancel)
+            except Exception as e:
+                job['error'] = e
+            finally:
+                job['done'] = True
                 
-                for t in transactions:
-                    writer.writerow([
-                        t['transaction_id'],
-                        t['account_number'],
-                        t['type'],
-                        t['amount'],
-                        t.get('description', ''),
-                        t['timestamp']
-                    ])
-                    
-            messagebox.showinfo("Success", f"Transactions exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export transactions: {str(e)}")
+        self.job_cancel = threading.Event()
+        self.update_status(f"{label} started...")
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(200, self.poll_background_job, job, label, on_success)
+        
+    def poll_background_job(self, job: Dict, label: str, on_success):
+        """Report background job progress until the worker finishes."""
+        if not job['done']:
+            if job['total']:
+                self.update_status(
+                    f"{label}: {job['done_count']:,} of {job['total']:,} "
+                    f"({job['done_count'] * 100 // job['total']}%) - click again to cancel"
+                )
+            self.root.after(200, self.poll_background_job, job, label, on_success)
+            return
+            
+        self.job_cancel = None
+        if job['error'] is not None:
+            self.update_status(f"{label} failed")
+            messagebox.showerror("Error", f"{label} failed: {str(job['error'])}")
+        elif job['result'] is None:
+            self.update_status(f"{label} cancelled")
+        else:
+            on_success(job['result'])
             
     def backup_database(self):
-        """Create a backup of the database."""
+        """Create a consistent online backup of the database on a worker thread."""
+        if self.offer_cancel_job():
+            return
+            
         file_path = filedialog.asksaveasfilename(
             defaultextension=".db",
             filetypes=[("Database Files", "*.db"), ("All Files", "*.*")],
@@ -750,15 +1001,54 @@ class AdminPanel:
         if not file_path:
             return
             
-        try:
-            import shutil
-            shutil.copyfile('bank.db', file_path)
-            messagebox.showinfo("Success", f"Database backup created at {file_path}")
+        def done(result):
+            size_mb = result['bytes'] / (1024 * 1024)
+            messagebox.showinfo("Success", f"Database backup created at {file_path}\n({size_mb:,.1f} MB, verified)")
             self.update_status(f"Database backed up to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Backup failed: {str(e)}")
-            self.update_status(f"Backup error: {str(e)}")
             
+        self.start_background_job(
+            "Database backup",
+            lambda progress, cancel: backup_database(
+                db_manager, file_path, progress=progress, cancel_event=cancel
+            ),
+            done
+        )
+        
+    def incremental_backup(self):
+        """Add an incremental backup to a backup folder, starting it with a full base backup."""
+        if self.offer_cancel_job():
+            return
+            
+        backup_dir = filedialog.askdirectory(title="Choose Backup Folder")
+        if not backup_dir:
+            return
+            
+        if not load_manifest(backup_dir)["bases"]:
+            def done(result):
+                self.update_status(f"Base backup written to {backup_dir}")
+                messagebox.showinfo("Success", f"Base backup {result['file']} created in {backup_dir}")
+                
+            self.start_background_job(
+                "Base backup",
+                lambda progress, cancel: take_base_backup(
+                    db_manager, backup_dir, progress=progress, cancel_event=cancel
+                ),
+                done
+            )
+            return
+            
+        def done(entry):
+            message = (f"Captured {entry['rows']:,} changes in {entry['file']}" if entry['rows']
+                       else "No changes since the last backup")
+            self.update_status(message)
+            messagebox.showinfo("Incremental Backup", message)
+            
+        self.start_background_job(
+            "Incremental backup",
+            lambda progress, cancel: write_increment(db_manager, backup_dir),
+            done
+        )
+        
     def view_system_logs(self):
         """View system logs (placeholder implementation)."""
         messagebox.showinfo("Info", "System logs viewer will be implemented in a future version")
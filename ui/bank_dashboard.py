@@ -1,14 +1,22 @@
 # ui/bank_dashboard.py
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from datetime import datetime
 from typing import Optional, List, Dict
-import csv
 import webbrowser
 from database.db_manager import db_manager
-from utils.predictor import predict_loan_eligibility
+from database.exporter import export_transactions_csv
+from utils.predictor import predict_loan_eligibility, warm_up as warm_up_predictor
 from utils.helpers import format_currency
 from ui.themes import BankTheme, IconManager, AnimationUtils, CardWidget, StatCard
+from config import TRANSACTION_PAGE_SIZE, PREDICTOR_WARMUP_DELAY_MS, LOAN_FORM_BUCKETED
+
+# Transaction types matched by each history filter option
+TRANSACTION_TYPE_FILTERS = {
+    "Deposit": ("Deposit",),
+    "Withdrawal": ("Withdrawal",),
+    "Transfer": ("Transfer In", "Transfer Out"),
+}
 
 class BankDashboard:
     """Main banking dashboard with account management features."""
@@ -46,6 +54,10 @@ class BankDashboard:
         # Add fade in animation
         AnimationUtils.fade_in(self.root)
         
+        # Load the loan model once the window is up, not before first paint
+        if PREDICTOR_WARMUP_DELAY_MS is not None:
+            self.root.after(PREDICTOR_WARMUP_DELAY_MS, warm_up_predictor)
+        
     def setup_ui(self):
         """Initialize all UI components."""
         # Main layout - horizontal split
@@ -385,6 +397,12 @@ class BankDashboard:
             command=self.export_transactions
         ).pack(side=tk.RIGHT)
         
+        ttk.Button(
+            filter_frame,
+            text="Statement PDF",
+            command=self.download_statement
+        ).pack(side=tk.RIGHT, padx=5)
+        
         # Transactions treeview
         self.transactions_tree = ttk.Treeview(
             tab,
@@ -394,6 +412,15 @@ class BankDashboard:
         )
         self.transactions_tree.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
         
+        # Older pages are fetched on demand
+        self.transactions_cursor = None
+        self.load_more_btn = ttk.Button(
+            tab,
+            text="Load More",
+            command=self.load_more_transactions
+        )
+        self.load_more_btn.pack(pady=5)
+        
         # Configure columns
         col_widths = {"ID": 50, "Type": 80, "Amount": 100, "Description": 200, "Date": 120}
         for col in self.transactions_tree["columns"]:
@@ -548,18 +575,26 @@ class BankDashboard:
         self.update_transactions_tree(self.recent_transactions_tree, transactions)
         
     def load_transactions(self):
-        """Load full transaction history with filters."""
-        trans_type = self.filter_type_var.get()
-        transactions = db_manager.get_transactions(self.account_number, limit=100)
-        
-        if trans_type != "All":
-            transactions = [t for t in transactions if t['type'] == trans_type]
-            
-        self.update_transactions_tree(self.transactions_tree, transactions)
+        """Load the first page of transaction history for the current filter."""
+        self.transactions_cursor = None
+        self.transactions_tree.delete(*self.transactions_tree.get_children())
+        self.load_more_transactions()
+        
+    def load_more_transactions(self):
+        """Append the next page of transaction history."""
+        transactions, self.transactions_cursor = db_manager.get_transactions_page(
+            self.account_number,
+            page_size=TRANSACTION_PAGE_SIZE,
+            cursor=self.transactions_cursor,
+            types=TRANSACTION_TYPE_FILTERS.get(self.filter_type_var.get())
+        )
+        self.update_transactions_tree(self.transactions_tree, transactions, clear=False)
+        self.load_more_btn.config(state=tk.NORMAL if self.transactions_cursor else tk.DISABLED)
         
-    def update_transactions_tree(self, tree: ttk.Treeview, transactions: List[Dict]):
+    def update_transactions_tree(self, tree: ttk.Treeview, transactions: List[Dict], clear: bool = True):
         """Update a treeview with transaction data."""
-        tree.delete(*tree.get_children())
+        if clear:
+            tree.delete(*tree.get_children())
         
         for t in transactions:
             amount = f"₹{t['amount']:,.2f}"
@@ -710,7 +745,8 @@ class BankDashboard:
                 raise ValueError("Credit score must be between 300-850")
                 
             # Predict eligibility
-            eligible = predict_loan_eligibility(income, credit_score, loan_amount, loan_term)
+            eligible = predict_loan_eligibility(income, credit_score, loan_amount, loan_term,
+                                                bucketed=LOAN_FORM_BUCKETED)
             
             if eligible:
                 result = "✅ Congratulations! You are eligible for this loan."
@@ -739,10 +775,8 @@ class BankDashboard:
             messagebox.showerror("Invalid Input", str(e) or "Please enter valid numbers in all fields")
             
     def export_transactions(self):
-        """Export transactions to CSV file."""
-        transactions = db_manager.get_transactions(self.account_number)
-        
-        if not transactions:
+        """Export the full transaction history to CSV."""
+        if not db_manager.count_transactions(self.account_number):
             messagebox.showwarning("No Data", "No transactions to export")
             return
             
@@ -756,23 +790,50 @@ class BankDashboard:
             return
             
         try:
-            with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["ID", "Type", "Amount", "Description", "Date"])
-                
-                for t in transactions:
-                    writer.writerow([
-                        t.get('transaction_id', ''),
-                        t['type'],
-                        t['amount'],
-                        t.get('description', ''),
-                        t['timestamp']
-                    ])
-                    
+            # One account's history is small enough to stream on the Tk thread
+            export_transactions_csv(db_manager, file_path, account_number=self.account_number)
             messagebox.showinfo("Success", f"Transactions exported to {file_path}")
         except Exception as e:
             messagebox.showerror("Export Failed", f"Error exporting transactions: {str(e)}")
             
+    def download_statement(self):
+        """Save a PDF statement with opening and closing balances for a period."""
+        today = datetime.now().date()
+        from_date = simpledialog.askstring(
+            "Statement", "From date (YYYY-MM-DD):", initialvalue=today.replace(day=1).isoformat()
+        )
+        if not from_date:
+            return
+        to_date = simpledialog.askstring("Statement", "To date (YYYY-MM-DD):", initialvalue=today.isoformat())
+        if not to_date:
+            return
+        try:
+            if datetime.strptime(from_date, "%Y-%m-%d") > datetime.strptime(to_date, "%Y-%m-%d"):
+                raise ValueError("The start date must not be after the end date")
+        except ValueError as e:
+            messagebox.showerror("Invalid Dates", str(e))
+            return
+            
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            initialfile=f"statement_{self.account_number}_{from_date}_{to_date}.pdf",
+            filetypes=[("PDF Files", "*.pdf"), ("All Files", "*.*")],
+            title="Save Statement As"
+        )
+        if not file_path:
+            return
+            
+        try:
+            # fpdf takes a noticeable time to import; only pay it when asked
+            from utils.report_generator import generate_statement_pdf
+            pdf = generate_statement_pdf(self.account_number, from_date, to_date)
+            with open(file_path, "wb") as f:
+                f.write(pdf)
+            messagebox.showinfo("Success", f"Statement saved to {file_path}")
+            self.update_status(f"Statement {from_date} to {to_date} saved")
+        except Exception as e:
+            messagebox.showerror("Statement Failed", f"Error creating statement: {str(e)}")
+            
     def update_status(self, message: str):
         """Update the status bar message."""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -0,0 +1,174 @@
+# utils/compiled_forest.py
+"""A fitted random forest flattened into NumPy arrays.
+
+``compile_forest`` concatenates the nodes of every tree into one set of
+arrays: split feature, threshold, left and right child (global node
+indices) and the leaf class values, plus each tree's root. Leaves point
+back at themselves, so walking a batch is ``max_depth`` rounds of
+vectorised indexing over a (trees, rows) array of node positions, and
+rows that reach a leaf early just stay put.
+
+The result matches ``RandomForestClassifier.predict`` exactly: features
+are float32 as sklearn's trees see them, compared ``<=`` against the
+float64 thresholds, and leaf values are summed tree by tree in estimator
+order before dividing by the tree count, as ``predict_proba`` does.
+
+Saved as a ``.npz`` file, the forest loads with NumPy alone. Export the
+model next to its pickle after retraining:
+
+    python -m utils.compiled_forest [--model models/loan_model.pkl] [--out models/loan_model.npz]
+"""
+import argparse
+import hashlib
+import os
+import numpy as np
+
+# Rows walked at once; keeps the (trees, rows) scratch arrays in cache
+EVAL_CHUNK_ROWS = 2048
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, to tie a compiled forest to the pickle it came from."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def compile_forest(model) -> "CompiledForest":
+    """Flatten a fitted single-output RandomForestClassifier."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+    n_classes = int(model.n_classes_)
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        roots.append(offset)
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+        # Class fractions, which is what tree_.value holds from scikit-learn
+        # 1.4; earlier versions hold weighted counts, which predict_proba
+        # divides by their sum as done here
+        value = tree.value[:, 0, :n_classes]
+        totals = value.sum(axis=1, keepdims=True)
+        if not np.allclose(totals, 1.0):
+            value = value / np.where(totals == 0, 1.0, totals)
+        values.append(value)
+        offset += tree.node_count
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+        roots=np.array(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        n_features=int(model.n_features_in_),
+        max_depth=max(e.tree_.max_depth for e in model.estimators_),
+    )
+
+class CompiledForest:
+    """Vectorised evaluator over the flattened node arrays."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, n_features, max_depth,
+                 source_digest=""):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.n_features = n_features
+        self.max_depth = max_depth
+        self.source_digest = source_digest
+
+        # Layout used while walking. x <= t for a float32 x and float64 t
+        # holds exactly when x <= the largest float32 not above t, so the
+        # comparisons can stay in float32.
+        threshold32 = threshold.astype(np.float32)
+        above = threshold32.astype(np.float64) > threshold
+        threshold32[above] = np.nextafter(threshold32[above], np.float32(-np.inf))
+        self._threshold = threshold32
+        self._feature = feature.astype(np.intp)
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        self._children = np.column_stack([left, right]).ravel().astype(np.intp)
+        self._roots = roots.astype(np.intp)
+        # One 1-D array per class: gathering from these is much faster
+        # than gathering rows of ``value``
+        self._class_values = [np.ascontiguousarray(value[:, c]) for c in range(value.shape[1])]
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def save(self, path: str) -> None:
+        """Write the arrays to ``path`` (.npz), atomically."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                value=self.value, roots=self.roots, classes=self.classes,
+                meta=np.array([self.n_features, self.max_depth], dtype=np.int64),
+                source_digest=np.array(self.source_digest)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            n_features, max_depth = (int(v) for v in data["meta"])
+            return cls(data["feature"], data["threshold"], data["left"], data["right"], data["value"],
+                       data["roots"], data["classes"], n_features, max_depth, str(data["source_digest"]))
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf reached in every tree: a (trees, n) array for a float32 ``X``."""
+        Xt = np.ascontiguousarray(X.T, dtype=np.float32)
+        n = Xt.shape[1]
+        # Every row starts at the same root, so the first level reads whole
+        # feature columns instead of gathering value by value
+        goes_right = Xt[self._feature[self._roots]] > self._threshold[self._roots][:, None]
+        node = self._children[(2 * self._roots)[:, None] + goes_right]
+        flat = Xt.ravel()
+        column = np.arange(n, dtype=np.intp)
+        for _ in range(self.max_depth - 1):
+            goes_right = flat[self._feature[node] * n + column] > self._threshold[node]
+            node = self._children[2 * node + goes_right]
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for a validated (n, n_features) float32 matrix."""
+        proba = np.empty((X.shape[0], len(self._class_values)), dtype=np.float64)
+        for start in range(0, X.shape[0], EVAL_CHUNK_ROWS):
+            node = self.leaves(X[start:start + EVAL_CHUNK_ROWS])
+            for c, values in enumerate(self._class_values):
+                # Reducing over the leading (tree) axis adds tree by tree in
+                # estimator order, as predict_proba does; summing along a
+                # contiguous axis would add pairwise and could differ in the
+                # last bit
+                proba[start:start + EVAL_CHUNK_ROWS, c] = np.add.reduce(values[node], axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    models_dir = os.path.join(os.path.dirname(__file__), "..", "models")
+    parser.add_argument("--model", default=os.path.join(models_dir, "loan_model.pkl"))
+    parser.add_argument("--out", default=os.path.join(models_dir, "loan_model.npz"))
+    args = parser.parse_args()
+    import joblib
+    forest = compile_forest(joblib.load(args.model))
+    forest.source_digest = file_digest(args.model)
+    forest.save(args.out)
+    print(f"{forest.n_trees} trees, {forest.n_nodes:,} nodes, depth {forest.max_depth} -> {args.out}")
+
+if __name__ == "__main__":
+    main()
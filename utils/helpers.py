@@ -1,8 +1,12 @@
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Union
+from config import CURRENCY_DECIMALS
+from utils.money import to_minor, from_minor
 
-def format_currency(amount: float) -> str:
-    """Format amount as currency string"""
-    return f"₹{amount:,.2f}"
+def format_currency(amount: Union[Decimal, int, float]) -> str:
+    """Format a rupee amount as currency string, rounded to whole paise"""
+    return f"₹{from_minor(to_minor(amount, ROUND_HALF_UP)):,.{CURRENCY_DECIMALS}f}"
 
 def format_date(date_str: str) -> str:
     """Format database date to readable format"""
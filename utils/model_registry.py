@@ -0,0 +1,183 @@
+# utils/model_registry.py
+"""Local registry of trained loan models.
+
+Each version is a directory under REGISTRY_DIR holding the pickled model,
+its compiled forest (utils/compiled_forest.py) and ``metadata.json``
+(features, classes, parameters, training metrics and times):
+
+    models/registry/
+        v0001/model.pkl  model.npz  metadata.json
+        v0002/...
+        ACTIVE           name of the version predictions use
+
+Versions are immutable once registered: they are assembled in a scratch
+directory and renamed into place. ``activate`` checks that a version
+loads and scores before pointing ACTIVE at it, and replaces the pointer
+atomically, so a reader sees either the old or the new name. Running
+predictors notice the change and swap models in the background
+(see utils/predictor.py).
+
+    python -m utils.model_registry list
+    python -m utils.model_registry register models/loan_model.pkl [--report REPORT.json] [--activate]
+    python -m utils.model_registry activate v0002
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from utils.compiled_forest import CompiledForest, compile_forest, file_digest
+
+REGISTRY_DIR = os.path.join(os.path.dirname(__file__), "..", "models", "registry")
+ACTIVE_FILE = "ACTIVE"
+VERSION_PATTERN = re.compile(r"v(\d{4,})")
+
+# Applications every candidate model must score before it is activated or
+# swapped in (Income, CreditScore, LoanAmount, LoanTerm)
+PROBE_APPLICATIONS = np.array([
+    [45000, 700, 100000, 60],
+    [25000, 580, 30000, 12],
+    [150000, 820, 900000, 360],
+    [8000, 300, 1000, 6],
+], dtype=np.float32)
+
+def verify_forest(forest: CompiledForest, features) -> None:
+    """Raise ValueError unless ``forest`` can serve loan predictions."""
+    if forest.n_features != len(features):
+        raise ValueError(f"Model expects {forest.n_features} features, not {len(features)}")
+    if 1 not in forest.classes.tolist():
+        raise ValueError("Model has no eligible class (1)")
+    proba = forest.predict_proba(PROBE_APPLICATIONS)
+    if not np.isfinite(proba).all() or not np.allclose(proba.sum(axis=1), 1.0):
+        raise ValueError("Model returned invalid probabilities")
+
+class ModelRegistry:
+    """Versioned model artifacts with an active-version pointer."""
+
+    def __init__(self, root: str = REGISTRY_DIR):
+        self.root = root
+
+    def path(self, version: str, name: str = "") -> str:
+        return os.path.join(self.root, version, name) if name else os.path.join(self.root, version)
+
+    def versions(self) -> List[str]:
+        """Registered versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted((v for v in os.listdir(self.root) if VERSION_PATTERN.fullmatch(v)),
+                      key=lambda v: int(v[1:]))
+
+    def active_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def metadata(self, version: str) -> Dict:
+        with open(self.path(version, "metadata.json")) as f:
+            return json.load(f)
+
+    def register(self, model_path: str, features, report: Optional[Dict] = None, activate: bool = False) -> str:
+        """Copy a trained pickle into a new version and return its name.
+
+        ``report`` is the training report from train_model.py; its stages
+        and metrics are kept in the version's metadata.
+        """
+        import joblib
+        model = joblib.load(model_path)
+        forest = compile_forest(model)
+        os.makedirs(self.root, exist_ok=True)
+        scratch = tempfile.mkdtemp(prefix=".register-", dir=self.root)
+        try:
+            shutil.copyfile(model_path, os.path.join(scratch, "model.pkl"))
+            forest.source_digest = file_digest(os.path.join(scratch, "model.pkl"))
+            verify_forest(forest, features)
+            forest.save(os.path.join(scratch, "model.npz"))
+            metadata = {
+                "features": list(features),
+                "classes": forest.classes.tolist(),
+                "n_trees": forest.n_trees,
+                "n_nodes": forest.n_nodes,
+                "max_depth": forest.max_depth,
+                "params": {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, type(None)))},
+                "sha256": forest.source_digest,
+                "registered_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "trained_at": datetime.fromtimestamp(os.path.getmtime(model_path), timezone.utc)
+                                      .strftime("%Y-%m-%d %H:%M:%S"),
+                "training": report,
+            }
+            with open(os.path.join(scratch, "metadata.json"), "w") as f:
+                json.dump(metadata, f, indent=2, default=str)
+            # rename() refuses to replace a non-empty directory, so two
+            # concurrent registrations cannot claim the same number
+            while True:
+                versions = self.versions()
+                version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+                try:
+                    os.rename(scratch, self.path(version))
+                    break
+                except OSError:
+                    if not os.path.exists(self.path(version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise
+        if activate:
+            self.activate(version)
+        return version
+
+    def load_forest(self, version: str) -> CompiledForest:
+        """Load and verify a version's compiled forest."""
+        metadata = self.metadata(version)
+        forest = CompiledForest.load(self.path(version, "model.npz"))
+        if forest.source_digest != metadata["sha256"]:
+            raise ValueError(f"Model {version} does not match its metadata")
+        verify_forest(forest, metadata["features"])
+        return forest
+
+    def activate(self, version: str) -> None:
+        """Point ACTIVE at ``version`` once it has loaded and scored."""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version {version}")
+        self.load_forest(version)
+        tmp_path = os.path.join(self.root, ACTIVE_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp_path, os.path.join(self.root, ACTIVE_FILE))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    register = commands.add_parser("register")
+    register.add_argument("model")
+    register.add_argument("--report", help="training report JSON written by train_model.py")
+    register.add_argument("--activate", action="store_true")
+    commands.add_parser("activate").add_argument("version")
+    args = parser.parse_args()
+
+    from utils.predictor import FEATURES
+    registry = ModelRegistry(args.registry)
+    if args.command == "register":
+        report = None
+        if args.report:
+            with open(args.report) as f:
+                report = json.load(f)
+        print(registry.register(args.model, FEATURES, report, activate=args.activate))
+    elif args.command == "activate":
+        registry.activate(args.version)
+    else:
+        active = registry.active_version()
+        for version in registry.versions():
+            metadata = registry.metadata(version)
+            print(f"{'*' if version == active else ' '} {version}  registered {metadata['registered_at']}  "
+                  f"{metadata['n_trees']} trees, depth {metadata['max_depth']}")
+
+if __name__ == "__main__":
+    main()
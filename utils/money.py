@@ -0,0 +1,40 @@
+# utils/money.py
+"""Conversion between rupee amounts and integer minor units (paise).
+
+The ledger stores every balance and amount as an integer number of paise.
+Callers work in rupees; convert with ``to_minor`` on the way in and
+``from_minor`` on the way out, and do all arithmetic on the integers.
+"""
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+from config import CURRENCY_DECIMALS
+
+MINOR_PER_MAJOR = 10 ** CURRENCY_DECIMALS
+
+def to_minor(amount, rounding: Optional[str] = None) -> int:
+    """Convert a rupee amount (int, float, Decimal or numeric string) to paise.
+
+    Floats go through their shortest decimal repr, so 0.1 becomes exactly
+    10 paise. Raises ValueError for anything that is not a finite number
+    and, unless a ``decimal`` rounding mode is given (for display), for
+    amounts with more than CURRENCY_DECIMALS places: 10.005 is not a
+    number of paise, and the ledger must not round money into existence.
+    """
+    if isinstance(amount, bool):
+        raise ValueError(f"Invalid amount: {amount}")
+    try:
+        value = Decimal(str(amount).strip()) if isinstance(amount, (float, str)) else Decimal(amount)
+        if not value.is_finite():
+            raise ValueError(f"Invalid amount: {amount}")
+        minor = value.scaleb(CURRENCY_DECIMALS)
+        if rounding is not None:
+            return int(minor.to_integral_value(rounding))
+        if minor != minor.to_integral_value():
+            raise ValueError(f"Amount has fractions of a paisa: {amount}")
+        return int(minor)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Invalid amount: {amount}")
+
+def from_minor(minor: int) -> Decimal:
+    """Convert paise to an exact rupee Decimal, e.g. 12345 -> Decimal('123.45')."""
+    return Decimal(int(minor)).scaleb(-CURRENCY_DECIMALS)
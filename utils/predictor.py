@@ -1,17 +1,326 @@
-import pandas as pd
-import joblib
+# utils/predictor.py
+"""Loan eligibility predictions from the trained random forest.
+
+The model is fitted on (Income, CreditScore, LoanAmount, LoanTerm).
+Predictions use the forest compiled to NumPy arrays
+(utils/compiled_forest.py, saved as models/loan_model.npz) rather than a
+DataFrame and ``model.predict``: building the frame and sklearn's input
+validation cost far more than walking the trees. The compiled forest
+gives exactly the decisions and probabilities of ``model.predict``.
+
+It is loaded on first use, not at import, since the dashboard imports
+this module at startup; ``warm_up`` loads it on a background thread ahead
+of the first prediction. Loading needs only NumPy. If the .npz is missing
+or was compiled from a different pickle, the pickle is unpickled (which
+imports sklearn and scipy, about a second) and compiled again.
+
+The model served is the active version of the registry in
+models/registry (utils/model_registry.py), or models/loan_model.pkl
+while no version is active. Predictions check at most once a second
+whether that changed; if so the new model is loaded and verified on a
+background thread while the current one keeps answering, then swapped
+in. A model that fails to load or verify is logged and skipped.
+
+Single-application predictions are memoised in an LRU cache with a TTL,
+keyed on the float32 features the model sees, and cleared on every swap.
+"""
 import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple
+import numpy as np
+from config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_BUCKETS
+from utils.model_registry import REGISTRY_DIR, ModelRegistry, verify_forest
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "loan_model.pkl")
+COMPILED_MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "loan_model.npz")
+
+# Column order of every feature matrix
+FEATURES = ("Income", "CreditScore", "LoanAmount", "LoanTerm")
+
+# Seconds between checks for a newly activated model
+MODEL_CHECK_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+_model = None
+_model_lock = threading.Lock()
+_model_path = MODEL_PATH
+_forest = None
+_forest_lock = threading.Lock()
+_forest_version = None
+_forest_signature = None
+# A model that failed to load or verify, not retried until the active model changes again
+_failed_signature = None
+_next_model_check = 0.0
+_reload_thread = None
+
+class PredictionCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after insertion.
+
+    ``clear`` starts a new generation; a ``put`` for a value computed
+    before the clear (tagged with the old generation) is dropped, so a
+    prediction from a replaced model cannot be cached after the swap.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        """The cached value, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+def get_model():
+    """The fitted sklearn forest being served, unpickled on the first call. Safe from any thread."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                # joblib pulls in sklearn while unpickling; keep both off the import path
+                import joblib
+                _model = joblib.load(_model_path)
+    return _model
+
+def get_forest():
+    """The compiled forest that predictions use, loaded on the first call."""
+    global _failed_signature
+    if _forest is None:
+        with _forest_lock:
+            if _forest is None:
+                # Taken before loading, so a change made meanwhile is still noticed
+                signature = _model_signature()
+                try:
+                    loaded = _load_model(signature)
+                except Exception as e:
+                    if signature[0] != "registry":
+                        raise
+                    logger.error(f"Could not load loan model {signature[1]}, using {MODEL_PATH}: {e}")
+                    _failed_signature = signature
+                    signature = _file_signature()
+                    loaded = _load_model(signature)
+                _install(*loaded, signature)
+    return _forest
+
+def _install(forest, model_path: str, version: Optional[str], signature) -> None:
+    """Make ``forest`` the served model; the caller holds _forest_lock."""
+    global _model, _model_path, _forest, _forest_version, _forest_signature
+    with _model_lock:
+        _model = None
+        _model_path = model_path
+    _forest_version = version
+    _forest_signature = signature
+    # A single reference swap: a prediction already under way keeps the
+    # forest it fetched, every later one gets the new forest
+    _forest = forest
+
+def _file_signature():
+    """(mtime, size) of the pickle, None if missing.
+
+    The compiled forest is left out: the loader writes it, and only uses
+    it when it was compiled from this pickle.
+    """
+    try:
+        st = os.stat(MODEL_PATH)
+    except FileNotFoundError:
+        return ("files", None)
+    return ("files", (st.st_mtime_ns, st.st_size))
+
+def _model_signature():
+    """The registry's active version, or the model files when none is active."""
+    version = ModelRegistry(REGISTRY_DIR).active_version()
+    return ("registry", version) if version else _file_signature()
+
+def _load_model(signature):
+    """Load and verify the model ``signature`` names: (forest, pickle path, version)."""
+    if signature[0] == "registry":
+        registry = ModelRegistry(REGISTRY_DIR)
+        version = signature[1]
+        return registry.load_forest(version), registry.path(version, "model.pkl"), version
+    forest = _load_forest()
+    verify_forest(forest, FEATURES)
+    return forest, MODEL_PATH, None
+
+def _check_model_files() -> None:
+    """Start a background reload if the active model changed.
+
+    Predictions keep using the current forest until the new one has
+    loaded and passed verification; if it fails, the current forest
+    stays and that model is not tried again.
+    """
+    global _next_model_check, _reload_thread
+    now = time.monotonic()
+    if now < _next_model_check or _forest is None:
+        return
+    _next_model_check = now + MODEL_CHECK_INTERVAL
+    signature = _model_signature()
+    if signature == _forest_signature or signature == _failed_signature:
+        return
+    with _forest_lock:
+        if _reload_thread is None or not _reload_thread.is_alive():
+            _reload_thread = threading.Thread(target=_reload, args=(signature,), name="predictor-reload",
+                                              daemon=True)
+            _reload_thread.start()
+
+def _reload(signature) -> None:
+    global _failed_signature
+    start = time.perf_counter()
+    try:
+        loaded = _load_model(signature)
+    except Exception as e:
+        logger.error(f"Could not load the new loan model {signature}; keeping {_forest_version or MODEL_PATH}: {e}")
+        _failed_signature = signature
+        return
+    with _forest_lock:
+        _install(*loaded, signature)
+    prediction_cache.clear()
+    logger.info(f"Loan model {loaded[2] or MODEL_PATH} loaded in {time.perf_counter() - start:.3f}s and swapped in")
+
+def wait_for_reload(timeout: Optional[float] = None) -> None:
+    """Block until a background model reload, if one is running, finishes."""
+    thread = _reload_thread
+    if thread is not None:
+        thread.join(timeout)
+
+def current_model_version() -> Optional[str]:
+    """Registry version being served, or None for models/loan_model.pkl (or nothing loaded)."""
+    return _forest_version
+
+def _load_forest():
+    from utils.compiled_forest import CompiledForest, compile_forest, file_digest
+    digest = file_digest(MODEL_PATH)
+    if os.path.exists(COMPILED_MODEL_PATH):
+        forest = CompiledForest.load(COMPILED_MODEL_PATH)
+        if forest.source_digest == digest:
+            return forest
+        logger.warning(f"{COMPILED_MODEL_PATH} is out of date; recompiling from {MODEL_PATH}")
+    import joblib
+    forest = compile_forest(joblib.load(MODEL_PATH))
+    forest.source_digest = digest
+    try:
+        forest.save(COMPILED_MODEL_PATH)
+    except OSError as e:
+        logger.warning(f"Could not save compiled loan model: {e}")
+    return forest
+
+def is_model_loaded() -> bool:
+    return _forest is not None
+
+def warm_up() -> threading.Thread:
+    """Load the model on a daemon thread so the first prediction does not wait."""
+    def load():
+        try:
+            get_forest()
+        except Exception as e:
+            logger.error(f"Loan model warm-up failed: {e}")
+    thread = threading.Thread(target=load, name="predictor-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+def __getattr__(name):
+    # predictor.model still works, loading on first access
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _feature_matrix(features=None, income=None, credit=None, loan_amount=None, loan_term=None) -> np.ndarray:
+    """Validate inputs as an (n, 4) float32 matrix, as the trees expect."""
+    if features is None:
+        columns = [np.atleast_1d(np.asarray(c, dtype=np.float64)) for c in (income, credit, loan_amount, loan_term)]
+        if any(c.ndim != 1 or len(c) != len(columns[0]) for c in columns):
+            raise ValueError("Feature arrays must be one-dimensional and of equal length")
+        matrix = np.column_stack(columns)
+    else:
+        matrix = np.asarray(features, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2 or matrix.shape[1] != len(FEATURES):
+        raise ValueError(f"Expected an (n, {len(FEATURES)}) matrix of {', '.join(FEATURES)}")
+    if not np.isfinite(matrix).all():
+        raise ValueError("Features must be finite numbers")
+    return np.ascontiguousarray(matrix, dtype=np.float32)
+
+def predict_loan_eligibility_batch(features=None, income: Optional[Sequence] = None,
+                                   credit: Optional[Sequence] = None, loan_amount: Optional[Sequence] = None,
+                                   loan_term: Optional[Sequence] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Score many applications in one call.
+
+    Pass either ``features``, an (n, 4) array-like with columns in
+    ``FEATURES`` order, or the four columns as equal-length sequences.
+    Returns (eligible, probability): a boolean array of decisions and the
+    probability of eligibility for each row. Raises ValueError for
+    malformed or non-finite input.
+    """
+    X = _feature_matrix(features, income, credit, loan_amount, loan_term)
+    _check_model_files()
+    forest = get_forest()
+    proba = forest.predict_proba(X)
+    eligible = forest.classes[proba.argmax(axis=1)] == 1
+    return eligible, proba[:, list(forest.classes).index(1)]
+
+def bucket_features(income, credit, loan_amount, loan_term) -> Tuple[float, ...]:
+    """Round each feature to the nearest multiple of its PREDICTION_BUCKETS step."""
+    return tuple(round(value / step) * step
+                 for value, step in zip((income, credit, loan_amount, loan_term), PREDICTION_BUCKETS))
+
+def predict_loan_eligibility(income, credit, loan_amount, loan_term, bucketed: bool = False) -> bool:
+    """Return True if a single application is predicted eligible.
 
-model = joblib.load(MODEL_PATH)
-
-def predict_loan_eligibility(income, credit, loan_amount, loan_term):
-    df = pd.DataFrame({
-        "Income": [income],
-        "CreditScore": [credit],
-        "LoanAmount": [loan_amount],
-        "LoanTerm": [loan_term]
-    })
-    prediction = model.predict(df)
-    return prediction[0] == 1
+    Results are cached. With ``bucketed`` the features are first rounded
+    with ``bucket_features`` and the rounded application is scored, so
+    every input in a bucket shares one cache entry and one decision.
+    """
+    if bucketed:
+        income, credit, loan_amount, loan_term = bucket_features(income, credit, loan_amount, loan_term)
+    X = np.array([[income, credit, loan_amount, loan_term]], dtype=np.float32)
+    if not np.isfinite(X).all():
+        raise ValueError("Features must be finite numbers")
+    _check_model_files()
+    # Inputs that are equal as float32 are equal to the model
+    key = tuple(X[0].tolist())
+    eligible = prediction_cache.get(key)
+    if eligible is None:
+        generation = prediction_cache.generation
+        forest = get_forest()
+        eligible = bool(forest.classes[forest.predict_proba(X)[0].argmax()] == 1)
+        prediction_cache.put(key, eligible, generation)
+    return eligible
@@ -1,43 +1,213 @@
 # utils/report_generator.py
+import bisect
+import itertools
+import threading
 from fpdf import FPDF
 from datetime import datetime
+from config import DEBIT_TYPES
+
+# Core PDF fonts only cover Latin-1, which has no rupee sign
+CURRENCY_PREFIX = "Rs. "
+
+def _pdf_text(text) -> str:
+    """Make text safe for the Latin-1 core fonts."""
+    return str(text or "").encode("latin-1", "replace").decode("latin-1")
+
+def _pdf_amount(amount) -> str:
+    return f"{CURRENCY_PREFIX}{amount:,.2f}"
+
+class StatementTemplate:
+    """Pre-computed page layout of a statement, shared by every statement a process renders.
+
+    Page furniture, column positions and text metrics are worked out once,
+    and pages are drawn with positioned text and ruled lines instead of one
+    ``cell()`` per value, which spends most of its time on line breaking and
+    graphics state that a fixed table does not need. Use ``get_template()``.
+    """
+    FONT = 'Helvetica'
+    TITLE = 'Bank Account Statement'
+    # (heading, width in mm, alignment)
+    COLUMNS = (('Date', 30, 'L'), ('Type', 40, 'L'), ('Amount', 40, 'R'), ('Description', 80, 'L'))
+    ROW_HEIGHT = 10
+    LINE_HEIGHT = 8
+
+    def __init__(self):
+        # A scratch document supplies page geometry and font metrics
+        scratch = FPDF()
+        scratch.add_page()
+        self.page_width, self.page_height = scratch.w, scratch.h
+        self.left, self.padding = scratch.l_margin, scratch.c_margin
+        self.top = scratch.t_margin
+        self.bottom = scratch.page_break_trigger
+        self.body_top = self.top + 15
+        self.scale = scratch.k
+        # Core fonts have no kerning, so a string's width is the sum of its characters'
+        scratch.set_font(self.FONT, '', 10)
+        self.char_widths = {chr(c): scratch.get_string_width(chr(c)) for c in range(32, 256)}
+        self.default_width = self.char_widths['W']
+        scratch.set_font(self.FONT, 'B', 12)
+        self.title_x = (self.page_width - scratch.get_string_width(self.TITLE)) / 2
+
+        self.column_x = []
+        x = self.left
+        for _, width, _ in self.COLUMNS:
+            self.column_x.append(x)
+            x += width
+        self.right = x
+        self.headings = [(x + (width - self.text_width(name)) / 2, name)
+                         for x, (name, width, _) in zip(self.column_x, self.COLUMNS)]
+        self.description_width = self.COLUMNS[3][1] - 2 * self.padding
+        self.amount_right = self.column_x[2] + self.COLUMNS[2][1] - self.padding
+
+    def text_width(self, text: str) -> float:
+        """Width in mm of ``text`` in the 10pt body font."""
+        widths = self.char_widths
+        return sum(widths.get(c, self.default_width) for c in text)
+
+    def baseline(self, y: float, height: float, points: float = 10) -> float:
+        """Baseline that centres text vertically in a row, as ``cell()`` does."""
+        return y + height / 2 + 0.3 * points / self.scale
+
+    def _fit(self, text: str, width: float) -> str:
+        """Cut ``text`` to fit ``width``, marking the cut with '...'."""
+        if self.text_width(text) <= width:
+            return text
+        widths = self.char_widths
+        ends = list(itertools.accumulate(widths.get(c, self.default_width) for c in text))
+        return text[:bisect.bisect_right(ends, width - self.text_width("..."))] + "..."
+
+    def format_rows(self, transactions):
+        """Turn line items into ready-to-draw rows in a single pass.
+
+        Each row is (date, type, amount, amount_x, description) with the
+        amount signed and right-aligned and the description cut to its column.
+        """
+        rows = []
+        for t in transactions:
+            amount = _pdf_amount(t['amount'])
+            if t['type'] in DEBIT_TYPES:
+                amount = f"-{amount}"
+            rows.append((
+                t['timestamp'][:10],
+                _pdf_text(t['type']),
+                amount,
+                self.amount_right - self.text_width(amount),
+                self._fit(_pdf_text(t.get('description')), self.description_width),
+            ))
+        return rows
+
+    def draw_header(self, pdf: FPDF) -> None:
+        pdf.set_font(self.FONT, 'B', 12)
+        pdf.text(self.title_x, self.baseline(self.top, 10, 12), self.TITLE)
+        pdf.set_font(self.FONT, '', 10)
+
+    def draw_footer(self, pdf: FPDF) -> None:
+        pdf.set_font(self.FONT, 'I', 8)
+        label = f'Page {pdf.page_no()}'
+        pdf.text((self.page_width - pdf.get_string_width(label)) / 2,
+                 self.baseline(self.page_height - 15, 10, 8), label)
+
+    def _draw_table_header(self, pdf: FPDF, y: float) -> float:
+        pdf.set_fill_color(200, 220, 255)
+        for x, (_, width, _) in zip(self.column_x, self.COLUMNS):
+            pdf.rect(x, y, width, self.ROW_HEIGHT, style='DF')
+        baseline = self.baseline(y, self.ROW_HEIGHT)
+        for x, name in self.headings:
+            pdf.text(x, baseline, name)
+        return y + self.ROW_HEIGHT
+
+    def _draw_rules(self, pdf: FPDF, top: float, bottom: float) -> None:
+        for x in (*self.column_x, self.right):
+            pdf.line(x, top, x, bottom)
+
+    def render(self, statement) -> 'AccountStatementPDF':
+        """Lay out a ``get_statement`` dict as an AccountStatementPDF."""
+        rows = self.format_rows(statement['transactions'])
+        today = datetime.now().strftime("%Y-%m-%d")
+        pdf = AccountStatementPDF(self)
+        pdf.add_page()
+        left = self.left + self.padding
+        y = self.body_top
+        for line in (f"Account Number: {statement['account_number']}",
+                     f"Statement Period: {statement['from_date'] or 'opening'} to {statement['to_date'] or today}",
+                     f"Statement Date: {today}",
+                     f"Opening Balance: {_pdf_amount(statement['opening_balance'])}"):
+            pdf.text(left, self.baseline(y, self.LINE_HEIGHT), line)
+            y += self.LINE_HEIGHT
+        y += 6
+
+        top = y
+        y = self._draw_table_header(pdf, y)
+        date_x, type_x, _, description_x = (x + self.padding for x in self.column_x)
+        for date, kind, amount, amount_x, description in rows:
+            if y + self.ROW_HEIGHT > self.bottom:
+                self._draw_rules(pdf, top, y)
+                pdf.add_page()
+                top = self.body_top
+                y = self._draw_table_header(pdf, top)
+            baseline = self.baseline(y, self.ROW_HEIGHT)
+            pdf.text(date_x, baseline, date)
+            pdf.text(type_x, baseline, kind)
+            pdf.text(amount_x, baseline, amount)
+            pdf.text(description_x, baseline, description)
+            y += self.ROW_HEIGHT
+            pdf.line(self.left, y, self.right, y)
+        self._draw_rules(pdf, top, y)
+
+        y += 6
+        if y + 3 * self.LINE_HEIGHT > self.bottom:
+            pdf.add_page()
+            y = self.body_top
+        for label, key in (('Total Credits', 'total_credits'), ('Total Debits', 'total_debits'),
+                           ('Closing Balance', 'closing_balance')):
+            pdf.text(left, self.baseline(y, self.LINE_HEIGHT), f'{label}: {_pdf_amount(statement[key])}')
+            y += self.LINE_HEIGHT
+        return pdf
+
+_template = None
+_template_lock = threading.Lock()
+
+def get_template() -> StatementTemplate:
+    """The process-wide StatementTemplate, built on first use."""
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = StatementTemplate()
+        return _template
 
 class AccountStatementPDF(FPDF):
+    def __init__(self, template: StatementTemplate = None):
+        super().__init__()
+        self.template = template or get_template()
+        # The template breaks pages itself, where each row ends
+        self.set_auto_page_break(False)
+
     def header(self):
-        self.set_font('Arial', 'B', 12)
-        self.cell(0, 10, 'Bank Account Statement', 0, 1, 'C')
-        self.ln(5)
+        self.template.draw_header(self)
 
     def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-
-def generate_statement_pdf(account_number, transactions):
-    pdf = AccountStatementPDF()
-    pdf.add_page()
-    pdf.set_font('Arial', '', 10)
-    
-    # Add account info
-    pdf.cell(0, 10, f'Account Number: {account_number}', 0, 1)
-    pdf.cell(0, 10, f'Statement Date: {datetime.now().strftime("%Y-%m-%d")}', 0, 1)
-    pdf.ln(10)
-    
-    # Add transactions table
-    pdf.set_fill_color(200, 220, 255)
-    pdf.cell(30, 10, 'Date', 1, 0, 'C', 1)
-    pdf.cell(40, 10, 'Type', 1, 0, 'C', 1)
-    pdf.cell(40, 10, 'Amount', 1, 0, 'C', 1)
-    pdf.cell(80, 10, 'Description', 1, 1, 'C', 1)
-    
-    pdf.set_fill_color(255, 255, 255)
-    for t in transactions:
-        pdf.cell(30, 10, t['timestamp'][:10], 1, 0)
-        pdf.cell(40, 10, t['type'], 1, 0)
-        amount = f"₹{t['amount']:.2f}"
-        if t['type'] in ('Withdrawal', 'Transfer Out'):
-            amount = f"-{amount}"
-        pdf.cell(40, 10, amount, 1, 0, 'R')
-        pdf.cell(80, 10, t.get('description', ''), 1, 1)
-    
-    return pdf.output(dest='S').encode('latin1')
\ No newline at end of file
+        self.template.draw_footer(self)
+
+def generate_statement_pdf(account_number, from_date=None, to_date=None, db=None):
+    """Render the statement of an account for a period as PDF bytes.
+
+    Balances and line items come from ``get_statement`` on ``db`` (the
+    application database by default). Raises ValueError for an unknown account.
+    """
+    if db is None:
+        # Imported here: importing it opens and migrates bank.db
+        from database.db_manager import db_manager as db
+    statement = db.get_statement(account_number, from_date, to_date)
+    if statement is None:
+        raise ValueError(f"No statement for account #{account_number}")
+    return bytes(build_statement_pdf(statement).output())
+
+def build_statement_pdf(statement, path: str = None):
+    """Render ``statement`` with the process-wide template, saving it to ``path`` if given.
+
+    Returns the AccountStatementPDF either way.
+    """
+    pdf = get_template().render(statement)
+    if path is not None:
+        pdf.output(path)
+    return pdf
@@ -0,0 +1,154 @@
+# utils/statement_run.py
+"""Month-end statement runs for every account in the bank.
+
+Accounts are split into shards of ``STATEMENT_SHARD_SIZE`` consecutive
+account numbers, and a pool of worker processes renders the shards in
+parallel. Each worker keeps one connection to the database for its
+lifetime, streams its shard's statements with
+``DatabaseManager.iter_statements`` and writes one PDF per account::
+
+    <out_dir>/shard-<first account>/statement-<account>.pdf
+    <out_dir>/_statement_run.json
+
+PDF rendering is CPU bound and SQLite readers do not block each other in WAL
+mode, so throughput grows with the number of workers until the disk
+saturates. The checkpoint file records the period and every finished
+shard. Running again with the same period resumes the run, and a shard
+cut short is rendered again from the start.
+
+Command line:
+    python -m utils.statement_run <out_dir> --from 2024-01-01 --to 2024-01-31 [--workers N]
+"""
+import os
+import json
+import time
+import argparse
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Optional, Tuple
+from config import STATEMENT_SHARD_SIZE, STATEMENT_WORKERS
+from utils.report_generator import build_statement_pdf
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "_statement_run.json"
+
+# Each worker process opens its own DatabaseManager in _init_worker
+_worker_db = None
+
+def _init_worker(db_file: str, storage_profile: str) -> None:
+    global _worker_db
+    # Imported here: importing the module opens and migrates bank.db
+    from database.db_manager import DatabaseManager
+    _worker_db = DatabaseManager(db_file, pool_size=1, storage_profile=storage_profile)
+
+def _render_shard(out_dir: str, from_date: str, to_date: str, first: int, last: int) -> Tuple[int, int, int]:
+    """Write the statements of accounts ``first``..``last``; return (first, statements, pages)."""
+    shard_dir = os.path.join(out_dir, f"shard-{first:012d}")
+    os.makedirs(shard_dir, exist_ok=True)
+    statements = pages = 0
+    for statement in _worker_db.iter_statements(from_date, to_date, first, last):
+        pdf = build_statement_pdf(statement, os.path.join(shard_dir, f"statement-{statement['account_number']}.pdf"))
+        statements += 1
+        pages += pdf.page_no()
+    return first, statements, pages
+
+def load_checkpoint(out_dir: str) -> Optional[Dict]:
+    """Return the run's checkpoint, or None if no run has started in ``out_dir``."""
+    try:
+        with open(os.path.join(out_dir, CHECKPOINT_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _save_checkpoint(out_dir: str, checkpoint: Dict) -> None:
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+def run_statements(db, out_dir: str, from_date: str, to_date: str, workers: Optional[int] = STATEMENT_WORKERS,
+                   shard_size: int = STATEMENT_SHARD_SIZE,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Render the statement of every account for ``from_date``..``to_date`` into ``out_dir``.
+
+    Returns statements and pages written by this run, elapsed seconds and
+    throughput. ``progress(done, total)`` counts accounts, finished shards
+    from an earlier run included. Setting ``cancel_event`` stops after the
+    shards in flight and returns None. Raises ValueError if ``out_dir``
+    holds a run for a different period.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = load_checkpoint(out_dir) or {"from_date": from_date, "to_date": to_date, "shards": {}}
+    if (checkpoint["from_date"], checkpoint["to_date"]) != (from_date, to_date):
+        raise ValueError(f"{out_dir} holds a statement run for "
+                         f"{checkpoint['from_date']} to {checkpoint['to_date']}")
+
+    # Shards are fixed account number ranges, so they line up across resumes
+    # even when accounts are opened in between
+    with db.pool.connection() as conn:
+        total, max_account = conn.execute("SELECT COUNT(*), MAX(account_number) FROM accounts").fetchone()
+    shards = [(first, first + shard_size - 1) for first in range(1, (max_account or 0) + 1, shard_size)
+              if str(first) not in checkpoint["shards"]]
+    done = sum(s[0] for s in checkpoint["shards"].values())
+    workers = workers or os.cpu_count() or 1
+    statements = pages = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db.db_file, db.storage_profile)) as pool:
+        futures = [pool.submit(_render_shard, out_dir, from_date, to_date, first, last) for first, last in shards]
+        try:
+            for future in as_completed(futures):
+                first, shard_statements, shard_pages = future.result()
+                checkpoint["shards"][str(first)] = [shard_statements, shard_pages]
+                _save_checkpoint(out_dir, checkpoint)
+                statements += shard_statements
+                pages += shard_pages
+                done += shard_statements
+                if progress:
+                    progress(done, max(total, done))
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info(f"Statement run cancelled after {statements} statements")
+                    return None
+        finally:
+            # Drop queued shards; the checkpoint has everything finished
+            for future in futures:
+                future.cancel()
+
+    seconds = time.perf_counter() - start
+    result = {
+        "statements": statements,
+        "pages": pages,
+        "seconds": seconds,
+        "statements_per_second": statements / seconds if seconds else 0.0,
+        "pages_per_second": pages / seconds if seconds else 0.0,
+        "workers": workers,
+        "shards": len(shards),
+    }
+    logger.info(f"Statement run {from_date} to {to_date} into {out_dir}: {result}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--from", dest="from_date", required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="to_date", required=True, help="last day, YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=STATEMENT_WORKERS)
+    parser.add_argument("--shard-size", type=int, default=STATEMENT_SHARD_SIZE)
+    args = parser.parse_args()
+    from database.db_manager import db_manager
+
+    def report(done, total):
+        print(f"\r{done:,}/{total:,} statements", end="", flush=True)
+
+    result = run_statements(db_manager, args.out_dir, args.from_date, args.to_date,
+                            args.workers, args.shard_size, progress=report)
+    print(f"\n{result['statements']:,} statements ({result['pages']:,} pages) in {result['seconds']:.1f}s "
+          f"with {result['workers']} workers: {result['statements_per_second']:,.0f} statements/s, "
+          f"{result['pages_per_second']:,.0f} pages/s")
+
+if __name__ == "__main__":
+    main()